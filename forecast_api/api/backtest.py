@@ -0,0 +1,51 @@
+import falcon
+import logging
+
+from forecast_api.api.media import read_media
+from forecast_api.lib.exceptions import InvalidParameter
+
+_log = logging.getLogger(__name__)
+
+
+class BacktestResource(object):
+
+    # retries with the same Idempotency-Key replay the first response (see IdempotencyMiddleware)
+    idempotent = True
+
+    def __init__(self, registry, executor, limits=None):
+        self._registry = registry
+        self._executor = executor
+        self._limits = limits
+
+    def on_post(self, request, response, forecast_method):
+        if forecast_method not in self._registry or \
+                not hasattr(self._registry.engine(forecast_method), 'backtest'):
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+        media = read_media(request, self._limits)
+
+        try:
+            response.status = falcon.HTTP_OK
+
+            input_data = media['input_data']
+            forecast_horizon = media['forecast_horizon']
+            initial_window = media['initial_window']
+            step = media.get('step', 1)
+            params = media['params']
+
+            response.media = self._registry.engine(forecast_method).backtest(
+                input_data,
+                forecast_horizon,
+                initial_window,
+                step,
+                executor=self._executor,
+                **params
+            )
+        except InvalidParameter as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except ValueError as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except Exception as e:
+            _log.exception('Problem backtesting forecast')
+            raise falcon.HTTPInternalServerError(description=f'{e}')
@@ -1,15 +1,111 @@
 import falcon
 import logging
 
+from functools import partial
+
+from forecast_api.api.media import read_media
+from forecast_api.lib.diagnostics import diagnosed
+from forecast_api.lib.diagnostics import fit_quality
+from forecast_api.lib.diagnostics import observe_fit
+from forecast_api.lib.etag import forecast_etag
 from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.fields import parse_fields_param
+from forecast_api.lib.fields import projected
+from forecast_api.lib.memory import input_length
+from forecast_api.lib.param_parsers import parse_boolean_param
+from forecast_api.lib.regularize import future_timestamps
+from forecast_api.lib.regularize import regularize
 
 _log = logging.getLogger(__name__)
 
 
 class GenericForecastResource(object):
 
+    def __init__(self, registry, limits=None, budget=None, metrics=None):
+        self._registry = registry
+        self._limits = limits
+        self._budget = budget
+        self._metrics = metrics
+
     def on_post(self, request, response, forecast_method):
-        raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+        if forecast_method not in self._registry:
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+        media = read_media(request, self._limits)
+
+        # with fit: false the params are used as given, without fitting the model
+        try:
+            fit = parse_boolean_param('fit', media.get('fit', True))
+            diagnostics = parse_boolean_param('diagnostics', media.get('diagnostics', False))
+            fields = parse_fields_param('fields', media.get('fields'))
+        except InvalidParameter as e:
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        if fields is not None and diagnostics:
+            fields = fields.with_paths('diagnostics')
+        operation = 'fit_forecast' if fit else 'forecast'
+        if not hasattr(self._registry.engine(forecast_method), operation):
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method} with fit = {fit}')
+
+        # a client polling with the ETag of an unchanged request gets a 304, without a fit or serialization;
+        # diagnostics measure this very call, they are not cached
+        etag = None if diagnostics else self._etag(forecast_method, operation, media)
+        if etag is not None and etag in (request.if_none_match or ()):
+            response.status = falcon.HTTP_NOT_MODIFIED
+            response.etag = etag
+            return
+
+        def fit_forecast(input_data, forecast_horizon, **params):
+            spec = self._registry.spec(forecast_method)
+            run = partial(
+                self._run, forecast_method, operation, diagnostics, fields, input_data, forecast_horizon, params
+            )
+            if self._budget is None:
+                return run(spec.pool)
+            # admitted (or rerouted) on the estimate, then sampled for what it actually used
+            length = input_length(input_data)
+            can_reroute = self._registry.can_run_in(forecast_method, self._budget.reroute_pool)
+            pool = self._budget.admit(spec, length, can_reroute)
+            with self._budget.sample(spec, length, pool):
+                return run(pool)
+
+        _post_forecast(fit_forecast, media, response, fields)
+        if etag is not None:
+            response.etag = etag
+
+    def _run(self, forecast_method, operation, diagnostics, fields, input_data, forecast_horizon, params, pool):
+        """The result of the call on ``pool``: projected onto ``fields`` and its effort collected where it runs."""
+        # the in-sample SSE and AIC come with fit_evaluate, only run in its place when diagnostics are asked for
+        engine = self._registry.engine(forecast_method)
+        evaluate = diagnostics and operation == 'fit_forecast' and hasattr(engine, 'fit_evaluate')
+        function = getattr(engine, 'fit_evaluate' if evaluate else operation)
+        if fields is not None and evaluate:
+            function = partial(projected, fields.with_paths('sse', 'nobs', 'n_params'), function)
+        elif fields is not None:
+            function = partial(projected, fields, function)
+        if not diagnostics and self._metrics is None:
+            return self._registry.submit_call_in(pool, function, input_data, forecast_horizon, **params).result()
+        result, effort = self._registry.submit_call_in(
+            pool, diagnosed, function, input_data, forecast_horizon, **params
+        ).result()
+        if evaluate:
+            effort.update(fit_quality(result.pop('sse'), result.pop('nobs'), result.pop('n_params')))
+        if self._metrics is not None:
+            observe_fit(self._metrics, forecast_method, effort)
+        if diagnostics:
+            result['diagnostics'] = effort
+        return result
+
+    def _etag(self, forecast_method, operation, media):
+        params = media.get('params')
+        if not isinstance(params, dict):
+            return None
+        if operation == 'fit_forecast':
+            # parsed, so spelling out a default gives the same tag as leaving it out
+            try:
+                params = self._registry.parse_params(forecast_method, **params)
+            except (InvalidParameter, ValueError, TypeError):
+                return None
+        return forecast_etag(forecast_method, operation, media, params)
 
 
 class ForecastResource(object):
@@ -18,26 +114,47 @@ class ForecastResource(object):
         self._method = method
 
     def on_post(self, request, response):
+        _post_forecast(self._method.fit_forecast, request.media, response)
 
-        try:
-            response.status = falcon.HTTP_OK
 
-            input_data = request.media['input_data']
-            forecast_horizon = request.media['forecast_horizon']
-            params = request.media['params']
+def _post_forecast(fit_forecast, media, response, fields=None):
+    try:
+        response.status = falcon.HTTP_OK
+
+        input_data = media['input_data']
+        forecast_horizon = media['forecast_horizon']
+        params = media['params']
 
-            forecast = self._method.fit_forecast(
+        # timestamped observations are put on a regular grid first
+        regular = None
+        if media.get('timestamps') is not None:
+            regular = regularize(
                 input_data,
-                forecast_horizon,
-                **params
+                media['timestamps'],
+                media.get('frequency'),
+                media.get('aggregation'),
+                media.get('fill'),
             )
-            response.media = forecast
-        except InvalidParameter as e:
-            _log.exception('Improperly specified parameter')
-            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
-        except ValueError as e:
-            _log.exception('Improperly specified parameter')
-            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
-        except Exception as e:
-            _log.exception('Problem generating forecast')
-            raise falcon.HTTPInternalServerError(description=f'{e}')
+            input_data = regular.values
+
+        forecast = fit_forecast(
+            input_data,
+            forecast_horizon,
+            **params
+        )
+        if regular is not None and (fields is None or fields.wants('timestamps')):
+            forecast['timestamps'] = future_timestamps(regular, forecast_horizon)
+            forecast['frequency'] = regular.frequency.freqstr
+        response.media = forecast if fields is None else fields.project(forecast)
+    except InvalidParameter as e:
+        _log.exception('Improperly specified parameter')
+        raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+    except ValueError as e:
+        _log.exception('Improperly specified parameter')
+        raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+    except PayloadTooLarge as e:
+        _log.warning(f'Forecast over the memory budget: {e}')
+        raise falcon.HTTPPayloadTooLarge(description=f'{e}')
+    except Exception as e:
+        _log.exception('Problem generating forecast')
+        raise falcon.HTTPInternalServerError(description=f'{e}')
@@ -0,0 +1,49 @@
+import falcon
+import logging
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.methods.hierarchy import forecast_hierarchy
+
+_log = logging.getLogger(__name__)
+
+
+class HierarchyResource(object):
+    """Reconciled forecasts of every node of a hierarchy given the series and paths of its leaves."""
+
+    # retries with the same Idempotency-Key replay the first response (see IdempotencyMiddleware)
+    idempotent = True
+
+    def __init__(self, registry):
+        self._registry = registry
+
+    def on_post(self, request, response, forecast_method):
+        if forecast_method not in self._registry:
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+
+        try:
+            response.status = falcon.HTTP_OK
+
+            input_data = request.media['input_data']
+            hierarchy = request.media['hierarchy']
+            forecast_horizon = request.media['forecast_horizon']
+            reconciliation = request.media.get('reconciliation', 'ols')
+            params = request.media.get('params', {})
+
+            response.media = forecast_hierarchy(
+                self._registry,
+                forecast_method,
+                input_data,
+                hierarchy,
+                forecast_horizon,
+                reconciliation,
+                **params
+            )
+        except InvalidParameter as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except ValueError as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except Exception as e:
+            _log.exception('Problem reconciling forecasts')
+            raise falcon.HTTPInternalServerError(description=f'{e}')
@@ -0,0 +1,108 @@
+import falcon
+import hashlib
+import logging
+
+from forecast_api.lib.exceptions import IdempotencyKeyInProgress
+from forecast_api.lib.exceptions import IdempotencyKeyReused
+from forecast_api.lib.idempotency import StoredResponse
+
+
+_log = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class _HashingStream(object):
+    """The WSGI input of a request, hashing the body as it is read."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        return self._hashed(self._stream.read(size))
+
+    def readline(self, limit=-1):
+        return self._hashed(self._stream.readline(limit))
+
+    def readlines(self, hint=-1):
+        return [self._hashed(line) for line in self._stream.readlines(hint)]
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def _hashed(self, data):
+        self._hash.update(data)
+        return data
+
+
+def _hash_body(request):
+    """Hash the body of ``request`` as the resource reads it; the hashing stream."""
+    # bounded_stream wraps wsgi.input when first used, i.e. after the middleware
+    stream = request.env['wsgi.input'] = request.stream = _HashingStream(request.env['wsgi.input'])
+    return stream
+
+
+class IdempotencyMiddleware(object):
+    """Replays the response of a POST retried with the same ``Idempotency-Key`` header instead of running it again.
+
+    Only resources with ``idempotent = True`` (the batch endpoints) take
+    part. Keys are scoped to the path; the query string, content type,
+    length and SHA-256 of the body identify the request, reusing a key for
+    another one is refused with 422. The body is hashed as the resource
+    reads it (a retry to be replayed is read just to hash it), so it is
+    never held in memory. Only successful responses are stored, a failed
+    request can be retried under the same key.
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def process_resource(self, request, response, resource, params):
+        key = request.get_header(IDEMPOTENCY_KEY_HEADER)
+        if key is None or request.method != 'POST' or not getattr(resource, 'idempotent', False):
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise falcon.HTTPBadRequest(
+                description=f'Bad parameter: {IDEMPOTENCY_KEY_HEADER} should have 1 to {MAX_KEY_LENGTH} characters'
+            )
+
+        scoped_key = (request.path, key)
+        fingerprint = (request.query_string, request.content_type, request.content_length)
+        try:
+            stored = self._store.begin(scoped_key, fingerprint)
+        except IdempotencyKeyReused as e:
+            raise falcon.HTTPUnprocessableEntity(description=f'{e}')
+        except IdempotencyKeyInProgress as e:
+            raise falcon.HTTPConflict(description=f'{e}')
+
+        if stored is not None:
+            # same length, the body still has to be the same
+            stream = _hash_body(request)
+            request.bounded_stream.exhaust()
+            if stream.hexdigest() != stored.body_digest:
+                raise falcon.HTTPUnprocessableEntity(
+                    description=f'the idempotency key {key} was used for another request'
+                )
+            _log.info(f'replaying the response of {IDEMPOTENCY_KEY_HEADER} {key} on {request.path}')
+            response.status = stored.status
+            response.media = stored.media
+            response.set_header(REPLAYED_HEADER, 'true')
+            response.complete = True
+            return
+        request.context.idempotency_key = scoped_key
+        request.context.idempotency_body = _hash_body(request)
+
+    def process_response(self, request, response, resource, req_succeeded):
+        key = getattr(request.context, 'idempotency_key', None)
+        if key is None:
+            return
+        if req_succeeded and response.status.startswith('2'):
+            # whatever the resource left unread is part of the body too
+            request.bounded_stream.exhaust()
+            digest = request.context.idempotency_body.hexdigest()
+            self._store.complete(key, StoredResponse(response.status, response.media, digest))
+        else:
+            self._store.release(key)
@@ -0,0 +1,32 @@
+import falcon
+
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.streaming import parse_json_stream
+
+
+def read_media(request, limits=None):
+    """The JSON body of ``request``, its ``input_data`` streamed into a float64 array.
+
+    Without ``limits`` this is just ``request.media``. A body declared
+    larger than ``limits.max_body_bytes`` is refused before it is read, one
+    that turns out larger, or with more than ``limits.max_input_points``
+    points, as soon as it does (413).
+    """
+    if limits is None or 'json' not in (request.content_type or 'json'):
+        return request.media
+    if request.content_length is not None and request.content_length > limits.max_body_bytes:
+        raise falcon.HTTPPayloadTooLarge(
+            description=f'The body ({request.content_length} bytes) is larger than {limits.max_body_bytes} bytes'
+        )
+    try:
+        return parse_json_stream(
+            request.bounded_stream,
+            chunk_size=limits.chunk_size,
+            max_bytes=limits.max_body_bytes,
+            max_points=limits.max_input_points,
+            size_hint=request.content_length,
+        )
+    except PayloadTooLarge as e:
+        raise falcon.HTTPPayloadTooLarge(description=f'{e}')
+    except ValueError as e:
+        raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
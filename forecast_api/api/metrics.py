@@ -0,0 +1,25 @@
+from falcon import HTTP_OK
+import logging
+
+from forecast_api.lib.memory import peak_rss_bytes
+from forecast_api.lib.memory import private_bytes
+from forecast_api.lib.memory import rss_bytes
+
+
+_log = logging.getLogger(__name__)
+
+
+class MetricsResource(object):
+    """The worker's metrics in the Prometheus text format, with its current memory as gauges."""
+
+    def __init__(self, metrics):
+        self._metrics = metrics
+
+    def on_get(self, request, response):
+        self._metrics.set_gauge('process_resident_memory_bytes', rss_bytes())
+        self._metrics.set_gauge('process_private_memory_bytes', private_bytes())
+        self._metrics.set_gauge('process_peak_resident_memory_bytes', peak_rss_bytes())
+
+        response.status = HTTP_OK
+        response.content_type = 'text/plain; version=0.0.4'
+        response.body = self._metrics.render()
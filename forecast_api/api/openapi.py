@@ -0,0 +1,17 @@
+from falcon import HTTP_OK
+
+from forecast_api.lib.openapi import openapi_document
+
+
+class OpenAPIResource(object):
+    """The OpenAPI document generated from the method registry and the methods' param specs."""
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._document = None
+
+    def on_get(self, request, response):
+        if self._document is None:
+            self._document = openapi_document(self._registry)
+        response.status = HTTP_OK
+        response.media = self._document
@@ -0,0 +1,80 @@
+import json
+
+import falcon
+import logging
+
+from forecast_api.lib.batch import (
+    SERIES_COLUMN,
+    VALUE_COLUMN,
+)
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.fields import parse_fields_param
+from forecast_api.lib.panel import (
+    read_panel_arrow,
+    read_panel_csv,
+)
+from forecast_api.methods.panel import forecast_panel
+
+_log = logging.getLogger(__name__)
+
+MEDIA_CSV = 'text/csv'
+MEDIA_ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+_READERS = {
+    MEDIA_CSV: read_panel_csv,
+    MEDIA_ARROW_STREAM: read_panel_arrow,
+}
+
+
+class PanelResource(object):
+    """Forecasts every series of a long-format (series id, [timestamp,] value) CSV or Arrow stream body.
+
+    ``forecast_horizon``, ``params`` (a JSON object), the column names and
+    optionally the ``fields`` of each result are given in the query string.
+    """
+
+    # retries with the same Idempotency-Key replay the first response (see IdempotencyMiddleware)
+    idempotent = True
+
+    def __init__(self, registry):
+        self._registry = registry
+
+    def on_post(self, request, response, forecast_method):
+        if forecast_method not in self._registry:
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+        content_type = (request.content_type or '').split(';')[0].strip()
+        if content_type not in _READERS:
+            raise falcon.HTTPUnsupportedMediaType(description=f'Expected one of [{", ".join(_READERS)}]')
+
+        forecast_horizon = request.get_param_as_int('forecast_horizon', required=True, min_value=1)
+        try:
+            params = json.loads(request.get_param('params', default='{}'))
+        except ValueError as e:
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: params should be a JSON object ({e})')
+        if not isinstance(params, dict):
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: params should be a JSON object')
+
+        try:
+            response.status = falcon.HTTP_OK
+
+            fields = parse_fields_param('fields', request.get_param('fields'))
+            panel = _READERS[content_type](
+                request.bounded_stream,
+                request.get_param('series_column', default=SERIES_COLUMN),
+                request.get_param('value_column', default=VALUE_COLUMN),
+                request.get_param('timestamp_column'),
+            )
+            response.media = {
+                'results': forecast_panel(
+                    self._registry, forecast_method, panel, forecast_horizon, fields=fields, **params
+                )
+            }
+        except InvalidParameter as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except ValueError as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except Exception as e:
+            _log.exception('Problem generating forecasts')
+            raise falcon.HTTPInternalServerError(description=f'{e}')
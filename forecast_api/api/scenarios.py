@@ -0,0 +1,46 @@
+import falcon
+import logging
+
+from forecast_api.lib.exceptions import InvalidParameter
+
+_log = logging.getLogger(__name__)
+
+
+class ScenariosResource(object):
+
+    # retries with the same Idempotency-Key replay the first response (see IdempotencyMiddleware)
+    idempotent = True
+
+    def __init__(self, registry):
+        self._registry = registry
+
+    def on_post(self, request, response, forecast_method):
+        if forecast_method not in self._registry or \
+                not hasattr(self._registry.engine(forecast_method), 'scenarios'):
+            raise falcon.HTTPNotImplemented(description=f'Not implemented: {forecast_method}')
+
+        try:
+            response.status = falcon.HTTP_OK
+
+            input_data = request.media['input_data']
+            forecast_horizon = request.media['forecast_horizon']
+            scenarios = request.media['scenarios']
+            sse = request.media.get('sse', False)
+            params = request.media.get('params', {})
+
+            response.media = self._registry.engine(forecast_method).scenarios(
+                input_data,
+                forecast_horizon,
+                scenarios,
+                sse,
+                **params
+            )
+        except InvalidParameter as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except ValueError as e:
+            _log.exception('Improperly specified parameter')
+            raise falcon.HTTPBadRequest(description=f'Bad parameter: {e}')
+        except Exception as e:
+            _log.exception('Problem evaluating scenarios')
+            raise falcon.HTTPInternalServerError(description=f'{e}')
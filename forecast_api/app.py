@@ -5,9 +5,16 @@ from configparser import ConfigParser
 from functools import partial
 from knot import Container
 
-from statsmodels.tsa.api import ExponentialSmoothing as smholtwinter
-from statsmodels.tsa.api import Holt as smholt
-
+from forecast_api.lib.idempotency import idempotency_store
+from forecast_api.lib.lazy import LazyImport
+from forecast_api.lib.memory import memory_budget
+from forecast_api.lib.metrics import Metrics
+from forecast_api.lib.pools import ExecutorPools
+from forecast_api.lib.pools import POOL_INLINE
+from forecast_api.lib.pools import POOL_THREADS
+from forecast_api.lib.streaming import request_limits
+from forecast_api.methods import Auto
+from forecast_api.methods import auto_parse_params
 from forecast_api.methods import Average
 from forecast_api.methods import average_parse_params
 from forecast_api.methods import average_model
@@ -15,6 +22,27 @@ from forecast_api.methods import Holt
 from forecast_api.methods import holt_parse_params
 from forecast_api.methods import HoltWinter
 from forecast_api.methods import holtwinter_parse_params
+from forecast_api.methods import SeasonalNaive
+from forecast_api.methods import seasonal_naive_parse_params
+from forecast_api.methods import seasonal_naive_model
+from forecast_api.methods import SES
+from forecast_api.methods import ses_parse_params
+from forecast_api.methods import ses_model
+from forecast_api.methods import Theta
+from forecast_api.methods import theta_parse_params
+from forecast_api.methods import theta_model
+from forecast_api.methods import Croston
+from forecast_api.methods import croston_parse_params
+from forecast_api.methods import croston_model
+from forecast_api.methods import DoubleSeasonalHoltWinter
+from forecast_api.methods import double_seasonal_parse_params
+from forecast_api.methods import double_seasonal_model
+from forecast_api.methods import MethodRegistry
+from forecast_api.methods import MethodSpec
+from forecast_api.methods.registry import COST_CHEAP
+from forecast_api.methods.registry import COST_EXPENSIVE
+
+_log = structlog.get_logger(__name__)
 
 
 def create_container(ini_path=None) -> Container:
@@ -26,6 +54,36 @@ def create_container(ini_path=None) -> Container:
         provider=_read_config,
         cache=True,
     )
+    container.add_provider(
+        name='pools',
+        provider=_execution_pools,
+        cache=True,
+    )
+    container.add_provider(
+        name='registry',
+        provider=_method_registry,
+        cache=True,
+    )
+    container.add_provider(
+        name='request_limits',
+        provider=_request_limits,
+        cache=True,
+    )
+    container.add_provider(
+        name='idempotency_store',
+        provider=_idempotency_store,
+        cache=True,
+    )
+    container.add_provider(
+        name='metrics',
+        provider=_metrics,
+        cache=True,
+    )
+    container.add_provider(
+        name='memory_budget',
+        provider=_memory_budget,
+        cache=True,
+    )
 
     container.add_service(
         partial(_forecast_average_method),
@@ -66,6 +124,89 @@ def create_container(ini_path=None) -> Container:
         name='services.methods.holtwinter_parse_params'
     )
 
+    container.add_service(
+        partial(_forecast_ses_method),
+        name='services.methods.ses',
+    )
+    container.add_service(
+        partial(_forecast_ses_model),
+        name='services.methods.ses_model',
+    )
+    container.add_service(
+        partial(_forecast_ses_params),
+        name='services.methods.ses_parse_params'
+    )
+
+    container.add_service(
+        partial(_forecast_theta_method),
+        name='services.methods.theta',
+    )
+    container.add_service(
+        partial(_forecast_theta_model),
+        name='services.methods.theta_model',
+    )
+    container.add_service(
+        partial(_forecast_theta_params),
+        name='services.methods.theta_parse_params'
+    )
+
+    container.add_service(
+        partial(_forecast_seasonal_naive_method),
+        name='services.methods.seasonal_naive',
+    )
+    container.add_service(
+        partial(_forecast_seasonal_naive_model),
+        name='services.methods.seasonal_naive_model',
+    )
+    container.add_service(
+        partial(_forecast_seasonal_naive_params),
+        name='services.methods.seasonal_naive_parse_params'
+    )
+
+    container.add_service(
+        partial(_forecast_croston_method),
+        name='services.methods.croston',
+    )
+    container.add_service(
+        partial(_forecast_croston_model),
+        name='services.methods.croston_model',
+    )
+    container.add_service(
+        partial(_forecast_croston_params),
+        name='services.methods.croston_parse_params'
+    )
+
+    container.add_service(
+        partial(_forecast_double_seasonal_method),
+        name='services.methods.double_seasonal',
+    )
+    container.add_service(
+        partial(_forecast_double_seasonal_model),
+        name='services.methods.double_seasonal_model',
+    )
+    container.add_service(
+        partial(_forecast_double_seasonal_params),
+        name='services.methods.double_seasonal_parse_params'
+    )
+
+    container.add_service(
+        partial(_configured_pool, 'backtest_folds_pool'),
+        name='services.pools.backtest',
+    )
+    container.add_service(
+        partial(_configured_pool, 'multistart_pool'),
+        name='services.pools.multistart',
+    )
+
+    container.add_service(
+        partial(_forecast_auto_method),
+        name='services.methods.auto',
+    )
+    container.add_service(
+        partial(_forecast_auto_params),
+        name='services.methods.auto_parse_params'
+    )
+
     return container
 
 
@@ -89,13 +230,14 @@ def _forecast_holt_params(c):
 
 
 def _forecast_holt_model(c):
-    return partial(smholt)
+    return LazyImport('statsmodels.tsa.api', 'Holt')
 
 
 def _forecast_holt_method(c):
     return Holt(
         c('services.methods.holt_parse_params'),
-        c('services.methods.holt_model')
+        c('services.methods.holt_model'),
+        c('services.pools.multistart'),
     )
 
 
@@ -104,16 +246,188 @@ def _forecast_holtwinter_params(c):
 
 
 def _forecast_holtwinter_model(c):
-    return partial(smholtwinter)
+    return LazyImport('statsmodels.tsa.api', 'ExponentialSmoothing')
 
 
 def _forecast_holtwinter_method(c):
     return HoltWinter(
         c('services.methods.holtwinter_parse_params'),
-        c('services.methods.holtwinter_model')
+        c('services.methods.holtwinter_model'),
+        c('services.pools.multistart'),
+    )
+
+
+def _forecast_ses_params(c):
+    return partial(ses_parse_params)
+
+
+def _forecast_ses_model(c):
+    return partial(ses_model)
+
+
+def _forecast_ses_method(c):
+    return SES(
+        c('services.methods.ses_parse_params'),
+        c('services.methods.ses_model')
+    )
+
+
+def _forecast_theta_params(c):
+    return partial(theta_parse_params)
+
+
+def _forecast_theta_model(c):
+    return partial(theta_model)
+
+
+def _forecast_theta_method(c):
+    return Theta(
+        c('services.methods.theta_parse_params'),
+        c('services.methods.theta_model')
+    )
+
+
+def _forecast_seasonal_naive_params(c):
+    return partial(seasonal_naive_parse_params)
+
+
+def _forecast_seasonal_naive_model(c):
+    return partial(seasonal_naive_model)
+
+
+def _forecast_seasonal_naive_method(c):
+    return SeasonalNaive(
+        c('services.methods.seasonal_naive_parse_params'),
+        c('services.methods.seasonal_naive_model')
+    )
+
+
+def _forecast_croston_params(c):
+    return partial(croston_parse_params)
+
+
+def _forecast_croston_model(c):
+    return partial(croston_model)
+
+
+def _forecast_croston_method(c):
+    return Croston(
+        c('services.methods.croston_parse_params'),
+        c('services.methods.croston_model')
+    )
+
+
+def _forecast_double_seasonal_params(c):
+    return partial(double_seasonal_parse_params)
+
+
+def _forecast_double_seasonal_model(c):
+    return partial(double_seasonal_model)
+
+
+def _forecast_double_seasonal_method(c):
+    return DoubleSeasonalHoltWinter(
+        c('services.methods.double_seasonal_parse_params'),
+        c('services.methods.double_seasonal_model')
+    )
+
+
+# name, cost, pool, memory per point and overhead in bytes: peaks measured with tracemalloc, rounded up
+# (holt and holtwinter are estimated from the size of the statsmodels results they keep)
+_METHODS = (
+    ('average', COST_CHEAP, POOL_INLINE, 900, 64 * 2**10),
+    ('holt', COST_EXPENSIVE, POOL_INLINE, 160, 256 * 2**10),
+    ('holtwinter', COST_EXPENSIVE, POOL_INLINE, 240, 256 * 2**10),
+    ('ses', COST_CHEAP, POOL_INLINE, 40, 16 * 2**10),
+    ('theta', COST_CHEAP, POOL_INLINE, 64, 16 * 2**10),
+    ('seasonal_naive', COST_CHEAP, POOL_INLINE, 128, 16 * 2**10),
+    ('croston', COST_CHEAP, POOL_INLINE, 48, 16 * 2**10),
+    ('double_seasonal', COST_EXPENSIVE, POOL_INLINE, 80, 128 * 2**10),
+    ('auto', COST_EXPENSIVE, POOL_INLINE, 256, 256 * 2**10),
+)
+
+
+def _execution_pools(c):
+    return ExecutorPools(c('config'))
+
+
+def _method_registry(c):
+    """Registry of the built-in methods plus those installed under the forecast_api.methods entry point.
+
+    A method's execution pool can be overridden with ``<method>_pool`` in the
+    ``[forecast_api]`` section of the config.
+    """
+    config = c('config')
+    registry = MethodRegistry(c, c('pools'))
+    for name, cost, pool, memory_per_point, memory_overhead in _METHODS:
+        pool = config.get('forecast_api', f'{name}_pool', fallback=pool)
+        registry.register(MethodSpec.from_services(
+            name, cost=cost, pool=pool, memory_per_point=memory_per_point, memory_overhead=memory_overhead
+        ))
+    registry.load_entry_points()
+    return registry
+
+
+_WARM_UP_DATA = [1.0, 2.0, 3.0, 2.0, 1.0, 2.0, 3.0, 2.0, 1.0, 2.0, 3.0, 2.0]
+_WARM_UP_FITS = (
+    ('average', {'window': 2}),
+    ('holt', {}),
+    ('holtwinter', {'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 4}),
+    ('ses', {}),
+    ('theta', {'seasonal_periods': 4}),
+    ('seasonal_naive', {}),
+    ('croston', {}),
+    ('double_seasonal', {'seasonal_periods': [2, 4]}),
+)
+
+
+def warm_up(container):
+    """Import the heavy dependencies and run a tiny fit for every method.
+
+    Meant to run in the uWSGI master before it forks its workers, so the
+    imported modules are shared copy-on-write instead of being imported again
+    by every worker on its first request.
+    """
+    registry = container('registry')
+    for name, params in _WARM_UP_FITS:
+        try:
+            registry.engine(name).fit_forecast(_WARM_UP_DATA, 2, **params)
+        except Exception:
+            _log.exception(f'warm up of {name} failed')
+
+
+def _forecast_auto_params(c):
+    return partial(auto_parse_params)
+
+
+def _forecast_auto_method(c):
+    return Auto(
+        c('services.methods.auto_parse_params'),
+        c('registry'),
+        _configured_pool('auto_candidates_pool', c)
     )
 
 
+def _configured_pool(option, c):
+    return c('pools')[c('config').get('forecast_api', option, fallback=POOL_THREADS)]
+
+
+def _request_limits(c):
+    return request_limits(c('config'))
+
+
+def _idempotency_store(c):
+    return idempotency_store(c('config'))
+
+
+def _metrics(c):
+    return Metrics()
+
+
+def _memory_budget(c):
+    return memory_budget(c('config'), c('metrics'))
+
+
 def _read_config(c) -> ConfigParser:
     config = ConfigParser()
     assert config.read(c.get('ini_path')), 'Cannot read config file'
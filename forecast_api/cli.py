@@ -0,0 +1,338 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+
+from forecast_api.app import create_container
+from forecast_api.lib.batch import (
+    CSV_CHUNK_SIZE,
+    SERIES_COLUMN,
+    VALUE_COLUMN,
+    WRITE_BATCH_SIZE,
+    Checkpoint,
+    fit_series,
+    open_writer,
+    read_series,
+)
+from forecast_api.lib.panel import read_panel
+from forecast_api.lib.openapi import openapi_document
+from forecast_api.rpc.cluster import (
+    DEFAULT_HEARTBEAT_TIMEOUT,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_SHARD_SIZE,
+    Coordinator,
+    Worker,
+    check_listen,
+    parse_address,
+)
+
+DEFAULT_RPC_SOCKET = '/tmp/forecast_api.sock'
+DEFAULT_COORDINATOR_PORT = 7070
+# the shared secret of a coordinator and its workers, kept off the command line where ps and /proc show it
+CLUSTER_TOKEN_ENV = 'FORECAST_API_CLUSTER_TOKEN'
+
+_engine = None
+
+
+def _init_worker(ini_path, method):
+    """Build the container once per worker process, so every series is fitted exactly as the API would."""
+    global _engine
+    _engine = create_container(ini_path)('registry').engine(method)
+
+
+def _fit_series(series_id, values, forecast_horizon, params):
+    return fit_series(_engine, series_id, values, forecast_horizon, params)
+
+
+class _Progress:
+
+    def __init__(self, interval, stream=sys.stderr):
+        self._interval = interval
+        self._stream = stream
+        self._started = self._reported = time.perf_counter()
+        self.done = self.failed = self.skipped = 0
+
+    def update(self, results, final=False):
+        self.done += len(results)
+        self.failed += sum('error' in result for result in results)
+        now = time.perf_counter()
+        if final or now - self._reported >= self._interval:
+            self._reported = now
+            elapsed = now - self._started
+            self._stream.write(
+                f'{self.done} series done ({self.failed} failed, {self.skipped} skipped) in {elapsed:.1f}s, '
+                f'{self.done / max(elapsed, 1e-9):.1f} series/s\n'
+            )
+            self._stream.flush()
+
+
+def _read_input(args):
+    if args.unsorted or args.timestamp_column or os.path.splitext(args.input)[1].lower() == '.arrow':
+        return read_panel(args.input, args.series_column, args.value_column, args.timestamp_column)
+    return read_series(args.input, args.series_column, args.value_column, args.chunk_size)
+
+
+def batch(args):
+    ini_path = args.config or os.environ['FORECAST_API_CONFIG']
+    writer = open_writer(args.output)
+    checkpoint = Checkpoint(args.checkpoint or f'{args.output}.checkpoint')
+    progress = _Progress(args.progress_interval)
+    workers = args.workers or os.cpu_count()
+    max_in_flight = args.max_in_flight or 2 * workers
+
+    series = _read_input(args)
+
+    pending, buffered = set(), []
+
+    def _flush(final=False):
+        if buffered:
+            writer.write(buffered)
+            # only checkpointed once written, so a crash can repeat but never lose a series
+            checkpoint.add([result['series_id'] for result in buffered])
+        progress.update(buffered, final)
+        buffered.clear()
+
+    def _collect(futures):
+        buffered.extend(future.result() for future in futures)
+        if len(buffered) >= args.write_batch_size:
+            _flush()
+
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ini_path, args.method)) as executor:
+            for series_id, values in series:
+                if series_id in checkpoint:
+                    progress.skipped += 1
+                    continue
+                # the in-flight bound keeps memory flat however large the input is
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect(done)
+                pending.add(executor.submit(_fit_series, series_id, np.array(values), args.forecast_horizon,
+                                            args.params))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done)
+        _flush(final=True)
+    finally:
+        writer.close()
+        checkpoint.close()
+    return 1 if progress.failed else 0
+
+
+def openapi(args):
+    document = openapi_document(create_container(args.config)('registry'))
+    if args.output and os.path.splitext(args.output)[1].lower() in ('.yml', '.yaml'):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError('writing YAML requires PyYAML to be installed')
+        content = yaml.safe_dump(document, sort_keys=False)
+    else:
+        content = json.dumps(document, indent=2) + '\n'
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(content)
+    else:
+        sys.stdout.write(content)
+    return 0
+
+
+def _cluster_token(args):
+    """The shared secret of the cluster: from --token-file, else $FORECAST_API_CLUSTER_TOKEN, else --token."""
+    if args.token_file:
+        with open(args.token_file) as f:
+            return f.read().strip() or None
+    return os.environ.get(CLUSTER_TOKEN_ENV) or args.token
+
+
+def coordinator(args):
+    host, port = parse_address(args.listen)
+    token = _cluster_token(args)
+    try:
+        check_listen(host, token)
+    except ValueError as e:
+        sys.stderr.write(f'{e}, set ${CLUSTER_TOKEN_ENV} or give --token-file\n')
+        return 2
+
+    writer = open_writer(args.output)
+    checkpoint = Checkpoint(args.checkpoint or f'{args.output}.checkpoint')
+    progress = _Progress(args.progress_interval)
+
+    def _unfinished(series):
+        for series_id, values in series:
+            if series_id in checkpoint:
+                progress.skipped += 1
+                continue
+            yield series_id, np.asarray(values, dtype=float)
+
+    try:
+        with Coordinator(host, port, args.heartbeat_timeout, args.max_attempts, token) as cluster:
+            sys.stderr.write(f'coordinator listening on {cluster.address[0]}:{cluster.address[1]}\n')
+            results = cluster.run(args.method, _unfinished(_read_input(args)), args.forecast_horizon, args.params,
+                                  args.shard_size)
+            for shard_results in results:
+                writer.write(shard_results)
+                checkpoint.add([result['series_id'] for result in shard_results])
+                progress.update(shard_results)
+        progress.update([], final=True)
+    finally:
+        writer.close()
+        checkpoint.close()
+    return 1 if progress.failed else 0
+
+
+def worker(args):
+    registry = create_container(args.config)('registry')
+    Worker(registry, parse_address(args.coordinator), args.slots, token=_cluster_token(args),
+           connect_timeout=args.connect_timeout).run()
+    return 0
+
+
+def rpc(args):
+    from forecast_api.lib.streaming import request_limits
+    from forecast_api.rpc.server import RpcServer
+
+    container = create_container(args.config)
+    config = container('config')
+    path = args.socket or config.get('forecast_api', 'rpc_socket', fallback=DEFAULT_RPC_SOCKET)
+    threads = args.threads or config.getint('forecast_api', 'rpc_threads', fallback=None)
+    max_frame_bytes = request_limits(config).max_body_bytes
+    RpcServer(container('registry'), path, threads=threads, max_frame_bytes=max_frame_bytes).run()
+    return 0
+
+
+def rpc_benchmark(args):
+    from forecast_api.rpc.benchmark import benchmark
+    from forecast_api.wsgi import create_callable
+
+    container = create_container(args.config)
+    results = benchmark(container, create_callable(container), args.method, args.calls, args.length,
+                        args.forecast_horizon, args.params, args.threads)
+    for name, result in results.items():
+        sys.stdout.write(
+            f'{name:>14}: {result["calls_per_second"]:10.1f} calls/s '
+            f'({1000 * result["seconds"] / result["calls"]:.3f} ms per call)\n'
+        )
+    return 0
+
+
+def _add_input_arguments(parser):
+    parser.add_argument('input', help='.npy (one series per row), .csv or .parquet file')
+    parser.add_argument('output', help='.jsonl, .csv or .parquet file')
+    parser.add_argument('--method', default='average', help='forecast method (default: average)')
+    parser.add_argument('--params', type=json.loads, default={}, help='method params as a JSON object')
+    parser.add_argument('--forecast-horizon', type=int, required=True)
+    parser.add_argument('--series-column', default=SERIES_COLUMN)
+    parser.add_argument('--value-column', default=VALUE_COLUMN)
+    parser.add_argument('--timestamp-column', help='order the values of every series by this column')
+    parser.add_argument('--unsorted', action='store_true',
+                        help='rows of a series are not together: read whole columns and group them in memory')
+    parser.add_argument('--chunk-size', type=int, default=CSV_CHUNK_SIZE, help='rows read at a time')
+    parser.add_argument('--checkpoint', help='file of finished series ids (default: <output>.checkpoint)')
+    parser.add_argument('--progress-interval', type=float, default=10.0, help='seconds between reports')
+
+
+def _add_token_arguments(parser, description):
+    parser.add_argument('--token-file', help=f'file holding the {description} (else read from ${CLUSTER_TOKEN_ENV})')
+    parser.add_argument('--token', help=f'the {description} itself, visible to every user of the host '
+                                        f'(only used without --token-file and ${CLUSTER_TOKEN_ENV})')
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='forecast-api')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = commands.add_parser(
+        'batch',
+        help='forecast every series of a file',
+        description='Fit and forecast every series of a .npy, long-format .csv or .parquet file, '
+                    'writing the results incrementally to .jsonl, .csv or .parquet.',
+    )
+    _add_input_arguments(batch_parser)
+    batch_parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    batch_parser.add_argument('--max-in-flight', type=int, help='series queued at once (default: 2 per worker)')
+    batch_parser.add_argument('--write-batch-size', type=int, default=WRITE_BATCH_SIZE,
+                              help='results buffered before a write')
+    batch_parser.add_argument('--config', help='ini file (default: $FORECAST_API_CONFIG)')
+    batch_parser.set_defaults(run=batch)
+
+    coordinator_parser = commands.add_parser(
+        'coordinator',
+        help='forecast every series of a file on remote workers',
+        description='Like batch, but the series are sent in shards to the workers (forecast-api worker) '
+                    'registered over TCP, on this or other hosts.',
+    )
+    _add_input_arguments(coordinator_parser)
+    coordinator_parser.add_argument('--listen', default=f'127.0.0.1:{DEFAULT_COORDINATOR_PORT}',
+                                    help='host:port the workers connect to (default: %(default)s); '
+                                         'any other than loopback needs a token')
+    coordinator_parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='series per shard')
+    coordinator_parser.add_argument('--heartbeat-timeout', type=float, default=DEFAULT_HEARTBEAT_TIMEOUT,
+                                    help='seconds of silence after which a worker is lost and its shards retried')
+    coordinator_parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                                    help='workers a shard is tried on before its series are reported as failed')
+    _add_token_arguments(coordinator_parser, 'shared secret the workers must register with')
+    coordinator_parser.set_defaults(run=coordinator)
+
+    worker_parser = commands.add_parser(
+        'worker',
+        help='run the shards of a coordinator',
+        description='Register with a coordinator and fit the shards it sends with the methods of the config.',
+    )
+    worker_parser.add_argument('coordinator', help='host:port of the coordinator')
+    worker_parser.add_argument('--slots', type=int, default=1, help='shards run at once (default: 1)')
+    worker_parser.add_argument('--connect-timeout', type=float, default=60.0,
+                               help='seconds to keep trying to reach the coordinator')
+    _add_token_arguments(worker_parser, 'shared secret of the coordinator')
+    worker_parser.add_argument('--config', help='ini file (default: $FORECAST_API_CONFIG)')
+    worker_parser.set_defaults(run=worker)
+
+    openapi_parser = commands.add_parser(
+        'openapi',
+        help='write the OpenAPI document',
+        description='Generate the OpenAPI document of the registered methods from their param specs.',
+    )
+    openapi_parser.add_argument('output', nargs='?', help='.json or .yml file (default: JSON on stdout)')
+    openapi_parser.add_argument('--config', help='ini file (default: $FORECAST_API_CONFIG)')
+    openapi_parser.set_defaults(run=openapi)
+
+    rpc_parser = commands.add_parser(
+        'rpc',
+        help='serve forecasts over a Unix socket',
+        description='Serve the registered methods to co-located callers over a Unix domain socket '
+                    '(length prefixed msgpack frames, see forecast_api.rpc.client.RpcClient).',
+    )
+    rpc_parser.add_argument('--socket', help=f'socket path (default: rpc_socket of the config or {DEFAULT_RPC_SOCKET})')
+    rpc_parser.add_argument('--threads', type=int, help='threads running requests (default: number of CPUs)')
+    rpc_parser.add_argument('--config', help='ini file (default: $FORECAST_API_CONFIG)')
+    rpc_parser.set_defaults(run=rpc)
+
+    rpc_benchmark_parser = commands.add_parser(
+        'rpc-benchmark',
+        help='compare the RPC and HTTP paths',
+        description='Time the same forecasts over HTTP + JSON and over RPC, one at a time and pipelined.',
+    )
+    rpc_benchmark_parser.add_argument('--method', default='average', help='forecast method (default: average)')
+    rpc_benchmark_parser.add_argument('--params', type=json.loads, help='method params as a JSON object')
+    rpc_benchmark_parser.add_argument('--calls', type=int, default=1000, help='forecasts per path')
+    rpc_benchmark_parser.add_argument('--length', type=int, default=100, help='points per series')
+    rpc_benchmark_parser.add_argument('--forecast-horizon', type=int, default=10)
+    rpc_benchmark_parser.add_argument('--threads', type=int, help='threads of the RPC server')
+    rpc_benchmark_parser.add_argument('--config', help='ini file (default: $FORECAST_API_CONFIG)')
+    rpc_benchmark_parser.set_defaults(run=rpc_benchmark)
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def mae(actual, forecast):
+    """Mean absolute error."""
+    return float(np.mean(np.abs(np.asarray(actual, dtype=float) - np.asarray(forecast, dtype=float))))
+
+
+def rmse(actual, forecast):
+    """Root mean squared error."""
+    return float(np.sqrt(np.mean((np.asarray(actual, dtype=float) - np.asarray(forecast, dtype=float))**2)))
+
+
+def mape(actual, forecast):
+    """Mean absolute percentage error (nan if any actual value is zero)."""
+    actual = np.asarray(actual, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(100 * np.mean(np.abs((actual - np.asarray(forecast, dtype=float)) / actual)))
+
+
+def naive_scale(training, seasonal_periods=1):
+    """Mean absolute error of the (seasonal) naive one-step forecast over ``training``, the MASE denominator."""
+    training = np.asarray(training, dtype=float)
+    if len(training) <= seasonal_periods:
+        return float('nan')
+    return float(np.mean(np.abs(training[seasonal_periods:] - training[:-seasonal_periods])))
+
+
+def mase(actual, forecast, training, seasonal_periods=1):
+    """Mean absolute scaled error against the in-sample (seasonal) naive forecast of ``training``."""
+    scale = naive_scale(training, seasonal_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(mae(actual, forecast)) / scale)
+
+
+def aic(sse, nobs, n_params):
+    """Akaike information criterion of a least squares fit with Gaussian errors."""
+    return float(nobs * np.log(max(sse, np.finfo(float).tiny) / nobs) + 2 * n_params)
+
+
+def aicc(sse, nobs, n_params):
+    """AIC with the small sample correction; infinite when there are too few observations."""
+    if nobs - n_params - 1 <= 0:
+        return float('inf')
+    return aic(sse, nobs, n_params) + 2 * n_params * (n_params + 1) / (nobs - n_params - 1)
@@ -0,0 +1,81 @@
+import numpy as np
+
+from forecast_api.lib.accuracy import (
+    mae,
+    mape,
+    mase,
+    rmse,
+)
+from forecast_api.lib.exceptions import InvalidBacktestParameter
+from forecast_api.lib.param_parsers import parse_integer_param
+from forecast_api.lib.pools import InlineExecutor
+
+
+def fold_cutoffs(length, forecast_horizon, initial_window, step=1):
+    """Rolling origins: fold k is fitted on ``[:cutoffs[k]]`` and scored on the next ``forecast_horizon`` points."""
+    forecast_horizon = parse_integer_param('forecast_horizon', forecast_horizon, param_min=1)
+    initial_window = parse_integer_param('initial_window', initial_window, param_min=1)
+    step = parse_integer_param('step', step, param_min=1)
+    cutoffs = list(range(initial_window, length - forecast_horizon + 1, step))
+    if not cutoffs:
+        raise InvalidBacktestParameter(
+            f'input_data of length {length} is too short for initial_window = {initial_window} '
+            f'and forecast_horizon = {forecast_horizon}'
+        )
+    return cutoffs
+
+
+def fit_folds(fit_forecast, input_array, cutoffs, forecast_horizon, executor=None, **params):
+    """Forecasts of every fold, each fitted from scratch; the folds run in parallel on ``executor``."""
+    executor = executor or InlineExecutor()
+    futures = [
+        executor.submit(fit_forecast, input_array[:cutoff], forecast_horizon, **params)
+        for cutoff in cutoffs
+    ]
+    return [np.asarray(future.result()['forecast'], dtype=float) for future in futures]
+
+
+def filter_folds(model, state, input_array, cutoffs, forecast_horizon, **coefficients):
+    """Forecasts of every fold with fixed coefficients, continuing the filter from one cutoff to the next."""
+    phi = coefficients.get('phi', 1.0)
+    forecasts = []
+    start = 0
+    for cutoff in cutoffs:
+        state, _ = model.filter(input_array[start:cutoff], state, **coefficients)
+        forecasts.append(model.forecast(state, forecast_horizon, phi))
+        start = cutoff
+    return forecasts
+
+
+def score_folds(input_array, cutoffs, forecasts, forecast_horizon, seasonal_periods=1):
+    """Per fold and aggregate MAE, RMSE, MAPE and MASE; undefined scores are reported as None."""
+    folds = []
+    for cutoff, forecast in zip(cutoffs, forecasts):
+        actual = input_array[cutoff:cutoff + forecast_horizon]
+        folds.append({
+            'cutoff': cutoff,
+            'forecast': list(forecast),
+            'actual': list(actual),
+            'mae': mae(actual, forecast),
+            'rmse': rmse(actual, forecast),
+            'mape': mape(actual, forecast),
+            'mase': mase(actual, forecast, input_array[:cutoff], seasonal_periods),
+        })
+
+    errors = np.concatenate([np.asarray(fold['actual']) - fold['forecast'] for fold in folds])
+    actuals = np.concatenate([fold['actual'] for fold in folds])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aggregate = {
+            'mae': float(np.mean(np.abs(errors))),
+            'rmse': float(np.sqrt(np.mean(errors**2))),
+            'mape': float(100 * np.mean(np.abs(errors / actuals))),
+            'mase': float(np.mean([fold['mase'] for fold in folds])),
+        }
+    for scores in folds + [aggregate]:
+        for name in ('mae', 'rmse', 'mape', 'mase'):
+            if not np.isfinite(scores[name]):
+                scores[name] = None
+    return {
+        'folds': folds,
+        'aggregate': aggregate,
+    }
@@ -0,0 +1,198 @@
+import csv
+import json
+import logging
+import os
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.serialization import json_default
+
+_log = logging.getLogger(__name__)
+
+SERIES_COLUMN = 'series_id'
+VALUE_COLUMN = 'value'
+CSV_CHUNK_SIZE = 100000
+WRITE_BATCH_SIZE = 1000
+
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('reading or writing Parquet files requires pyarrow to be installed')
+    return pyarrow.parquet
+
+
+def fit_series(engine, series_id, values, forecast_horizon, params):
+    """Result of one series of a batch: ``series_id`` with ``forecast`` and ``params``, or with ``error``.
+
+    Whatever a series raises is its ``error``, so one series never stops
+    the batch, as one request of the API never stops the others.
+    """
+    try:
+        result = engine.fit_forecast(np.asarray(values, dtype=float), forecast_horizon, **params)
+    except (InvalidParameter, ValueError) as e:
+        return {'series_id': series_id, 'error': str(e)}
+    except Exception as e:
+        _log.exception(f'Problem forecasting series {series_id}')
+        return {'series_id': series_id, 'error': str(e)}
+    return {'series_id': series_id, 'forecast': result['forecast'], 'params': result['params']}
+
+
+def _grouped(chunks, series_column, value_column):
+    """Series of long-format ``chunks`` (DataFrames), whose rows must be grouped by series; a series may span chunks."""
+    current_id, parts = None, []
+    for chunk in chunks:
+        ids = chunk[series_column].to_numpy()
+        values = chunk[value_column].to_numpy(dtype=float)
+        if not len(ids):
+            continue
+        starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        for start, end in zip(np.concatenate(([0], starts)), np.concatenate((starts, [len(ids)]))):
+            if ids[start] != current_id:
+                if parts:
+                    yield str(current_id), np.concatenate(parts)
+                current_id, parts = ids[start], []
+            parts.append(values[start:end])
+    if parts:
+        yield str(current_id), np.concatenate(parts)
+
+
+def read_series(path, series_column=SERIES_COLUMN, value_column=VALUE_COLUMN, chunk_size=CSV_CHUNK_SIZE):
+    """Yield ``(series_id, values)`` of every series in ``path`` without loading the whole file.
+
+    ``.npy`` files hold one series per row (or a single series) and are
+    memory-mapped, the row number is the series id. CSV and Parquet files are
+    in long format, one value per line, with the lines of a series together
+    and in time order; they are read ``chunk_size`` lines at a time.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        array = np.load(path, mmap_mode='r')
+        for index, row in enumerate(np.atleast_2d(array)):
+            yield str(index), row
+    elif extension == '.csv':
+        import pandas as pd
+
+        chunks = pd.read_csv(path, usecols=[series_column, value_column], chunksize=chunk_size)
+        yield from _grouped(chunks, series_column, value_column)
+    elif extension == '.parquet':
+        parquet_file = _pyarrow_parquet().ParquetFile(path)
+        chunks = (
+            batch.to_pandas()
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[series_column, value_column])
+        )
+        yield from _grouped(chunks, series_column, value_column)
+    else:
+        raise ValueError(f'unsupported input file {path} (expected .npy, .csv or .parquet)')
+
+
+class JsonLinesWriter:
+    """One JSON object per series: ``series_id``, ``forecast``, ``params`` (or ``error``)."""
+
+    def __init__(self, path):
+        self._file = open(path, 'a')
+
+    def write(self, results):
+        for result in results:
+            self._file.write(json.dumps(result, default=json_default) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvWriter:
+    """Long format, one forecast step per line: ``series_id``, ``step``, ``forecast``; failed series are left out."""
+
+    def __init__(self, path):
+        new = not os.path.exists(path) or not os.path.getsize(path)
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow([SERIES_COLUMN, 'step', 'forecast'])
+
+    def write(self, results):
+        for result in results:
+            for step, value in enumerate(result.get('forecast', ()), start=1):
+                self._writer.writerow([result['series_id'], step, float(value)])
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Columns ``series_id``, ``forecast`` (list of doubles), ``params`` and ``error`` (JSON strings).
+
+    Parquet files cannot be appended to, so a resumed run writes the next
+    free ``<name>.<n>.parquet`` beside ``path``.
+    """
+
+    def __init__(self, path):
+        self._parquet = _pyarrow_parquet()
+        import pyarrow
+
+        self._pyarrow = pyarrow
+        root, extension = os.path.splitext(path)
+        part = 0
+        while os.path.exists(path):
+            part += 1
+            path = f'{root}.{part}{extension}'
+        self._schema = pyarrow.schema([
+            ('series_id', pyarrow.string()),
+            ('forecast', pyarrow.list_(pyarrow.float64())),
+            ('params', pyarrow.string()),
+            ('error', pyarrow.string()),
+        ])
+        self._writer = self._parquet.ParquetWriter(path, self._schema)
+
+    def write(self, results):
+        table = self._pyarrow.Table.from_pydict({
+            'series_id': [result['series_id'] for result in results],
+            'forecast': [np.asarray(result.get('forecast', []), dtype=float).tolist() for result in results],
+            'params': [json.dumps(result.get('params'), default=json_default) for result in results],
+            'error': [result.get('error') for result in results],
+        }, schema=self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {
+    '.jsonl': JsonLinesWriter,
+    '.csv': CsvWriter,
+    '.parquet': ParquetWriter,
+}
+
+
+def open_writer(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f'unsupported output file {path} (expected {", ".join(WRITERS)})')
+    return WRITERS[extension](path)
+
+
+class Checkpoint:
+    """Ids of the series already written, one per line, appended once their results are in the output."""
+
+    def __init__(self, path):
+        self._path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.rstrip('\n') for line in f if line.strip()}
+        self._file = open(path, 'a')
+
+    def __contains__(self, series_id):
+        return series_id in self.done
+
+    def add(self, series_ids):
+        for series_id in series_ids:
+            self._file.write(f'{series_id}\n')
+            self.done.add(series_id)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,145 @@
+import contextvars
+import threading
+import time
+
+from contextlib import contextmanager
+
+from forecast_api.lib.accuracy import aic
+
+# phases a fit reports its wall time in, ``total`` being the whole call
+PHASE_PARSE = 'parse'
+PHASE_FIT = 'fit'
+PHASE_FORECAST = 'forecast'
+PHASE_INTERVALS = 'intervals'
+PHASE_TOTAL = 'total'
+
+_current = contextvars.ContextVar('fit_diagnostics', default=None)
+
+
+class FitDiagnostics:
+    """Effort of one call: its optimizer runs (iterations, function evaluations, convergence), wall time per phase.
+
+    Recording is thread safe: the refinements of a multistart fit record
+    from the threads they run on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.optimizer_runs = 0
+        self.iterations = 0
+        self.function_evaluations = 0
+        self.unconverged_runs = 0
+        self.message = None
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_optimizer_run(self, iterations, function_evaluations, converged, message=None):
+        with self._lock:
+            self.optimizer_runs += 1
+            self.iterations += iterations or 0
+            self.function_evaluations += function_evaluations or 0
+            if not converged:
+                self.unconverged_runs += 1
+                self.message = self.message or message
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'phases': dict(self.phases),
+                'optimizer_runs': self.optimizer_runs,
+                'iterations': self.iterations,
+                'function_evaluations': self.function_evaluations,
+                # None when nothing was optimized (coefficients given, or fitted in closed form)
+                'converged': self.unconverged_runs == 0 if self.optimizer_runs else None,
+                'message': self.message,
+            }
+
+
+@contextmanager
+def collecting():
+    """Collect the diagnostics of what runs in this context (and in contexts copied from it) into a FitDiagnostics."""
+    diagnostics = FitDiagnostics()
+    token = _current.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Add the wall time of the block to phase ``name``; nothing when no diagnostics are collected."""
+    diagnostics = _current.get()
+    if diagnostics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        diagnostics.add_phase(name, time.perf_counter() - started)
+
+
+def record_optimizer(iterations, function_evaluations, converged, message=None):
+    diagnostics = _current.get()
+    if diagnostics is not None:
+        diagnostics.add_optimizer_run(iterations, function_evaluations, converged, message)
+
+
+def record_optimize_result(result):
+    """Record a scipy OptimizeResult (or a basinhopping one, by its lowest minimization); None is ignored."""
+    result = getattr(result, 'lowest_optimization_result', result)
+    if result is None or _current.get() is None:
+        return
+    success = bool(getattr(result, 'success', True))
+    record_optimizer(
+        getattr(result, 'nit', None), getattr(result, 'nfev', None), success,
+        None if success else str(getattr(result, 'message', '')),
+    )
+
+
+def in_current_context(function):
+    """``function`` run in a copy of the current context, so it still records when it runs on another thread.
+
+    Wrap once per submission: a context can only be entered by one thread
+    at a time.
+    """
+    if _current.get() is None:
+        return function
+    context = contextvars.copy_context()
+
+    def _run(*args, **kwargs):
+        return context.run(function, *args, **kwargs)
+    return _run
+
+
+def diagnosed(function, *args, **kwargs):
+    """``(function(*args, **kwargs), the diagnostics of the call as a dict)``.
+
+    Submitted to an execution pool in place of ``function``, so the
+    diagnostics are collected on the thread or in the process the call
+    runs in.
+    """
+    with collecting() as diagnostics:
+        with phase(PHASE_TOTAL):
+            result = function(*args, **kwargs)
+    return result, diagnostics.as_dict()
+
+
+def fit_quality(sse, nobs, n_params):
+    """The in-sample SSE and AIC of a ``fit_evaluate`` result, for its diagnostics."""
+    return {'sse': sse, 'nobs': nobs, 'n_params': n_params, 'aic': aic(sse, nobs, n_params)}
+
+
+def observe_fit(metrics, method, diagnostics):
+    """Aggregate the diagnostics of a call of ``method`` in ``metrics`` (a Metrics)."""
+    for name, seconds in diagnostics['phases'].items():
+        metrics.observe('forecast_fit_phase_seconds', seconds, method=method, phase=name)
+    if diagnostics['optimizer_runs']:
+        metrics.observe('forecast_fit_iterations', diagnostics['iterations'], method=method)
+        metrics.observe('forecast_fit_function_evaluations', diagnostics['function_evaluations'], method=method)
+    if diagnostics['converged'] is False:
+        metrics.increment('forecast_fit_unconverged_total', method=method)
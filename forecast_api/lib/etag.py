@@ -0,0 +1,56 @@
+import hashlib
+import json
+import numpy as np
+
+from forecast_api import __version__
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.fields import parse_fields_param
+from forecast_api.lib.serialization import json_default
+
+
+# the request fields besides input_data and params that change a response
+_REQUEST_FIELDS = ('timestamps', 'frequency', 'aggregation', 'fill')
+
+
+def _canonical_json(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=json_default).encode()
+
+
+def _input_bytes(input_data):
+    """``input_data`` as float64 bytes, so ``[1, 2]`` and ``[1.0, 2.0]`` hash alike; sparse objects as JSON."""
+    if isinstance(input_data, dict):
+        return b'sparse' + _canonical_json(input_data)
+    values = np.ascontiguousarray(input_data, dtype='<f8')
+    return str(values.shape).encode() + values.tobytes()
+
+
+def _simulated_without_seed(params):
+    """Whether ``params`` (parsed or not) ask for Monte Carlo intervals from an unseeded generator."""
+    intervals = params.get('intervals')
+    return isinstance(intervals, dict) and intervals.get('method', 'simulate') == 'simulate' and \
+        intervals.get('seed') is None
+
+
+def forecast_etag(method, operation, media, params):
+    """Strong ETag of a forecast request: a SHA-256 of everything its response depends on.
+
+    That is the method and operation, the canonical (parsed, defaults
+    filled in) ``params``, ``input_data``, ``forecast_horizon``, the
+    regularization fields, the ``fields`` projected onto and the code
+    version, so the tag changes whenever the response could. Returns None if the request cannot be hashed (e.g. non
+    numeric input), such a request fails anyway, and if its response differs from call to call: intervals simulated
+    without a seed.
+    """
+    if _simulated_without_seed(params):
+        return None
+    digest = hashlib.sha256()
+    try:
+        digest.update(_canonical_json([__version__, method, operation, media.get('forecast_horizon')]))
+        digest.update(_canonical_json(params))
+        digest.update(_canonical_json([media.get(field) for field in _REQUEST_FIELDS]))
+        # sorted and de-duplicated, so the same projection spelled differently gives the same tag
+        digest.update(str(parse_fields_param('fields', media.get('fields'))).encode())
+        digest.update(_input_bytes(media['input_data']))
+    except (InvalidParameter, KeyError, TypeError, ValueError):
+        return None
+    return digest.hexdigest()
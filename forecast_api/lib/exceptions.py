@@ -28,3 +28,58 @@ class InvalidStringParameter(InvalidParameter):
 
 class InvalidAverageWindowParameter(InvalidParameter):
     pass
+
+
+class UnknownForecastMethod(Exception):
+    pass
+
+
+class InvalidListParameter(InvalidParameter):
+    pass
+
+
+class InvalidBacktestParameter(InvalidParameter):
+    pass
+
+
+class InvalidIntervalsParameter(InvalidParameter):
+    pass
+
+
+class InvalidScenariosParameter(InvalidParameter):
+    pass
+
+
+class InvalidTimestampsParameter(InvalidParameter):
+    pass
+
+
+class InvalidSparseInputParameter(InvalidParameter):
+    pass
+
+
+class InvalidHierarchyParameter(InvalidParameter):
+    pass
+
+
+class InvalidFieldsParameter(InvalidParameter):
+    pass
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class IdempotencyKeyReused(Exception):
+    pass
+
+
+class IdempotencyKeyInProgress(Exception):
+    pass
+
+
+class RpcError(Exception):
+
+    def __init__(self, kind, message):
+        super().__init__(f'{kind}: {message}')
+        self.kind = kind
@@ -0,0 +1,107 @@
+import contextvars
+import re
+
+from contextlib import contextmanager
+
+from forecast_api.lib.exceptions import InvalidFieldsParameter
+
+_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_selected = contextvars.ContextVar('selected_fields', default=None)
+
+
+class Fields:
+    """A projection of results onto dotted paths, e.g. ``forecast`` and ``params.alpha``.
+
+    A path keeps everything below it; lists of objects (intervals, the
+    results of a panel) are projected item by item. Paths missing from a
+    result are left out, like the outputs a method does not produce.
+    """
+
+    def __init__(self, paths):
+        self.paths = tuple(sorted(set(paths)))
+        # nested dicts of the selected names, None where everything below is kept; sorted, so a path comes
+        # before the longer ones it swallows
+        self._tree = {}
+        for path in self.paths:
+            node = self._tree
+            for name in path[:-1]:
+                node = node.setdefault(name, {})
+                if node is None:
+                    break
+            else:
+                node[path[-1]] = None
+
+    def __str__(self):
+        return ','.join('.'.join(path) for path in self.paths)
+
+    def with_paths(self, *paths):
+        """These fields and ``paths`` (dotted strings) too."""
+        return Fields(self.paths + tuple(tuple(path.split('.')) for path in paths))
+
+    def wants(self, path):
+        """Whether anything at or below the dotted ``path`` is selected."""
+        node = self._tree
+        for name in path.split('.'):
+            if node is None:
+                return True
+            if name not in node:
+                return False
+            node = node[name]
+        return True
+
+    def project(self, result):
+        return _project(result, self._tree)
+
+
+def _project(value, tree):
+    if tree is None:
+        return value
+    if isinstance(value, dict):
+        return {name: _project(value[name], node) for name, node in tree.items() if name in value}
+    if isinstance(value, (list, tuple)):
+        return [_project(item, tree) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def parse_fields_param(param_name, param_value):
+    """Fields of a ``"forecast,params.alpha"`` string or a list of paths; None (everything) if not given."""
+    if param_value is None:
+        return None
+    if isinstance(param_value, str):
+        param_value = param_value.split(',')
+    if not isinstance(param_value, list) or not param_value:
+        raise InvalidFieldsParameter(f'{param_name} ({param_value}) should be a comma separated string or a list')
+    paths = []
+    for path in param_value:
+        names = path.strip().split('.') if isinstance(path, str) else None
+        if not names or not all(_NAME.match(name) for name in names):
+            raise InvalidFieldsParameter(f'{param_name} ({path}) should be dotted names, e.g. params.alpha')
+        paths.append(tuple(names))
+    return Fields(paths)
+
+
+@contextmanager
+def selecting(fields):
+    """Let the outputs computed in this context know which ``fields`` (None for all) are wanted."""
+    token = _selected.set(fields)
+    try:
+        yield
+    finally:
+        _selected.reset(token)
+
+
+def wanted(path):
+    """Whether the output at the dotted ``path`` of the result being computed was asked for."""
+    fields = _selected.get()
+    return fields is None or fields.wants(path)
+
+
+def projected(fields, function, *args, **kwargs):
+    """``function(*args, **kwargs)`` projected onto ``fields``, its unwanted outputs not computed at all.
+
+    Submitted to an execution pool in place of ``function``, so outputs
+    left out are neither computed nor sent back from a process.
+    """
+    with selecting(fields):
+        return fields.project(function(*args, **kwargs))
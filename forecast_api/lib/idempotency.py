@@ -0,0 +1,101 @@
+import threading
+import time
+
+from collections import OrderedDict
+from collections import namedtuple
+
+from forecast_api.lib.exceptions import IdempotencyKeyInProgress
+from forecast_api.lib.exceptions import IdempotencyKeyReused
+
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_WAIT_SECONDS = 300
+
+# body_digest: SHA-256 of the body of the request, a retry must send the same one
+StoredResponse = namedtuple('StoredResponse', ['status', 'media', 'body_digest'], defaults=[None])
+
+
+class _Entry:
+
+    def __init__(self, fingerprint, created):
+        self.fingerprint = fingerprint
+        self.created = created
+        self.done = threading.Event()
+        self.response = None
+
+
+class IdempotencyStore:
+    """Responses of the requests made with an idempotency key, so a retry replays the response instead of the work.
+
+    ``begin`` either hands the key to the caller, who runs the request and
+    then ``complete``s (or ``release``s, when it failed) it, or returns the
+    stored response. A retry of a request still running waits for it, up to
+    ``wait_seconds``. A key reused with another ``fingerprint`` (a
+    different request) is an error. Keys expire after ``ttl_seconds``, and
+    past ``max_entries`` the oldest are evicted. The store belongs to one
+    worker process.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 wait_seconds=DEFAULT_WAIT_SECONDS, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_seconds = wait_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self, key, fingerprint):
+        """The stored response of ``key``, or None when the caller is to run the request."""
+        while True:
+            with self._lock:
+                self._evict()
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = _Entry(fingerprint, self._clock())
+                    return None
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused(f'the idempotency key {key[-1]} was used for another request')
+            if not entry.done.wait(self.wait_seconds):
+                raise IdempotencyKeyInProgress(f'the request of idempotency key {key[-1]} is still running')
+            if entry.response is not None:
+                return entry.response
+            # the first attempt failed and was released: this one runs it again
+
+    def complete(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry.response = response
+            entry.done.set()
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def _evict(self):
+        expired = self._clock() - self.ttl_seconds
+        # entries are in creation order, so the expired ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.created > expired and len(self._entries) < self.max_entries:
+                break
+            if not entry.done.is_set() and entry.created > expired:
+                # never evict a request still running, its retries must wait for it
+                break
+            del self._entries[key]
+
+
+def idempotency_store(config):
+    """IdempotencyStore of ``idempotency_ttl_seconds``, ``idempotency_max_entries`` and ``idempotency_wait_seconds``."""
+    return IdempotencyStore(
+        config.getint('forecast_api', 'idempotency_ttl_seconds', fallback=DEFAULT_TTL_SECONDS),
+        config.getint('forecast_api', 'idempotency_max_entries', fallback=DEFAULT_MAX_ENTRIES),
+        config.getint('forecast_api', 'idempotency_wait_seconds', fallback=DEFAULT_WAIT_SECONDS),
+    )
@@ -0,0 +1,132 @@
+import numpy as np
+
+from functools import partial
+from statistics import NormalDist
+
+from forecast_api.lib.exceptions import InvalidIntervalsParameter
+from forecast_api.lib.params import Field
+from forecast_api.lib.param_parsers import (
+    parse_integer_param,
+    parse_list_param,
+    parse_numeric_param,
+    parse_string_param,
+)
+
+
+INTERVAL_METHODS = ['simulate', 'analytic']
+DEFAULT_LEVELS = [80.0, 95.0]
+DEFAULT_PATHS = 1000
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def parse_intervals_param(param_name, param_value):
+    """``{levels: [...], n_paths: N, method: simulate|analytic, chunk_size: C, seed: S}`` with defaults filled in."""
+    if not isinstance(param_value, dict):
+        raise InvalidIntervalsParameter(f'{param_name} ({param_value}) should be an object (got {type(param_value)})')
+    unknown = set(param_value) - {'levels', 'n_paths', 'method', 'chunk_size', 'seed'}
+    if unknown:
+        raise InvalidIntervalsParameter(f'{param_name} has unknown fields [{", ".join(sorted(unknown))}]')
+
+    levels = DEFAULT_LEVELS
+    if param_value.get('levels') is not None:
+        levels = parse_list_param(
+            f'{param_name}.levels', param_value['levels'],
+            partial(parse_numeric_param, param_min=0, param_max=100), min_length=1
+        )
+        if any(level in (0, 100) for level in levels):
+            raise InvalidIntervalsParameter(f'{param_name}.levels ({levels}) should be strictly between 0 and 100')
+
+    method = 'simulate'
+    if param_value.get('method') is not None:
+        method = parse_string_param(f'{param_name}.method', param_value['method'], INTERVAL_METHODS)
+
+    n_paths = DEFAULT_PATHS
+    if param_value.get('n_paths') is not None:
+        n_paths = parse_integer_param(f'{param_name}.n_paths', param_value['n_paths'], param_min=1)
+
+    chunk_size = DEFAULT_CHUNK_SIZE
+    if param_value.get('chunk_size') is not None:
+        chunk_size = parse_integer_param(f'{param_name}.chunk_size', param_value['chunk_size'], param_min=1)
+
+    seed = None
+    if param_value.get('seed') is not None:
+        seed = parse_integer_param(f'{param_name}.seed', param_value['seed'], param_min=0)
+
+    return {
+        'levels': levels,
+        'method': method,
+        'n_paths': n_paths,
+        'chunk_size': chunk_size,
+        'seed': seed,
+    }
+
+
+INTERVALS_FIELD = Field(
+    'intervals', 'object', 'Prediction intervals of the forecast', parser=parse_intervals_param,
+    schema={
+        'type': 'object',
+        'properties': {
+            'levels': {'type': 'array', 'items': {'type': 'number', 'minimum': 0, 'maximum': 100},
+                       'default': DEFAULT_LEVELS},
+            'method': {'type': 'string', 'enum': INTERVAL_METHODS, 'default': 'simulate'},
+            'n_paths': {'type': 'integer', 'minimum': 1, 'default': DEFAULT_PATHS},
+            'chunk_size': {'type': 'integer', 'minimum': 1, 'default': DEFAULT_CHUNK_SIZE},
+            'seed': {'type': 'integer', 'minimum': 0},
+        },
+        'additionalProperties': False,
+    },
+)
+
+
+def prediction_intervals(model, state, coefficients, input_array, forecast, intervals):
+    """Prediction intervals of ``forecast`` for every level of ``intervals``.
+
+    The one-step residuals of the fit over ``input_array`` (filtered from the
+    initial ``state``) give the error variance. ``simulate`` draws
+    ``n_paths`` normal error paths and smooths them through the fitted
+    model, ``chunk_size`` paths at a time, and takes the quantiles of the
+    simulated values; above one chunk the quantiles are the path weighted
+    mean of the chunk quantiles, so memory stays bounded by the chunk size.
+    ``analytic`` is exact for additive models: their forecast errors are
+    linear in the future innovations, with weights given by the response of
+    the recursion to a single unit innovation.
+    """
+    final_state, predictions = model.filter(input_array, state, **coefficients)
+    residuals = input_array - predictions
+    sigma = float(np.sqrt(np.mean(residuals**2))) if len(residuals) else 0.0
+    forecast = np.asarray(forecast, dtype=float)
+    horizon = len(forecast)
+    quantiles = [(50 - level / 2) / 100 for level in intervals['levels']] + \
+        [(50 + level / 2) / 100 for level in intervals['levels']]
+
+    if intervals['method'] == 'analytic':
+        if model.trend == 'mul' or model.seasonal == 'mul':
+            raise InvalidIntervalsParameter('analytic intervals are only available for additive trend and seasonality')
+        impulse = np.zeros((1, horizon))
+        impulse[0, 0] = 1.0
+        response = model.simulate(final_state, impulse, **coefficients)[0] - \
+            model.simulate(final_state, np.zeros((1, horizon)), **coefficients)[0]
+        weights = np.concatenate(([1.0], response[1:]))
+        standard_error = sigma * np.sqrt(np.cumsum(weights**2))
+        bounds = np.array([forecast + NormalDist().inv_cdf(q) * standard_error for q in quantiles])
+    else:
+        rng = np.random.default_rng(intervals['seed'])
+        bounds = np.zeros((len(quantiles), horizon))
+        remaining = intervals['n_paths']
+        while remaining:
+            size = min(remaining, intervals['chunk_size'])
+            errors = rng.normal(0.0, sigma, size=(size, horizon))
+            paths = model.simulate(final_state, errors, **coefficients)
+            bounds += np.quantile(paths, quantiles, axis=0) * size
+            remaining -= size
+        bounds /= intervals['n_paths']
+
+    n_levels = len(intervals['levels'])
+    return [
+        {
+            'level': level,
+            'lower': list(bounds[index]),
+            'upper': list(bounds[n_levels + index]),
+        }
+        for index, level in enumerate(intervals['levels'])
+    ]
@@ -0,0 +1,34 @@
+import importlib
+
+
+class LazyImport:
+    """Callable stand-in for ``module.attribute`` that imports it on first use.
+
+    Heavy dependencies (statsmodels pulls in pandas, scipy and patsy) are only
+    imported by the worker that actually calls them.
+    """
+
+    def __init__(self, module_name, attribute):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+
+    def resolve(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = getattr(module, self._attribute)
+        return self._target
+
+    @property
+    def resolved(self):
+        return self._target is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getstate__(self):
+        # resolved targets are not necessarily picklable, the names always are
+        return {'_module_name': self._module_name, '_attribute': self._attribute, '_target': None}
+
+    def __repr__(self):
+        return f'LazyImport({self._module_name}.{self._attribute})'
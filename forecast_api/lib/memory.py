@@ -0,0 +1,230 @@
+import logging
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+from contextlib import contextmanager
+
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.pools import POOL_PROCESSES
+
+_log = logging.getLogger(__name__)
+
+
+def rss_bytes():
+    """Current resident set size of this process (0 if it cannot be read)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def private_bytes():
+    """Memory not shared with any other process, e.g. a forked worker's own pages.
+
+    Unlike RSS this does not count pages still shared copy-on-write with the
+    uWSGI master (0 if /proc/self/smaps_rollup is not available).
+    """
+    total = 0
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                    total += int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+    return total
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+SAMPLING_OFF = 'off'
+SAMPLING_RSS = 'rss'
+SAMPLING_TRACEMALLOC = 'tracemalloc'
+SAMPLING_MODES = (SAMPLING_OFF, SAMPLING_RSS, SAMPLING_TRACEMALLOC)
+
+OVER_BUDGET_REJECT = 'reject'
+OVER_BUDGET_REROUTE = 'reroute'
+OVER_BUDGET_ACTIONS = (OVER_BUDGET_REJECT, OVER_BUDGET_REROUTE)
+
+# held by the one block being traced: tracemalloc's peak is process wide, a second block would reset it
+_tracing_lock = threading.Lock()
+
+
+class MemorySample:
+    """What ``sample_memory`` measured.
+
+    ``peak_bytes`` is the memory the block needed above what the process
+    held when it started: the traced peak with ``tracemalloc``, with ``rss``
+    the growth of the peak RSS (or of the RSS when the process had already
+    been larger before). ``rss_delta_bytes`` is what it kept afterwards.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.peak_bytes = 0
+        self.rss_delta_bytes = 0
+
+    def as_dict(self):
+        return {'mode': self.mode, 'peak_bytes': self.peak_bytes, 'rss_delta_bytes': self.rss_delta_bytes}
+
+
+@contextmanager
+def sample_memory(mode=SAMPLING_RSS):
+    """Measure the memory used by the block into the yielded MemorySample.
+
+    ``rss`` only reads /proc and getrusage and is cheap enough for every
+    request; ``tracemalloc`` traces every allocation (several times slower)
+    and, being process wide, also counts other threads running meanwhile.
+    Its peak is process wide too, so blocks sampled with ``tracemalloc``
+    run one at a time. Either way only this process is measured, not the
+    worker process of a process pool.
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f'memory sampling mode {mode} should be one of [{", ".join(SAMPLING_MODES)}]')
+    sample = MemorySample(mode)
+    if mode == SAMPLING_OFF:
+        yield sample
+        return
+
+    rss_before, peak_before = rss_bytes(), peak_rss_bytes()
+    if mode == SAMPLING_TRACEMALLOC:
+        _tracing_lock.acquire()
+        traced_before, started = _start_tracing()
+    try:
+        yield sample
+    finally:
+        rss_after = rss_bytes()
+        if mode == SAMPLING_TRACEMALLOC:
+            try:
+                sample.peak_bytes = max(_stop_tracing(started) - traced_before, 0)
+            finally:
+                _tracing_lock.release()
+        else:
+            peak_after = peak_rss_bytes()
+            peak = peak_after if peak_after > peak_before else max(rss_before, rss_after)
+            sample.peak_bytes = max(peak - rss_before, 0)
+        sample.rss_delta_bytes = rss_after - rss_before
+
+
+def _start_tracing():
+    """``(traced memory, whether tracing was started here)``; if it was already on, its peak is reset."""
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], False
+    tracemalloc.start()
+    return 0, True
+
+
+def _stop_tracing(started):
+    """Traced peak since _start_tracing, tracing stopped again if it was started there."""
+    peak = tracemalloc.get_traced_memory()[1]
+    if started:
+        tracemalloc.stop()
+    return peak
+
+
+def input_length(input_data):
+    """Number of observations of a request's ``input_data`` (a list, an array or a sparse ``{length, ...}``)."""
+    if isinstance(input_data, dict):
+        length = input_data.get('length')
+        return length if isinstance(length, int) and not isinstance(length, bool) else 0
+    try:
+        return len(input_data)
+    except TypeError:
+        return 0
+
+
+class MemoryBudget:
+    """Per worker memory budget: estimates what a fit needs before it runs and samples what it used after.
+
+    A method's estimate is ``memory_overhead + memory_per_point * length``
+    (see MethodSpec). A request whose estimate does not fit in what is left
+    of ``budget_bytes`` besides the worker's current RSS is either rejected
+    or, with ``over_budget = reroute``, sent to ``reroute_pool`` (a process
+    pool, whose memory is not the worker's) as long as the estimate alone
+    fits the budget. Without ``budget_bytes`` every request is admitted.
+    """
+
+    def __init__(self, budget_bytes=None, over_budget=OVER_BUDGET_REJECT, sampling=SAMPLING_OFF, metrics=None,
+                 reroute_pool=POOL_PROCESSES):
+        if over_budget not in OVER_BUDGET_ACTIONS:
+            raise ValueError(f'memory_over_budget ({over_budget}) should be one of [{", ".join(OVER_BUDGET_ACTIONS)}]')
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(f'memory_sampling ({sampling}) should be one of [{", ".join(SAMPLING_MODES)}]')
+        self.budget_bytes = budget_bytes
+        self.over_budget = over_budget
+        self.sampling = sampling
+        self.reroute_pool = reroute_pool
+        self._metrics = metrics
+
+    @staticmethod
+    def estimate(spec, length):
+        return spec.memory_overhead + spec.memory_per_point * length
+
+    def admit(self, spec, length, can_reroute=True):
+        """Name of the pool to run ``spec`` on ``length`` points in; raises PayloadTooLarge when it cannot run."""
+        if self.budget_bytes is None:
+            return spec.pool
+        estimate = self.estimate(spec, length)
+        available = self.budget_bytes - rss_bytes()
+        if estimate <= available:
+            return spec.pool
+        if (self.over_budget == OVER_BUDGET_REROUTE and can_reroute and spec.pool != self.reroute_pool
+                and estimate <= self.budget_bytes):
+            self._count('forecast_memory_rerouted_total', spec.name)
+            _log.info(f'{spec.name} on {length} points needs ~{estimate} bytes, rerouted to {self.reroute_pool}')
+            return self.reroute_pool
+        self._count('forecast_memory_rejected_total', spec.name)
+        raise PayloadTooLarge(
+            f'{spec.name} on {length} points needs ~{estimate} bytes, '
+            f'{max(available, 0)} of the {self.budget_bytes} bytes budget are left'
+        )
+
+    @contextmanager
+    def sample(self, spec, length, pool):
+        """Sample the memory of the block, then log it and record it in the metrics.
+
+        A fit in a process pool is not recorded: its memory is the pool
+        worker's, sampling this process would understate it.
+        """
+        if pool == POOL_PROCESSES:
+            yield None
+            return
+        with sample_memory(self.sampling) as sample:
+            yield sample
+        if self.sampling == SAMPLING_OFF:
+            return
+        _log.info(
+            f'{spec.name} on {length} points in {pool}: peak {sample.peak_bytes} bytes '
+            f'(estimated {self.estimate(spec, length)}), rss {sample.rss_delta_bytes:+d} bytes'
+        )
+        if self._metrics is not None:
+            self._metrics.observe('forecast_memory_peak_bytes', sample.peak_bytes, method=spec.name)
+            self._metrics.observe('forecast_memory_peak_bytes_per_point', sample.peak_bytes / max(length, 1),
+                                  method=spec.name)
+
+    def _count(self, name, method):
+        if self._metrics is not None:
+            self._metrics.increment(name, method=method)
+
+
+def memory_budget(config, metrics=None):
+    """MemoryBudget of ``memory_budget_bytes``, ``memory_over_budget`` and ``memory_sampling`` in ``[forecast_api]``.
+
+    The budget is off unless ``memory_budget_bytes`` is set, sampling is off by default.
+    """
+    return MemoryBudget(
+        config.getint('forecast_api', 'memory_budget_bytes', fallback=None),
+        config.get('forecast_api', 'memory_over_budget', fallback=OVER_BUDGET_REJECT),
+        config.get('forecast_api', 'memory_sampling', fallback=SAMPLING_OFF),
+        metrics,
+    )
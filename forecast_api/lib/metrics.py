@@ -0,0 +1,80 @@
+import threading
+
+
+class Metrics:
+    """Counters, summaries and gauges of one worker, rendered in the Prometheus text format.
+
+    Every metric is identified by its name and labels (keyword arguments);
+    a summary keeps the count, sum and max of what it observed. Recording is
+    thread safe, so the same instance is shared by the whole worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._summaries = {}
+        self._gauges = {}
+
+    def increment(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            count, total, maximum = self._summaries.get(key, (0, 0.0, value))
+            self._summaries[key] = (count + 1, total + value, max(maximum, value))
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def counter(self, name, **labels):
+        return self._counters.get(_key(name, labels), 0)
+
+    def summary(self, name, **labels):
+        """``(count, sum, max)`` of a summary, None if it observed nothing yet."""
+        return self._summaries.get(_key(name, labels))
+
+    def render(self):
+        with self._lock:
+            counters, summaries, gauges = dict(self._counters), dict(self._summaries), dict(self._gauges)
+        lines = []
+        for name, samples in _by_name(counters):
+            lines.append(f'# TYPE {name} counter')
+            lines.extend(f'{name}{labels} {_number(value)}' for labels, value in samples)
+        for name, samples in _by_name(summaries):
+            lines.append(f'# TYPE {name} summary')
+            for labels, (count, total, _) in samples:
+                lines.append(f'{name}_count{labels} {count}')
+                lines.append(f'{name}_sum{labels} {_number(total)}')
+            lines.append(f'# TYPE {name}_max gauge')
+            lines.extend(f'{name}_max{labels} {_number(maximum)}' for labels, (_, _, maximum) in samples)
+        for name, samples in _by_name(gauges):
+            lines.append(f'# TYPE {name} gauge')
+            lines.extend(f'{name}{labels} {_number(value)}' for labels, value in samples)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _by_name(metrics):
+    """``(name, [(rendered labels, value)])`` sorted by name and labels."""
+    grouped = {}
+    for (name, labels), value in sorted(metrics.items(), key=lambda item: (item[0][0], item[0][1])):
+        grouped.setdefault(name, []).append((_labels(labels), value))
+    return grouped.items()
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
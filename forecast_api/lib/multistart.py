@@ -0,0 +1,236 @@
+import numpy as np
+
+from collections import namedtuple
+from functools import partial
+
+from forecast_api.lib.diagnostics import in_current_context
+from forecast_api.lib.diagnostics import record_optimize_result
+from forecast_api.lib.params import Field
+
+
+MAX_STARTS = 256
+# rounds of refinements in a row that may fail to improve the best objective before the search stops
+PATIENCE = 2
+TOLERANCE = 1e-6
+DEFAULT_PARALLELISM = 4
+# objective of infeasible points (e.g. a multiplicative model dividing by zero), finite for L-BFGS-B
+INFEASIBLE = 1e100
+# lower bound of the state of a multiplicative component
+_POSITIVE = 1e-8
+
+# where a free coefficient starts before the Halton starts are screened
+_TYPICAL = {'alpha': 0.5, 'beta': 0.1, 'gamma': 0.1, 'phi': 0.98}
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53)
+
+MULTISTART_FIELD = Field(
+    'multistart', 'integer',
+    'Fit from this many starting points of a Halton sequence within the coefficient bounds, with the NumPy '
+    'recursion instead of statsmodels; 0 for a single statsmodels fit',
+    default=0, minimum=0, maximum=MAX_STARTS,
+)
+
+# x and fun of the best refinement, the objectives of every refinement, how many starts were screened and
+# refined and whether the search stopped before refining them all
+MultiStartResult = namedtuple('MultiStartResult', ['x', 'fun', 'objectives', 'screened', 'refined', 'stopped_early'])
+
+
+def coefficient_bounds(spec, names=('alpha', 'beta', 'gamma', 'phi', 'initial_level', 'initial_slope',
+                                    'initial_seasons')):
+    """``(minimum, maximum)`` of the coefficients and initial state among the fields of the ParamSpec ``spec``.
+
+    An array field (the initial seasons) is bounded by its items' bounds.
+    """
+    bounds = {}
+    for field in spec.fields:
+        if field.name in names:
+            bounded = field.items or field
+            bounds[field.name] = (bounded.minimum, bounded.maximum)
+    return bounds
+
+
+def _state_bounds(bounds, positive):
+    """``bounds`` of a state field, raised above 0 if the model needs it ``positive``."""
+    low, high = bounds
+    if positive:
+        low = max(low, _POSITIVE) if low is not None else _POSITIVE
+    return low, high
+
+
+def halton(count, dimensions, skip=1):
+    """``count`` points of the Halton sequence in [0, 1)^dimensions, from its ``skip``-th on (0 is the origin)."""
+    if dimensions > len(_PRIMES):
+        raise ValueError(f'Halton points have at most {len(_PRIMES)} dimensions (got {dimensions})')
+    indices = np.arange(skip, skip + count)
+    points = np.zeros((count, dimensions))
+    for dimension, base in enumerate(_PRIMES[:dimensions]):
+        remaining, scale = indices.copy(), 1.0
+        while np.any(remaining):
+            scale /= base
+            points[:, dimension] += scale * (remaining % base)
+            remaining //= base
+    return points
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, INFEASIBLE)
+
+
+def _value_and_gradient(batch_objective, lower, upper, step, x):
+    """Objective and forward difference gradient of ``x`` from one batch evaluation of x and its P neighbours."""
+    steps = step * np.maximum(np.abs(x), 1.0)
+    # stepping backwards where a step forward would leave the bounds
+    steps = np.where(x + steps > upper, -steps, steps)
+    points = np.repeat(x[None, :], len(x) + 1, axis=0)
+    points[np.arange(1, len(x) + 1), np.arange(len(x))] += steps
+    values = _finite(batch_objective(points))
+    if values[0] >= INFEASIBLE:
+        return values[0], np.zeros_like(x)
+    return values[0], np.where(values[1:] >= INFEASIBLE, 0.0, (values[1:] - values[0]) / steps)
+
+
+def _run_all(executor, function, items):
+    """``function`` of every item, in parallel on ``executor``; the calling thread runs whatever is not started.
+
+    So a fit already running on the same pool can never wait on work that
+    no thread is free to pick up.
+    """
+    if executor is None or len(items) < 2:
+        return [function(item) for item in items]
+    futures = [executor.submit(in_current_context(function), item) for item in items[1:]]
+    results = [function(items[0])]
+    for future, item in zip(futures, items[1:]):
+        results.append(function(item) if future.cancel() else future.result())
+    return results
+
+
+def multistart_minimize(batch_objective, base, bounds, start_dimensions, starts, executor=None,
+                        parallelism=DEFAULT_PARALLELISM, patience=PATIENCE, tolerance=TOLERANCE, step=1e-6):
+    """Minimize from ``base`` and ``starts`` low discrepancy starting points; returns a MultiStartResult.
+
+    ``batch_objective`` maps points (rows of a k x P array) to their
+    objectives (nan or inf where infeasible). The starts vary the first
+    ``start_dimensions`` entries of ``base`` over a Halton sequence within
+    their ``bounds`` (``(lower, upper)`` pairs, None for unbounded). All of
+    them are screened with one batch evaluation, then refined with L-BFGS-B
+    best first, ``parallelism`` at a time on ``executor``; the search stops
+    once ``patience`` rounds in a row improve the best objective by less
+    than ``tolerance`` (relative).
+    """
+    from scipy.optimize import minimize
+
+    base = np.asarray(base, dtype=float)
+    lower = np.array([-np.inf if low is None else low for low, _ in bounds], dtype=float)
+    upper = np.array([np.inf if high is None else high for _, high in bounds], dtype=float)
+    candidates = np.repeat(base[None, :], starts + 1, axis=0)
+    if starts and start_dimensions:
+        low, high = lower[:start_dimensions], upper[:start_dimensions]
+        candidates[1:, :start_dimensions] = low + halton(starts, start_dimensions) * (high - low)
+    screened = _finite(batch_objective(candidates))
+    order = np.argsort(screened, kind='stable')
+
+    value_and_gradient = partial(_value_and_gradient, batch_objective, lower, upper, step)
+
+    def _refine(x0):
+        result = minimize(value_and_gradient, x0, jac=True, method='L-BFGS-B', bounds=bounds)
+        record_optimize_result(result)
+        return result.x, float(_finite(result.fun))
+
+    best_x, best = candidates[order[0]], float(screened[order[0]])
+    objectives, refined, stale = [], 0, 0
+    for first in range(0, len(order), parallelism):
+        previous = best
+        for x, fun in _run_all(executor, _refine, [candidates[index] for index in order[first:first + parallelism]]):
+            objectives.append(fun)
+            if fun < best:
+                best_x, best = x, fun
+        refined = min(first + parallelism, len(order))
+        stale = 0 if previous - best > tolerance * max(abs(previous), 1.0) else stale + 1
+        if stale >= patience:
+            break
+    return MultiStartResult(best_x, best, sorted(objectives), len(order), refined, refined < len(order))
+
+
+def fit_smoothing(model, input_array, coefficients, state, coefficient_bounds, starts, executor=None):
+    """Fit the ExponentialSmoothing ``model`` to ``input_array`` from ``starts`` starting points.
+
+    ``coefficients`` (those of alpha, beta, gamma, phi the model uses) and
+    ``state`` (level, and slope and seasons if the model has them) map each
+    name to its value, or to None when it is to be fitted. The starts vary
+    the free coefficients within ``coefficient_bounds`` (see
+    coefficient_bounds), the free state starts from the model's heuristic
+    estimate and is kept within the bounds of its ``initial_*`` field.
+    Returns the fitted coefficients and initial state (as floats and a list
+    of seasons, None without seasonality) and the MultiStartResult.
+    """
+    input_array = np.asarray(input_array, dtype=float)
+    if (model.trend == 'mul' or model.seasonal == 'mul') and np.any(input_array <= 0):
+        raise ValueError('input_data should be positive for a multiplicative trend or seasonality')
+    estimate = model.estimate_state(input_array)
+    free_coefficients = [name for name, value in coefficients.items() if value is None]
+    free_state = [name for name, value in state.items() if value is None]
+    multiplicative = model.trend == 'mul' or model.seasonal == 'mul'
+
+    base, bounds = [], []
+    for name in free_coefficients:
+        low, high = coefficient_bounds[name]
+        base.append(float(np.clip(_TYPICAL[name], low, high)))
+        bounds.append((low, high))
+    state_bounds = {
+        'level': _state_bounds(coefficient_bounds.get('initial_level', (None, None)), multiplicative),
+        'slope': _state_bounds(coefficient_bounds.get('initial_slope', (None, None)), model.trend == 'mul'),
+        'seasons': _state_bounds(coefficient_bounds.get('initial_seasons', (None, None)), model.seasonal == 'mul'),
+    }
+    if 'level' in free_state:
+        base.append(float(np.clip(estimate.level, *state_bounds['level'])))
+        bounds.append(state_bounds['level'])
+    if 'slope' in free_state:
+        base.append(float(np.clip(estimate.slope, *state_bounds['slope'])))
+        bounds.append(state_bounds['slope'])
+    if 'seasons' in free_state:
+        base.extend(np.clip(np.asarray(estimate.seasons, dtype=float), *state_bounds['seasons']).tolist())
+        bounds.extend([state_bounds['seasons']] * model.seasonal_periods)
+
+    def _unpack(points):
+        columns = iter(np.asarray(points, dtype=float).T)
+        values = {name: next(columns) if value is None else value for name, value in coefficients.items()}
+        level = next(columns) if 'level' in free_state else state['level']
+        slope = next(columns) if 'slope' in free_state else state.get('slope')
+        if 'seasons' in free_state:
+            seasons = np.stack([next(columns) for _ in range(model.seasonal_periods)], axis=-1)
+        else:
+            seasons = state.get('seasons')
+        return values, model.initial_state(level, slope, seasons)
+
+    def _sse(points):
+        values, initial = _unpack(points)
+        with np.errstate(all='ignore'):
+            _, predictions = model.filter(input_array, initial, **values)
+            return np.sum((input_array - predictions) ** 2, axis=-1)
+
+    result = multistart_minimize(_sse, base, bounds, len(free_coefficients), starts, executor)
+    values, initial = _unpack(result.x[None, :])
+    fitted = {name: float(np.asarray(value).reshape(-1)[0]) for name, value in values.items()}
+    fitted_state = {
+        'level': float(initial.level.reshape(-1)[0]),
+        'slope': float(initial.slope.reshape(-1)[0]) if model.trend else None,
+        'seasons': initial.seasons.reshape(-1, model.seasonal_periods)[0].tolist() if model.seasonal else None,
+    }
+    return fitted, fitted_state, result
+
+
+def multistart_report(result):
+    """The ``multistart`` entry of a result: the best objective and the spread of the refined ones."""
+    objectives = np.asarray(result.objectives, dtype=float)
+    return {
+        'sse': result.fun,
+        'screened': result.screened,
+        'refined': result.refined,
+        'stopped_early': result.stopped_early,
+        'objectives': {
+            'min': float(objectives.min()),
+            'median': float(np.median(objectives)),
+            'max': float(objectives.max()),
+        },
+    }
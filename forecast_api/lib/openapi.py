@@ -0,0 +1,131 @@
+from forecast_api import __version__
+from forecast_api.lib.regularize import (
+    AGGREGATIONS,
+    FILLS,
+)
+
+
+OPENAPI_VERSION = '3.0.0'
+
+
+def _schema_name(method):
+    return ''.join(part.capitalize() for part in method.split('_'))
+
+
+def _ref(name):
+    return {'$ref': f'#/components/schemas/{name}'}
+
+
+def _forecast_request(params_name):
+    return {
+        'description': 'Forecast request',
+        'type': 'object',
+        'required': ['input_data', 'forecast_horizon', 'params'],
+        'properties': {
+            'input_data': _ref('number_array'),
+            'forecast_horizon': {
+                'type': 'integer',
+                'description': 'The number of periods to be forecast',
+                'minimum': 1,
+                'example': 12,
+            },
+            'params': _ref(params_name),
+            'fit': {
+                'type': 'boolean',
+                'description': 'Fit the model, or forecast with the params as given',
+                'default': True,
+            },
+            'timestamps': {
+                'type': 'array',
+                'items': {'type': 'string'},
+                'description': 'Timestamps of input_data, put on a regular grid before forecasting',
+            },
+            'frequency': {'type': 'string', 'description': 'Frequency of the grid (default: inferred)'},
+            'aggregation': {'type': 'string', 'enum': list(AGGREGATIONS)},
+            'fill': {'type': 'string', 'enum': list(FILLS)},
+            'diagnostics': {
+                'type': 'boolean',
+                'description': 'Add the effort of the fit (optimizer runs, wall time per phase) to the response',
+                'default': False,
+            },
+            'fields': {
+                'oneOf': [{'type': 'string'}, {'type': 'array', 'items': {'type': 'string'}}],
+                'description': 'Dotted paths of the response to keep (default: all), e.g. forecast,params.alpha',
+                'example': 'forecast,params.alpha',
+            },
+        },
+    }
+
+
+def _operation(method, request_name):
+    return {
+        'post': {
+            'description': f'Forecast a series with the {method} method',
+            'requestBody': {
+                'required': True,
+                'content': {'application/json': {'schema': _ref(request_name)}},
+            },
+            'responses': {
+                '200': {
+                    'description': 'The forecast for the provided series',
+                    'content': {'application/json': {'schema': _ref('Forecast')}},
+                },
+                'default': {
+                    'description': 'Unexpected Error',
+                    'content': {'application/json': {'schema': _ref('Error')}},
+                },
+            },
+        },
+    }
+
+
+def openapi_document(registry):
+    """OpenAPI document of ``/forecast/{method}`` for every registered method.
+
+    The params of a method come from its ParamSpec, the same spec that
+    validates them; methods with a hand written parser take any object.
+    """
+    paths, schemas = {}, {}
+    for method in registry:
+        name = _schema_name(method)
+        spec = registry.params_spec(method)
+        schemas[f'{name}Params'] = spec.openapi() if spec is not None else {
+            'type': 'object',
+            'description': f'Parameters of the {method} method',
+        }
+        schemas[f'{name}Request'] = _forecast_request(f'{name}Params')
+        paths[f'/forecast/{method}'] = _operation(method, f'{name}Request')
+
+    schemas.update({
+        'Forecast': {
+            'description': 'The generated forecast, only the requested fields of it when fields are given',
+            'type': 'object',
+            'properties': {
+                'forecast': _ref('number_array'),
+                'params': {'type': 'object', 'description': 'The params used, fitted ones included'},
+                'intervals': {'type': 'array', 'items': {'type': 'object'}},
+                'timestamps': {'type': 'array', 'items': {'type': 'string'}},
+                'frequency': {'type': 'string'},
+                'diagnostics': {'type': 'object', 'description': 'The effort of the fit, when asked for'},
+            },
+        },
+        'Error': {
+            'type': 'object',
+            'properties': {
+                'title': {'type': 'string'},
+                'description': {'type': 'string'},
+            },
+        },
+        'number_array': {
+            'type': 'array',
+            'items': {'type': 'number'},
+        },
+    })
+    return {
+        'openapi': OPENAPI_VERSION,
+        'info': {'title': 'Forecast API', 'version': __version__},
+        'externalDocs': {'url': 'https://github.com/drandrewcsmith/forecast_api'},
+        'servers': [{'url': 'http://localhost:8000/v1'}],
+        'paths': paths,
+        'components': {'schemas': schemas},
+    }
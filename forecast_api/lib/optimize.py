@@ -0,0 +1,41 @@
+import numpy as np
+
+from forecast_api.lib.diagnostics import record_optimizer
+
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def golden_section(objective, lower, upper, tolerance=1e-6, max_iterations=100):
+    """Minimize a unimodal ``objective`` over ``[lower, upper]``, one independent search per entry, all at once.
+
+    ``objective`` maps an array of points to an array of values of the same
+    shape, so a batch of bounded 1-D problems (e.g. the smoothing
+    coefficient of every series of a batch) costs one vectorized evaluation
+    per iteration. nan values count as infinitely bad.
+    """
+    lower, upper = [np.array(bound, dtype=float) for bound in np.broadcast_arrays(lower, upper)]
+
+    def _objective(points):
+        return np.nan_to_num(objective(points), nan=np.inf)
+
+    x1 = upper - GOLDEN * (upper - lower)
+    x2 = lower + GOLDEN * (upper - lower)
+    f1, f2 = _objective(x1), _objective(x2)
+    iterations = 0
+    for _ in range(max_iterations):
+        if np.all(upper - lower <= tolerance):
+            break
+        # the minimum is in [lower, x2] where f1 < f2, else in [x1, upper]
+        left = f1 < f2
+        upper = np.where(left, x2, upper)
+        lower = np.where(left, lower, x1)
+        point = np.where(left, upper - GOLDEN * (upper - lower), lower + GOLDEN * (upper - lower))
+        value = _objective(point)
+        x1, x2 = np.where(left, point, x2), np.where(left, x1, point)
+        f1, f2 = np.where(left, value, f2), np.where(left, f1, value)
+        iterations += 1
+    # one (vectorized) evaluation per iteration after the first two
+    converged = bool(np.all(upper - lower <= tolerance))
+    record_optimizer(iterations, iterations + 2, converged, None if converged else 'maximum number of iterations')
+    return np.where(f1 < f2, x1, x2)
@@ -0,0 +1,128 @@
+import os
+import numpy as np
+
+from forecast_api.lib.batch import (
+    SERIES_COLUMN,
+    VALUE_COLUMN,
+)
+
+
+class Panel:
+    """Long-format series grouped into one contiguous ``values`` array.
+
+    Series ``i`` is ``values[offsets[i]:offsets[i + 1]]``; indexing and
+    iterating hand out views of that array, so no per-series copies or
+    Python lists are made. ``timestamps``, when given, is aligned with
+    ``values``.
+    """
+
+    def __init__(self, series_ids, offsets, values, timestamps=None):
+        self.series_ids = series_ids
+        self.offsets = offsets
+        self.values = values
+        self.timestamps = timestamps
+
+    def __len__(self):
+        return len(self.series_ids)
+
+    def __getitem__(self, index):
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        for index, series_id in enumerate(self.series_ids):
+            yield str(series_id), self[index]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def matrix(self):
+        """The series as the rows of a (series x length) view when they all have the same length, else None."""
+        lengths = self.lengths
+        if not len(lengths) or np.any(lengths != lengths[0]):
+            return None
+        return self.values.reshape(len(lengths), lengths[0])
+
+
+def panel_from_columns(series_ids, values, timestamps=None):
+    """Group long-format columns by series (and order each series by timestamp) with one vectorized sort."""
+    series_ids = np.asarray(series_ids)
+    if series_ids.dtype == object:
+        series_ids = series_ids.astype(str)
+    values = np.asarray(values, dtype=float)
+    if len(series_ids) != len(values):
+        raise ValueError(f'series ids ({len(series_ids)}) and values ({len(values)}) should have the same length')
+
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps)
+        order = np.lexsort((timestamps, series_ids))
+    else:
+        # stable, so the rows of a series keep their order
+        order = np.argsort(series_ids, kind='stable')
+    if np.any(order[1:] < order[:-1]):
+        series_ids, values = series_ids[order], values[order]
+        timestamps = timestamps[order] if timestamps is not None else None
+
+    starts = np.flatnonzero(series_ids[1:] != series_ids[:-1]) + 1
+    offsets = np.concatenate(([0], starts, [len(values)])) if len(values) else np.zeros(1, dtype=int)
+    return Panel(series_ids[offsets[:-1]], offsets, values, timestamps)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('reading Arrow or Parquet data requires pyarrow to be installed')
+    return pyarrow
+
+
+def _columns(series_column, value_column, timestamp_column):
+    return [series_column, value_column] + ([timestamp_column] if timestamp_column else [])
+
+
+def _panel_from_table(table, series_column, value_column, timestamp_column):
+    return panel_from_columns(
+        table.column(series_column).to_numpy(),
+        table.column(value_column).to_numpy(),
+        table.column(timestamp_column).to_numpy() if timestamp_column else None,
+    )
+
+
+def read_panel_csv(source, series_column=SERIES_COLUMN, value_column=VALUE_COLUMN, timestamp_column=None):
+    import pandas as pd
+
+    frame = pd.read_csv(
+        source,
+        usecols=_columns(series_column, value_column, timestamp_column),
+        dtype={series_column: str},
+        parse_dates=[timestamp_column] if timestamp_column else False,
+    )
+    return panel_from_columns(
+        frame[series_column].to_numpy(),
+        frame[value_column].to_numpy(dtype=float),
+        frame[timestamp_column].to_numpy() if timestamp_column else None,
+    )
+
+
+def read_panel_arrow(source, series_column=SERIES_COLUMN, value_column=VALUE_COLUMN, timestamp_column=None):
+    """Panel of an Arrow IPC stream (e.g. a request body)."""
+    table = _pyarrow().ipc.open_stream(source).read_all()
+    return _panel_from_table(table, series_column, value_column, timestamp_column)
+
+
+def read_panel(path, series_column=SERIES_COLUMN, value_column=VALUE_COLUMN, timestamp_column=None):
+    """Panel of a long-format ``.csv``, ``.parquet`` or ``.arrow`` (Arrow IPC file) file, rows in any order."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return read_panel_csv(path, series_column, value_column, timestamp_column)
+    columns = _columns(series_column, value_column, timestamp_column)
+    if extension == '.parquet':
+        table = _pyarrow().parquet.read_table(path, columns=columns)
+    elif extension in ('.arrow', '.feather'):
+        with _pyarrow().memory_map(path) as source:
+            table = _pyarrow().ipc.open_file(source).read_all().select(columns)
+    else:
+        raise ValueError(f'unsupported panel file {path} (expected .csv, .parquet or .arrow)')
+    return _panel_from_table(table, series_column, value_column, timestamp_column)
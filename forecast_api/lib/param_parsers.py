@@ -1,6 +1,7 @@
 from forecast_api.lib.exceptions import (
     InvalidBooleanParameter,
     InvalidIntegerParameter,
+    InvalidListParameter,
     InvalidNumericParameter,
     InvalidStringParameter,
 )
@@ -38,3 +39,11 @@ def parse_boolean_param(param_name, param_value):
     if not isinstance(param_value, bool):
         raise InvalidBooleanParameter(f'{param_name} ({param_value}) should be boolean (got {type(param_value)})')
     return param_value
+
+
+def parse_list_param(param_name, param_value, item_parser, min_length=None):
+    if not isinstance(param_value, (list, tuple)):
+        raise InvalidListParameter(f'{param_name} ({param_value}) should be a list (got {type(param_value)})')
+    if min_length is not None and len(param_value) < min_length:
+        raise InvalidListParameter(f'{param_name} ({param_value}) should have at least {min_length} items')
+    return [item_parser(f'{param_name}[{i}]', value) for i, value in enumerate(param_value)]
@@ -0,0 +1,289 @@
+import copy
+import importlib
+import sys
+import numpy as np
+
+from functools import partial
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.param_parsers import (
+    parse_boolean_param,
+    parse_integer_param,
+    parse_list_param,
+    parse_numeric_param,
+    parse_string_param,
+)
+
+
+KINDS = ['number', 'integer', 'string', 'boolean', 'array', 'object']
+
+
+class Field:
+    """One parameter of a method: its kind, bounds or choices, default and description.
+
+    ``literals`` are values accepted as they are besides the kind (e.g.
+    ``'auto'``), ``allow_list`` also accepts a non empty list of the kind.
+    ``array`` fields validate their items with the ``items`` Field and
+    ``object`` fields with ``parser(param_name, param_value)``, documented by
+    ``schema``. A missing (or null) field gets its ``default``, unless it is
+    ``required``, in which case ``error(message)`` is raised.
+    """
+
+    def __init__(self, name, kind, description='', default=None, minimum=None, maximum=None, choices=None,
+                 items=None, min_items=None, literals=(), allow_list=False, parser=None, schema=None,
+                 required=False, error=InvalidParameter, message=None):
+        if kind not in KINDS:
+            raise ValueError(f'kind of {name} ({kind}) should be one of [{", ".join(KINDS)}]')
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.items = items
+        self.min_items = min_items
+        self.literals = tuple(literals)
+        self.allow_list = allow_list
+        self.parser = parser
+        self.schema = schema
+        self.required = required
+        self.error = error
+        self.message = message or f'{name} is a required parameter'
+
+    def item_parser(self):
+        """``parser(param_name, param_value)`` of a single value of the field's kind."""
+        if self.kind == 'number':
+            return partial(parse_numeric_param, param_min=self.minimum, param_max=self.maximum)
+        if self.kind == 'integer':
+            return partial(parse_integer_param, param_min=self.minimum, param_max=self.maximum)
+        if self.kind == 'string':
+            return partial(parse_string_param, allowed=self.choices)
+        if self.kind == 'boolean':
+            return parse_boolean_param
+        if self.kind == 'array':
+            return partial(parse_list_param, item_parser=self.items.item_parser(), min_length=self.min_items)
+        return self.parser
+
+    def compile(self):
+        """``parse(value)`` of the field, with every choice about the field made once, here."""
+        name, default, literals = self.name, self.default, self.literals
+        parse_item = self.item_parser()
+
+        if self.allow_list:
+            parse_one = parse_item
+
+            def parse_item(param_name, param_value):
+                if isinstance(param_value, list):
+                    return parse_list_param(param_name, param_value, parse_one, min_length=1)
+                return parse_one(param_name, param_value)
+
+        def parse(param_value):
+            if param_value is None:
+                if self.required:
+                    raise self.error(self.message)
+                return default
+            if literals and isinstance(param_value, str) and param_value in literals:
+                return param_value
+            return parse_item(name, param_value)
+
+        return parse
+
+    def openapi(self):
+        """JSON schema of the field as used by OpenAPI 3."""
+        if self.kind == 'object':
+            schema = copy.deepcopy(self.schema or {'type': 'object'})
+        elif self.kind == 'array':
+            schema = {'type': 'array', 'items': self.items.openapi()}
+            if self.min_items is not None:
+                schema['minItems'] = self.min_items
+        else:
+            schema = {'type': self.kind}
+            if self.minimum is not None:
+                schema['minimum'] = self.minimum
+            if self.maximum is not None:
+                schema['maximum'] = self.maximum
+            if self.choices is not None:
+                schema['enum'] = list(self.choices)
+        options = [schema]
+        if self.allow_list:
+            options.append({'type': 'array', 'items': dict(schema), 'minItems': 1})
+        if self.literals:
+            options.append({'type': 'string', 'enum': list(self.literals)})
+        if len(options) > 1:
+            schema = {'oneOf': options}
+        if self.description:
+            schema['description'] = self.description
+        if self.default is not None:
+            schema['default'] = copy.deepcopy(self.default)
+        return schema
+
+
+class Rule:
+    """A constraint between fields: ``error(message.format(**params))`` is raised when ``violated(params)``.
+
+    ``message`` may also be a callable of the params.
+    """
+
+    def __init__(self, violated, error, message):
+        self.violated = violated
+        self.error = error
+        self.message = message
+
+    def check(self, params):
+        if self.violated(params):
+            message = self.message(params) if callable(self.message) else self.message.format(**params)
+            raise self.error(message)
+
+
+class ParamSpec:
+    """The declarative parameter spec of a method.
+
+    ``fields`` are validated in order, then the ``rules`` between them; the
+    returned params are the parsed fields plus whatever ``derive(params)``
+    (e.g. the ``optimized_*`` flags) returns. ``compile`` turns the spec into
+    the method's ``parse_params``.
+    """
+
+    def __init__(self, fields, rules=(), derive=None, description=''):
+        self.fields = tuple(fields)
+        self.rules = tuple(rules)
+        self.derive = derive
+        self.description = description
+
+    def compile(self):
+        # the module whose global the compiled parser becomes, see CompiledParams.__reduce__
+        return CompiledParams(self, sys._getframe(1).f_globals.get('__name__'))
+
+    def openapi(self):
+        schema = {
+            'type': 'object',
+            'properties': {field.name: field.openapi() for field in self.fields},
+        }
+        required = [field.name for field in self.fields if field.required]
+        if required:
+            schema['required'] = required
+        if self.description:
+            schema['description'] = self.description
+        return schema
+
+
+class CompiledParams:
+    """``parse_params`` of a ParamSpec: raises the first InvalidParameter, like the hand written parsers.
+
+    ``batch`` validates many param sets at once and reports every error of
+    every set instead of stopping at the first one.
+    """
+
+    def __init__(self, spec, module=None):
+        self.spec = spec
+        self._module = module
+        self._fields = [(field.name, field.compile()) for field in spec.fields]
+        self._parsers = dict(self._fields)
+        self._rules = spec.rules
+        self._derive = spec.derive
+        # numbers checked as one array per field in ``batch``
+        self._numeric = [
+            field for field in spec.fields if field.kind == 'number' and not field.literals and not field.allow_list
+        ]
+
+    def __reduce__(self):
+        # rules are often lambdas: pickled as a reference to the module global, so engines can go to process pools
+        module = sys.modules.get(self._module)
+        for name, value in vars(module).items() if module else ():
+            if value is self:
+                return _module_global, (self._module, name)
+        raise TypeError(f'cannot pickle a parse_params that is not a module global of {self._module}')
+
+    def __call__(self, **params):
+        parsed = {name: parse(params.get(name)) for name, parse in self._fields}
+        return self._finish(parsed)
+
+    def _finish(self, parsed):
+        for rule in self._rules:
+            rule.check(parsed)
+        if self._derive is not None:
+            parsed.update(self._derive(parsed))
+        return parsed
+
+    def batch(self, param_sets):
+        """Validate every param set; returns their parsed params (None where invalid) and every error.
+
+        Errors are ``(index, InvalidParameter)`` pairs, every invalid field of
+        a set is reported and its rules are only checked once its fields are
+        all valid. Numeric fields are type checked per set but their bounds
+        are checked for the whole batch at once.
+        """
+        param_sets = list(param_sets)
+        errors = {index: [] for index in range(len(param_sets))}
+        columns = {}
+
+        for field in self._numeric:
+            values = [params.get(field.name) for params in param_sets]
+            typed = np.array([
+                isinstance(value, (int, float)) and not isinstance(value, bool) for value in values
+            ], dtype=bool)
+            numbers = np.array([value if ok else np.nan for value, ok in zip(values, typed)], dtype=float)
+            valid = typed.copy()
+            if field.minimum is not None:
+                valid &= ~(numbers < field.minimum)
+            if field.maximum is not None:
+                valid &= ~(numbers > field.maximum)
+            missing = np.array([value is None for value in values], dtype=bool)
+            if field.required:
+                for index in np.flatnonzero(missing):
+                    errors[index].append(field.error(field.message))
+            # the scalar parser raises the same error as the single set path
+            for index in np.flatnonzero(~valid & ~missing):
+                errors[index].append(_error_of(self._parsers[field.name], values[index]))
+            columns[field.name] = [
+                field.default if is_missing else float(number)
+                for number, is_missing in zip(numbers.tolist(), missing)
+            ]
+
+        results = []
+        for index, params in enumerate(param_sets):
+            parsed = {}
+            for name, parse in self._fields:
+                if name in columns:
+                    parsed[name] = columns[name][index]
+                    continue
+                try:
+                    parsed[name] = parse(params.get(name))
+                except InvalidParameter as e:
+                    errors[index].append(e)
+            if not errors[index]:
+                try:
+                    results.append(self._finish(parsed))
+                    continue
+                except InvalidParameter as e:
+                    errors[index].append(e)
+            results.append(None)
+
+        return results, [(index, error) for index in errors for error in errors[index]]
+
+
+def _module_global(module, name):
+    return getattr(importlib.import_module(module), name)
+
+
+def _error_of(parse, value):
+    try:
+        parse(value)
+    except InvalidParameter as e:
+        return e
+    raise AssertionError(f'{value} was expected to be invalid')
+
+
+def parse_params_batch(parse_params, param_sets):
+    """``parse_params.batch`` of a compiled spec, or ``parse_params`` applied to every set of a hand written one."""
+    if hasattr(parse_params, 'batch'):
+        return parse_params.batch(param_sets)
+    results, errors = [], []
+    for index, params in enumerate(param_sets):
+        try:
+            results.append(parse_params(**params))
+        except InvalidParameter as e:
+            results.append(None)
+            errors.append((index, e))
+    return results, errors
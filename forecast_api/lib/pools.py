@@ -0,0 +1,71 @@
+import os
+import threading
+
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+
+POOL_INLINE = 'inline'
+POOL_THREADS = 'threads'
+POOL_PROCESSES = 'processes'
+
+POOL_NAMES = (POOL_INLINE, POOL_THREADS, POOL_PROCESSES)
+
+
+class InlineExecutor(Executor):
+    """Executor that runs the submitted call straight away in the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class ExecutorPools:
+    """Named executors shared by the whole worker, created on first use.
+
+    Sizes are read from the ``[forecast_api]`` section of the config
+    (``threads_pool_size`` and ``processes_pool_size``) and default to the
+    number of CPUs.
+    """
+
+    def __init__(self, config=None):
+        self._config = config
+        self._executors = {POOL_INLINE: InlineExecutor()}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name not in POOL_NAMES:
+            raise KeyError(f'unknown execution pool {name} (should be one of [{", ".join(POOL_NAMES)}])')
+        try:
+            return self._executors[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._executors:
+                self._executors[name] = self._create(name)
+            return self._executors[name]
+
+    def size(self, name):
+        if name == POOL_INLINE:
+            return 1
+        default = os.cpu_count() or 1
+        if self._config is None:
+            return default
+        return self._config.getint('forecast_api', f'{name}_pool_size', fallback=default)
+
+    def _create(self, name):
+        if name == POOL_THREADS:
+            return ThreadPoolExecutor(max_workers=self.size(name), thread_name_prefix='forecast')
+        return ProcessPoolExecutor(max_workers=self.size(name))
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=wait)
+            self._executors = {POOL_INLINE: InlineExecutor()}
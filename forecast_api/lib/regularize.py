@@ -0,0 +1,84 @@
+import numpy as np
+
+from collections import namedtuple
+
+from forecast_api.lib.exceptions import InvalidTimestampsParameter
+from forecast_api.lib.param_parsers import parse_string_param
+
+
+AGGREGATIONS = ['sum', 'mean', 'last']
+FILLS = ['zero', 'previous', 'interpolate']
+
+# ``values[i]`` is the (aggregated) observation of the period starting at ``index[i]``
+RegularSeries = namedtuple('RegularSeries', ['index', 'values', 'frequency'])
+
+
+def _parse_timestamps(timestamps, length):
+    import pandas as pd
+
+    if not isinstance(timestamps, (list, tuple)):
+        raise InvalidTimestampsParameter(f'timestamps should be a list (got {type(timestamps)})')
+    if len(timestamps) != length:
+        raise InvalidTimestampsParameter(
+            f'timestamps ({len(timestamps)}) should have as many items as input_data ({length})'
+        )
+    try:
+        return pd.DatetimeIndex(pd.to_datetime(timestamps))
+    except (ValueError, TypeError) as e:
+        raise InvalidTimestampsParameter(f'timestamps could not be parsed ({e})')
+
+
+def _parse_frequency(frequency, index):
+    import pandas as pd
+
+    if frequency is None:
+        unique = index.unique().sort_values()
+        if len(unique) < 2:
+            raise InvalidTimestampsParameter('frequency must be provided if it cannot be inferred from timestamps')
+        # a calendar frequency when the timestamps are regular, else the smallest spacing
+        frequency = (pd.infer_freq(unique) if len(unique) >= 3 else None) or pd.Timedelta(np.diff(unique).min())
+    try:
+        return pd.tseries.frequencies.to_offset(frequency)
+    except (ValueError, TypeError):
+        raise InvalidTimestampsParameter(f'frequency ({frequency}) should be a pandas offset alias, e.g. D, W, H')
+
+
+def regularize(input_data, timestamps, frequency=None, aggregation=None, fill=None):
+    """Resample timestamped observations onto a regular grid of ``frequency`` in one vectorized pass.
+
+    Observations are aggregated per period (``sum``, ``mean`` or
+    ``last``; ``sum`` by default) and empty periods are filled (``zero``,
+    ``previous`` or ``interpolate``; ``zero`` after a ``sum``, else
+    ``interpolate``). Without ``frequency`` it is inferred from the
+    timestamps. Null observations count as missing.
+    """
+    import pandas as pd
+
+    values = np.array(input_data, dtype=float)
+    index = _parse_timestamps(timestamps, len(values))
+    if not len(values):
+        raise InvalidTimestampsParameter('input_data should not be empty if timestamps are provided')
+    offset = _parse_frequency(frequency, index)
+    aggregation = parse_string_param('aggregation', aggregation or 'sum', AGGREGATIONS)
+    fill = parse_string_param('fill', fill or ('zero' if aggregation == 'sum' else 'interpolate'), FILLS)
+
+    resampler = pd.Series(values, index=index).sort_index().resample(offset)
+    series = resampler.sum(min_count=1) if aggregation == 'sum' else getattr(resampler, aggregation)()
+
+    if fill == 'zero':
+        series = series.fillna(0.0)
+    elif fill == 'previous':
+        series = series.ffill().bfill()
+    else:
+        series = series.interpolate(limit_direction='both')
+    if series.isna().any():
+        raise InvalidTimestampsParameter('input_data has no observations to fill the gaps from')
+    return RegularSeries(series.index, series.to_numpy(), offset)
+
+
+def future_timestamps(regular, forecast_horizon):
+    """ISO 8601 timestamps of the ``forecast_horizon`` periods after ``regular``."""
+    import pandas as pd
+
+    future = pd.date_range(regular.index[-1], periods=forecast_horizon + 1, freq=regular.frequency)[1:]
+    return [timestamp.isoformat() for timestamp in future]
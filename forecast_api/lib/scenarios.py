@@ -0,0 +1,101 @@
+import numpy as np
+
+from itertools import product
+
+from forecast_api.lib.exceptions import InvalidScenariosParameter
+from forecast_api.lib.param_parsers import parse_list_param
+from forecast_api.lib.params import parse_params_batch
+
+
+SCENARIO_FIELDS = ('alpha', 'beta', 'gamma', 'phi', 'initial_level', 'initial_slope', 'initial_seasons')
+MAX_SCENARIOS = 100000
+
+
+def _unparsed(param_name, param_value):
+    return param_value
+
+
+def _check_fields(param_name, scenario):
+    if not isinstance(scenario, dict):
+        raise InvalidScenariosParameter(f'{param_name} ({scenario}) should be an object (got {type(scenario)})')
+    unknown = set(scenario) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise InvalidScenariosParameter(
+            f'{param_name} has unknown fields [{", ".join(sorted(unknown))}] '
+            f'(scenarios can only set {", ".join(SCENARIO_FIELDS)})'
+        )
+
+
+def parse_scenarios_param(param_name, param_value):
+    """A list of scenarios, each an object of coefficients and initial state, or a grid of them.
+
+    A grid is an object of value lists, e.g. ``{alpha: [0.1, 0.5], beta: [0.1, 0.2]}``,
+    and stands for every combination of its values. The values themselves are
+    validated by the parameter parser of the method.
+    """
+    if isinstance(param_value, dict):
+        _check_fields(param_name, param_value)
+        if not param_value:
+            raise InvalidScenariosParameter(f'{param_name} should set at least one field')
+        fields = sorted(param_value)
+        values = [
+            parse_list_param(f'{param_name}.{field}', param_value[field], _unparsed, min_length=1)
+            for field in fields
+        ]
+        size = int(np.prod([len(field_values) for field_values in values]))
+        if size > MAX_SCENARIOS:
+            raise InvalidScenariosParameter(f'{param_name} has {size} scenarios (at most {MAX_SCENARIOS} allowed)')
+        scenarios = [dict(zip(fields, combination)) for combination in product(*values)]
+    else:
+        scenarios = parse_list_param(param_name, param_value, _unparsed, min_length=1)
+        if len(scenarios) > MAX_SCENARIOS:
+            raise InvalidScenariosParameter(
+                f'{param_name} has {len(scenarios)} scenarios (at most {MAX_SCENARIOS} allowed)'
+            )
+        for index, scenario in enumerate(scenarios):
+            _check_fields(f'{param_name}[{index}]', scenario)
+    return scenarios
+
+
+def scenario_forecasts(parse_params, smoothing_model, input_array, forecast_horizon, scenarios, sse=False,
+                       **params):
+    """Forecasts of every scenario of fully specified coefficients from one vectorized run of the recursion.
+
+    Each scenario is merged into ``params`` and all of them are validated
+    at once by the method's ``parse_params``; the coefficients and initial states of all scenarios
+    are stacked so the filter runs once over a (scenarios x length) array.
+    """
+    parsed, errors = parse_params_batch(parse_params, [dict(params, **scenario) for scenario in scenarios])
+    if errors:
+        raise InvalidScenariosParameter('; '.join(f'scenarios[{index}]: {error}' for index, error in errors))
+    for index, scenario_params in enumerate(parsed):
+        if scenario_params['to_fit']:
+            raise InvalidScenariosParameter(
+                f'scenarios[{index}] is not fully specified, every coefficient and initial state must be given'
+            )
+
+    components = [smoothing_model(scenario_params) for scenario_params in parsed]
+    model = components[0][0]
+    states = [state for _, state, _ in components]
+    state = model.initial_state(
+        [state.level for state in states],
+        [state.slope for state in states],
+        [state.seasons for state in states] if model.seasonal else None,
+    )
+    coefficients = {
+        name: np.array([scenario_coefficients[name] for _, _, scenario_coefficients in components], dtype=float)
+        for name in components[0][2]
+    }
+
+    final_state, predictions = model.filter(input_array, state, **coefficients)
+    result = {
+        'params': {name: value for name, value in parsed[0].items() if name not in SCENARIO_FIELDS},
+        'forecast': model.forecast(final_state, forecast_horizon, coefficients.get('phi', 1.0)),
+        'scenarios': [
+            {field: scenario_params[field] for field in SCENARIO_FIELDS if field in scenario_params}
+            for scenario_params in parsed
+        ],
+    }
+    if sse:
+        result['sse'] = np.sum((input_array - predictions)**2, axis=-1)
+    return result
@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def autocorrelation(input_matrix, max_lag=None):
+    """Autocorrelation of each row of ``input_matrix`` (or of a 1-d series) up to ``max_lag``.
+
+    The rows are detrended by least squares and correlated through one
+    zero-padded FFT, i.e. in O(n log n) for all lags at once. Every lag is
+    normalised by its own number of terms, so long lags are not attenuated
+    relative to short ones.
+    """
+    input_matrix = np.atleast_2d(np.asarray(input_matrix, dtype=float))
+    length = input_matrix.shape[-1]
+    max_lag = length - 1 if max_lag is None else min(max_lag, length - 1)
+
+    time = np.arange(length, dtype=float) - (length - 1) / 2
+    slopes = input_matrix @ time / max(time @ time, np.finfo(float).tiny)
+    residuals = input_matrix - input_matrix.mean(axis=-1, keepdims=True) - slopes[:, None] * time
+
+    fft_length = 1 << (2 * length - 1).bit_length()
+    spectrum = np.fft.rfft(residuals, n=fft_length, axis=-1)
+    autocovariance = np.fft.irfft(spectrum * np.conj(spectrum), n=fft_length, axis=-1)[:, :max_lag + 1]
+    autocovariance /= length - np.arange(max_lag + 1)
+    variance = autocovariance[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acf = np.where(variance > 0, autocovariance / variance, 0.0)
+    return acf
+
+
+def detect_seasonal_periods_batch(input_matrix, max_periods=1, min_period=2, max_period=None, threshold=0.3,
+                                  tolerance=0.1):
+    """Dominant seasonal periods of every row of ``input_matrix``, strongest first.
+
+    A period is a local maximum of the autocorrelation above ``threshold``
+    (and above 3/sqrt(n), so noise is not mistaken for a cycle in short
+    series), at a lag with at least two full cycles in the series. Of a
+    period and its multiples the shortest one within ``tolerance`` of the
+    strongest is kept, so a daily cycle is not reported as weekly; a multiple
+    is only reported as an additional period when it correlates clearly more
+    than its base.
+    """
+    input_matrix = np.atleast_2d(np.asarray(input_matrix, dtype=float))
+    length = input_matrix.shape[-1]
+    max_period = length // 2 if max_period is None else min(max_period, length // 2)
+    if max_period < min_period:
+        return [[] for _ in range(input_matrix.shape[0])]
+
+    acf = autocorrelation(input_matrix, max_lag=max_period + 1)
+    threshold = max(threshold, 3 / np.sqrt(length))
+    inner = acf[:, 1:-1]
+    is_peak = (inner > acf[:, :-2]) & (inner >= acf[:, 2:]) & (inner > threshold)
+    is_peak[:, :min_period - 1] = False
+
+    periods = []
+    for row, peaks in zip(acf, is_peak):
+        lags = np.flatnonzero(peaks) + 1
+        lags = lags[lags <= max_period]
+        periods.append(_select_periods(row, lags[np.argsort(-row[lags], kind='stable')], max_periods, tolerance))
+    return periods
+
+
+def detect_seasonal_periods(input_array, max_periods=1, **kwargs):
+    """Dominant seasonal periods of one series, strongest first (empty if there is none)."""
+    return detect_seasonal_periods_batch(np.asarray(input_array, dtype=float)[None, :], max_periods, **kwargs)[0]
+
+
+def _select_periods(acf, ranked_lags, max_periods, tolerance):
+    selected = []
+    for lag in ranked_lags:
+        if len(selected) == max_periods:
+            break
+        lag = int(lag)
+        # prefer the fundamental of a harmonic series of peaks
+        divisors = [int(other) for other in ranked_lags if lag % other == 0 and acf[other] >= acf[lag] - tolerance]
+        lag = min(divisors + [lag])
+        if lag in selected:
+            continue
+        if any(lag % period == 0 and acf[lag] <= acf[period] + tolerance for period in selected):
+            continue
+        selected.append(lag)
+    return selected
+
+
+def seasonal_indices(input_array, seasonal_periods, kind='mul'):
+    """Seasonal indices of every series (last axis is time) by classical decomposition, shape (..., seasonal_periods).
+
+    The trend is a centred moving average of ``seasonal_periods`` points
+    (2 x m when m is even) from one cumulative sum; index ``p`` is the mean
+    ratio (``mul``) or difference (``add``) to the trend at the points ``t``
+    with ``t % m == p``, normalised to a mean of 1 (or 0). Needs at least
+    two full cycles.
+    """
+    input_array = np.asarray(input_array, dtype=float)
+    period = seasonal_periods
+    length = input_array.shape[-1]
+    if length < 2 * period:
+        raise ValueError(f'input_data of length {length} should have at least two cycles of {period} points')
+
+    cumsum = np.concatenate([np.zeros(input_array.shape[:-1] + (1,)), np.cumsum(input_array, axis=-1)], axis=-1)
+    trend = (cumsum[..., period:] - cumsum[..., :-period]) / period
+    if period % 2 == 0:
+        trend = (trend[..., :-1] + trend[..., 1:]) / 2
+    offset = period // 2
+    observed = input_array[..., offset:offset + trend.shape[-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        detrended = observed / trend if kind == 'mul' else observed - trend
+
+    positions = (np.arange(detrended.shape[-1]) + offset) % period
+    indices = np.stack([detrended[..., positions == position].mean(axis=-1) for position in range(period)], axis=-1)
+    if kind == 'mul':
+        return indices / indices.mean(axis=-1, keepdims=True)
+    return indices - indices.mean(axis=-1, keepdims=True)
@@ -0,0 +1,19 @@
+import json
+import numpy as np
+
+from functools import partial
+
+from falcon.media import JSONHandler
+
+
+def json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def json_handler():
+    """JSON media handler that also serializes NumPy arrays and scalars, so methods can return them unconverted."""
+    return JSONHandler(dumps=partial(json.dumps, default=json_default))
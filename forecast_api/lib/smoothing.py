@@ -0,0 +1,277 @@
+import numpy as np
+
+from collections import namedtuple
+
+
+# ``seasons[..., t % m]`` is the seasonal component of the observation at ``time`` t
+SmoothingState = namedtuple('SmoothingState', ['level', 'slope', 'seasons', 'time'])
+
+
+class ExponentialSmoothing:
+    """The Holt-Winters recursion of statsmodels' ExponentialSmoothing in plain NumPy.
+
+    Every coefficient and state component may carry leading dimensions (one
+    entry per series of a batch or per parameter set), the recursion runs
+    over all of them at once. ``filter`` can be continued from any state, so
+    a series that grows only needs its new observations filtered.
+    """
+
+    def __init__(self, trend=None, damped=False, seasonal=None, seasonal_periods=None):
+        if seasonal and not seasonal_periods:
+            raise ValueError(f'seasonal_periods must be provided if seasonal = {seasonal}')
+        self.trend = trend
+        self.damped = damped
+        self.seasonal = seasonal
+        self.seasonal_periods = seasonal_periods if seasonal else 0
+
+    def initial_state(self, initial_level, initial_slope=None, initial_seasons=None):
+        level = np.asarray(initial_level, dtype=float)
+        slope = np.asarray(initial_slope if self.trend else self._no_slope, dtype=float)
+        if self.seasonal:
+            seasons = np.asarray(initial_seasons, dtype=float)
+            if seasons.shape[-1:] != (self.seasonal_periods,):
+                raise ValueError(f'initial_seasons should have seasonal_periods = {self.seasonal_periods} values')
+        else:
+            seasons = np.zeros((0,))
+        return SmoothingState(level, slope, seasons, 0)
+
+    def estimate_state(self, input_array):
+        """Heuristic start for fitting: level and slope of the first cycles, the first cycle's seasons."""
+        input_array = np.asarray(input_array, dtype=float)
+        cycle = max(self.seasonal_periods, 1)
+        level = input_array[:cycle].mean()
+        slope = self._no_slope
+        if self.trend and len(input_array) >= 2 * cycle:
+            following = input_array[cycle:2 * cycle].mean()
+            slope = (following / level) ** (1 / cycle) if self.trend == 'mul' else (following - level) / cycle
+        seasons = self._without_season(input_array[:cycle], level) if self.seasonal else None
+        return self.initial_state(level, slope, seasons)
+
+    @property
+    def _no_slope(self):
+        return 1.0 if self.trend == 'mul' else 0.0
+
+    def _trended(self, level, slope):
+        if self.trend == 'mul':
+            return level * slope
+        if self.trend == 'add':
+            return level + slope
+        return level
+
+    def _dampen(self, slope, phi):
+        if not self.damped:
+            return slope
+        if self.trend == 'mul':
+            return slope ** phi
+        return slope * phi
+
+    def _detrend(self, level, previous_level):
+        if self.trend == 'mul':
+            return level / previous_level
+        return level - previous_level
+
+    def _with_season(self, value, season):
+        if self.seasonal == 'mul':
+            return value * season
+        if self.seasonal == 'add':
+            return value + season
+        return value
+
+    def _without_season(self, value, season):
+        if self.seasonal == 'mul':
+            return value / season
+        if self.seasonal == 'add':
+            return value - season
+        return value
+
+    def _predict(self, level, slope, seasons, time, phi):
+        damped_slope = self._dampen(slope, phi)
+        base = self._trended(level, damped_slope)
+        season = seasons[..., time % self.seasonal_periods] if self.seasonal else None
+        return self._with_season(base, season), base, damped_slope, season
+
+    def _update(self, level, slope, seasons, time, observation, base, damped_slope, season, alpha, beta, gamma):
+        """Smooth ``observation`` into the state; ``seasons`` is updated in place."""
+        new_level = alpha * self._without_season(observation, season) + (1 - alpha) * base
+        if self.trend:
+            slope = beta * self._detrend(new_level, level) + (1 - beta) * damped_slope
+        if self.seasonal:
+            seasons[..., time % self.seasonal_periods] = \
+                gamma * self._without_season(observation, base) + (1 - gamma) * season
+        return new_level, slope
+
+    def filter(self, input_array, state, alpha, beta=0.0, gamma=0.0, phi=1.0):
+        """Run the recursion over ``input_array[..., t]`` starting from ``state``.
+
+        Returns the state after the last observation and the one-step ahead
+        predictions of every observation.
+        """
+        input_array = np.asarray(input_array, dtype=float)
+        length = input_array.shape[-1]
+        shape = np.broadcast(input_array[..., 0] if length else 0.0, state.level, state.slope,
+                             alpha, beta, gamma, phi).shape
+        level = np.array(np.broadcast_to(state.level, shape), dtype=float)
+        slope = np.array(np.broadcast_to(state.slope, shape), dtype=float)
+        seasons = np.array(np.broadcast_to(state.seasons, shape + (self.seasonal_periods,)), dtype=float)
+        time = state.time
+        predictions = np.empty(shape + (length,))
+
+        for t in range(length):
+            prediction, base, damped_slope, season = self._predict(level, slope, seasons, time, phi)
+            predictions[..., t] = prediction
+            level, slope = self._update(
+                level, slope, seasons, time, input_array[..., t], base, damped_slope, season, alpha, beta, gamma
+            )
+            time += 1
+
+        return SmoothingState(level, slope, seasons, time), predictions
+
+    def forecast(self, state, horizon, phi=1.0):
+        """Forecast ``horizon`` steps after ``state`` in closed form.
+
+        Every step uses the latest estimate of its seasonal component
+        (statsmodels reuses the one from a full cycle earlier at the m-th step).
+        """
+        steps = np.arange(1, horizon + 1)
+        level = np.asarray(state.level, dtype=float)[..., None]
+        slope = np.asarray(state.slope, dtype=float)[..., None]
+        if self.damped:
+            slope_steps = np.cumsum(np.asarray(phi, dtype=float)[..., None] ** steps, axis=-1)
+        else:
+            slope_steps = steps
+
+        if self.trend == 'mul':
+            forecast = level * slope ** slope_steps
+        elif self.trend == 'add':
+            forecast = level + slope * slope_steps
+        else:
+            forecast = level + np.zeros(horizon)
+
+        if self.seasonal:
+            seasons = np.asarray(state.seasons, dtype=float)[..., (state.time + steps - 1) % self.seasonal_periods]
+            forecast = self._with_season(forecast, seasons)
+        return forecast
+
+    def simulate(self, state, errors, alpha, beta=0.0, gamma=0.0, phi=1.0):
+        """Future paths after ``state`` with the additive one-step ``errors[..., path, step]``.
+
+        Every path is smoothed with its own simulated observations, all paths
+        at once, one step of the horizon at a time.
+        """
+        errors = np.asarray(errors, dtype=float)
+        shape = errors.shape[:-1]
+        level = np.array(np.broadcast_to(np.asarray(state.level)[..., None], shape), dtype=float)
+        slope = np.array(np.broadcast_to(np.asarray(state.slope)[..., None], shape), dtype=float)
+        seasons = np.array(
+            np.broadcast_to(np.asarray(state.seasons)[..., None, :], shape + (self.seasonal_periods,)), dtype=float
+        )
+        alpha, beta, gamma, phi = [np.asarray(value, dtype=float)[..., None] for value in (alpha, beta, gamma, phi)]
+        time = state.time
+        paths = np.empty(errors.shape)
+
+        for step in range(errors.shape[-1]):
+            prediction, base, damped_slope, season = self._predict(level, slope, seasons, time, phi)
+            paths[..., step] = observation = prediction + errors[..., step]
+            level, slope = self._update(
+                level, slope, seasons, time, observation, base, damped_slope, season, alpha, beta, gamma
+            )
+            time += 1
+        return paths
+
+
+# ``seasons[i][..., t % periods[i]]`` is the component of cycle i at ``time`` t
+DoubleSeasonalState = namedtuple('DoubleSeasonalState', ['level', 'slope', 'seasons', 'time'])
+
+
+class DoubleSeasonalSmoothing:
+    """Taylor's double seasonal Holt-Winters recursion in plain NumPy.
+
+    Two seasonal components of ``periods`` (e.g. 24 and 168 for hourly data)
+    are kept in ring buffers of their own length, so the state holds
+    m1 + m2 seasonal values instead of one cycle of lcm(m1, m2). Like
+    ExponentialSmoothing, coefficients and state may carry leading
+    dimensions and the recursion runs over all of them at once.
+    """
+
+    def __init__(self, periods, trend=None, damped=False, seasonal='add'):
+        self.periods = tuple(periods)
+        self.trend = trend
+        self.damped = damped
+        self.seasonal = seasonal
+
+    def _combine(self, value, first, second):
+        if self.seasonal == 'mul':
+            return value * first * second
+        return value + first + second
+
+    def _remove(self, value, *components):
+        for component in components:
+            value = value / component if self.seasonal == 'mul' else value - component
+        return value
+
+    def initial_state(self, input_array):
+        """Heuristic start: level and slope of the first long cycles, the long cycle split into both components."""
+        input_array = np.asarray(input_array, dtype=float)
+        short, long = self.periods
+        first = input_array[..., :long]
+        level = first.mean(axis=-1)
+        slope = np.zeros_like(level)
+        if self.trend and input_array.shape[-1] >= 2 * long:
+            slope = (input_array[..., long:2 * long].mean(axis=-1) - level) / long
+        deviations = self._remove(first, level[..., None])
+        positions = np.arange(long) % short
+        short_seasons = np.stack(
+            [deviations[..., positions == position].mean(axis=-1) for position in range(short)], axis=-1
+        )
+        long_seasons = self._remove(deviations, short_seasons[..., positions])
+        return DoubleSeasonalState(level, slope, (short_seasons, long_seasons), 0)
+
+    def filter(self, input_array, state, alpha, beta=0.0, gamma=0.0, delta=0.0, phi=1.0):
+        """Run the recursion over ``input_array[..., t]``; returns the final state and one-step predictions."""
+        input_array = np.asarray(input_array, dtype=float)
+        length = input_array.shape[-1]
+        shape = np.broadcast(input_array[..., 0] if length else 0.0, state.level, state.slope,
+                             alpha, beta, gamma, delta, phi).shape
+        level = np.array(np.broadcast_to(state.level, shape), dtype=float)
+        slope = np.array(np.broadcast_to(state.slope, shape), dtype=float)
+        seasons = [
+            np.array(np.broadcast_to(component, shape + (period,)), dtype=float)
+            for component, period in zip(state.seasons, self.periods)
+        ]
+        (short, long), time = self.periods, state.time
+        damped_phi = phi if self.damped else 1.0
+        predictions = np.empty(shape + (length,))
+
+        for t in range(length):
+            observation = input_array[..., t]
+            first, second = seasons[0][..., time % short], seasons[1][..., time % long]
+            base = level + damped_phi * slope if self.trend else level
+            predictions[..., t] = self._combine(base, first, second)
+            new_level = alpha * self._remove(observation, first, second) + (1 - alpha) * base
+            if self.trend:
+                slope = beta * (new_level - level) + (1 - beta) * damped_phi * slope
+            level = new_level
+            # ``first`` and ``second`` are views of the buffers: compute both updates before writing either
+            new_first = gamma * self._remove(observation, level, second) + (1 - gamma) * first
+            new_second = delta * self._remove(observation, level, first) + (1 - delta) * second
+            seasons[0][..., time % short], seasons[1][..., time % long] = new_first, new_second
+            time += 1
+
+        return DoubleSeasonalState(level, slope, tuple(seasons), time), predictions
+
+    def forecast(self, state, horizon, phi=1.0):
+        steps = np.arange(1, horizon + 1)
+        level = np.asarray(state.level, dtype=float)[..., None]
+        if self.trend:
+            slope = np.asarray(state.slope, dtype=float)[..., None]
+            if self.damped:
+                slope_steps = np.cumsum(np.asarray(phi, dtype=float)[..., None] ** steps, axis=-1)
+            else:
+                slope_steps = steps
+            base = level + slope * slope_steps
+        else:
+            base = level + np.zeros(horizon)
+        (short, long), time = self.periods, state.time
+        first = np.asarray(state.seasons[0])[..., (time + steps - 1) % short]
+        second = np.asarray(state.seasons[1])[..., (time + steps - 1) % long]
+        return self._combine(base, first, second)
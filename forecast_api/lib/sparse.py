@@ -0,0 +1,38 @@
+import numpy as np
+
+from collections import namedtuple
+
+from forecast_api.lib.exceptions import InvalidSparseInputParameter
+from forecast_api.lib.param_parsers import parse_integer_param
+
+
+# the series is zero everywhere but at the (strictly increasing) ``index``, where it is ``values``
+SparseSeries = namedtuple('SparseSeries', ['length', 'index', 'values'])
+
+
+def parse_sparse_input(input_data):
+    """A SparseSeries from ``{length, index, values}`` or from a dense list (keeping its nonzero points)."""
+    if not isinstance(input_data, dict):
+        values = np.asarray(input_data, dtype=float)
+        if values.ndim != 1:
+            raise InvalidSparseInputParameter(f'input_data should be one series (got shape {values.shape})')
+        index = np.flatnonzero(values)
+        return SparseSeries(len(values), index, values[index])
+
+    unknown = set(input_data) - {'length', 'index', 'values'}
+    if unknown or 'length' not in input_data:
+        raise InvalidSparseInputParameter('sparse input_data should be {length, index, values}')
+    length = parse_integer_param('input_data.length', input_data['length'], param_min=1)
+    try:
+        index = np.asarray(input_data.get('index', []), dtype=np.int64)
+        values = np.asarray(input_data.get('values', []), dtype=float)
+    except (TypeError, ValueError) as e:
+        raise InvalidSparseInputParameter(f'input_data.index and input_data.values should be numeric lists ({e})')
+    if index.ndim != 1 or index.shape != values.shape:
+        raise InvalidSparseInputParameter('input_data.index and input_data.values should be lists of the same length')
+    if len(index) and (index[0] < 0 or index[-1] >= length or np.any(np.diff(index) <= 0)):
+        raise InvalidSparseInputParameter(
+            f'input_data.index should be strictly increasing positions in [0, {length})'
+        )
+    nonzero = values != 0
+    return SparseSeries(length, index[nonzero], values[nonzero])
@@ -0,0 +1,233 @@
+import json
+import re
+import warnings
+import numpy as np
+
+from collections import namedtuple
+
+from forecast_api.lib.exceptions import PayloadTooLarge
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_CAPACITY = 1024
+
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_IN_STRING = re.compile(rb'["\\]')
+_WHITESPACE = b' \t\r\n'
+_NUMBER_START = b'-0123456789'
+
+# parser states
+_SCAN, _COLON, _VALUE, _FIRST, _ARRAY = range(5)
+
+
+class FloatBuffer:
+    """A float64 array grown by doubling, filled with whole arrays (never with Python floats)."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_size=None):
+        self._data = np.empty(max(int(capacity), 1))
+        self._size = 0
+        self._max_size = max_size
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, values):
+        size = self._size + len(values)
+        if self._max_size is not None and size > self._max_size:
+            raise PayloadTooLarge(f'input_data has more than {self._max_size} points')
+        if size > len(self._data):
+            data = np.empty(max(size, 2 * len(self._data)))
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:size] = values
+        self._size = size
+
+    def array(self):
+        return self._data[:self._size]
+
+
+def _parse_numbers(text):
+    """The comma separated numbers of ``text`` as one float64 array, or ValueError if any is not a number."""
+    try:
+        with warnings.catch_warnings():
+            # older NumPy only warns (and stops) at the first token that is not a number
+            warnings.simplefilter('ignore', DeprecationWarning)
+            values = np.fromstring(text.decode('ascii'), sep=',')
+    except (UnicodeDecodeError, ValueError):
+        values = None
+    if values is None or len(values) != text.count(b',') + 1:
+        raise ValueError('input_data should be an array of numbers')
+    return values
+
+
+class JsonStreamParser:
+    """Incremental parser of a JSON object whose ``array_key`` member is a (possibly huge) array of numbers.
+
+    Chunks are scanned with regular expressions for the few characters
+    that matter (quotes, brackets and braces), so the scan runs in C. The
+    rest of the object is kept as bytes and parsed by ``json`` at the end;
+    the numbers of ``array_key`` go from the bytes straight into a
+    FloatBuffer through ``np.fromstring``. If ``array_key`` is anything but
+    a flat array of numbers (e.g. a list of series or a sparse object), it
+    is left to ``json`` too.
+    """
+
+    def __init__(self, array_key='input_data', capacity=DEFAULT_CAPACITY, max_points=None):
+        self._array_key = array_key
+        self._key = json.dumps(array_key).encode()
+        self._capacity = capacity
+        self._max_points = max_points
+        self._rest = bytearray()
+        self._buffer = None
+        self._state = _SCAN
+        self._depth = 0
+        self._in_string = self._escaped = False
+        self._string_start = None
+        self._number = bytearray()
+        self._seen_number = False
+
+    def feed(self, chunk):
+        position = 0
+        while position < len(chunk):
+            if self._state == _SCAN:
+                position = self._scan(chunk, position)
+            elif self._state == _ARRAY:
+                position = self._array(chunk, position)
+            else:
+                position = self._after_key(chunk, position)
+
+    def close(self):
+        if self._state != _SCAN or self._depth or self._in_string:
+            raise ValueError('Invalid JSON: unexpected end of the body')
+        try:
+            media = json.loads(bytes(self._rest))
+        except ValueError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+        if not isinstance(media, dict):
+            raise ValueError('Invalid JSON: the body should be an object')
+        if self._buffer is not None:
+            media[self._array_key] = self._buffer.array()
+        return media
+
+    def _scan(self, chunk, position):
+        if self._escaped:
+            self._rest += chunk[position:position + 1]
+            self._escaped = False
+            return position + 1
+        match = (_IN_STRING if self._in_string else _STRUCTURAL).search(chunk, position)
+        if match is None:
+            self._rest += chunk[position:]
+            return len(chunk)
+        end = match.end()
+        self._rest += chunk[position:end]
+        character = chunk[match.start():end]
+        if self._in_string:
+            if character == b'\\':
+                self._escaped = True
+            else:
+                self._in_string = False
+                if self._depth == 1 and self._rest[self._string_start:] == self._key:
+                    self._state = _COLON
+        elif character == b'"':
+            self._in_string = True
+            self._string_start = len(self._rest) - 1
+        elif character in b'{[':
+            self._depth += 1
+        else:
+            self._depth -= 1
+        return end
+
+    def _after_key(self, chunk, position):
+        """Between the key and its value: a flat array of numbers is streamed, anything else scanned."""
+        byte = chunk[position:position + 1]
+        if byte in _WHITESPACE:
+            self._rest += byte
+            return position + 1
+        if self._state == _COLON:
+            self._state = _VALUE if byte == b':' else _SCAN
+            if byte == b':':
+                self._rest += byte
+                return position + 1
+            return position
+        if self._state == _VALUE:
+            if byte != b'[':
+                self._state = _SCAN
+                return position
+            self._state = _FIRST
+            return position + 1
+        # _FIRST: just after the opening bracket, the first element tells whether to stream
+        if byte in _NUMBER_START or byte == b']':
+            self._state = _ARRAY
+            self._buffer = FloatBuffer(self._capacity, self._max_points)
+            self._seen_number = False
+            self._rest += b'null'
+        else:
+            self._state = _SCAN
+            self._depth += 1
+            self._rest += b'['
+        return position
+
+    def _array(self, chunk, position):
+        end = chunk.find(b']', position)
+        self._number += chunk[position:len(chunk) if end < 0 else end]
+        if end < 0:
+            # parse up to the last comma, the number after it may go on in the next chunk
+            last_comma = self._number.rfind(b',')
+            if last_comma >= 0:
+                self._buffer.extend(_parse_numbers(bytes(self._number[:last_comma])))
+                self._seen_number = True
+                del self._number[:last_comma + 1]
+            # whitespace around the pending number may run on for any length, keep at most one space of it
+            number = self._number.strip()
+            if number and self._number[-1:] in _WHITESPACE:
+                number += b' '
+            self._number[:] = number
+            if len(self._number) > 64:
+                raise ValueError('input_data should be an array of numbers')
+            return len(chunk)
+        if self._number.strip() or self._seen_number:
+            self._buffer.extend(_parse_numbers(bytes(self._number)))
+        self._number.clear()
+        self._state = _SCAN
+        return end + 1
+
+
+def parse_json_stream(stream, array_key='input_data', chunk_size=DEFAULT_CHUNK_SIZE, max_bytes=None,
+                      max_points=None, size_hint=None):
+    """Read the JSON object of ``stream`` in ``chunk_size`` chunks; ``array_key`` is decoded into a float64 array.
+
+    Raises PayloadTooLarge as soon as more than ``max_bytes`` are read or
+    ``array_key`` has more than ``max_points`` numbers, and ValueError if
+    the body is not valid JSON. ``size_hint`` (the content length) sizes
+    the initial buffer.
+    """
+    capacity = DEFAULT_CAPACITY if size_hint is None else max(DEFAULT_CAPACITY, size_hint // 16)
+    if max_points is not None:
+        capacity = min(capacity, max_points)
+    parser = JsonStreamParser(array_key, capacity, max_points)
+    read = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        read += len(chunk)
+        if max_bytes is not None and read > max_bytes:
+            raise PayloadTooLarge(f'the body is larger than {max_bytes} bytes')
+        parser.feed(chunk)
+    return parser.close()
+
+
+DEFAULT_MAX_BODY_BYTES = 256 * 2**20
+DEFAULT_MAX_INPUT_POINTS = 10**7
+
+# max_body_bytes and max_input_points of a request body; chunk_size is how much is read at a time
+RequestLimits = namedtuple('RequestLimits', ['max_body_bytes', 'max_input_points', 'chunk_size'])
+
+
+def request_limits(config):
+    """RequestLimits from ``max_body_bytes``, ``max_input_points`` and ``body_chunk_bytes`` of ``[forecast_api]``."""
+    return RequestLimits(
+        config.getint('forecast_api', 'max_body_bytes', fallback=DEFAULT_MAX_BODY_BYTES),
+        config.getint('forecast_api', 'max_input_points', fallback=DEFAULT_MAX_INPUT_POINTS),
+        config.getint('forecast_api', 'body_chunk_bytes', fallback=DEFAULT_CHUNK_SIZE),
+    )
@@ -5,3 +5,22 @@ from forecast_api.methods.holt import Holt
 from forecast_api.methods.holt import parse_params as holt_parse_params
 from forecast_api.methods.holtwinter import HoltWinter
 from forecast_api.methods.holtwinter import parse_params as holtwinter_parse_params
+from forecast_api.methods.naive import SeasonalNaive
+from forecast_api.methods.naive import parse_params as seasonal_naive_parse_params
+from forecast_api.methods.naive import model as seasonal_naive_model
+from forecast_api.methods.ses import SES
+from forecast_api.methods.ses import parse_params as ses_parse_params
+from forecast_api.methods.ses import model as ses_model
+from forecast_api.methods.theta import Theta
+from forecast_api.methods.theta import parse_params as theta_parse_params
+from forecast_api.methods.theta import model as theta_model
+from forecast_api.methods.croston import Croston
+from forecast_api.methods.croston import parse_params as croston_parse_params
+from forecast_api.methods.croston import model as croston_model
+from forecast_api.methods.double_seasonal import DoubleSeasonalHoltWinter
+from forecast_api.methods.double_seasonal import parse_params as double_seasonal_parse_params
+from forecast_api.methods.double_seasonal import model as double_seasonal_model
+from forecast_api.methods.auto import Auto
+from forecast_api.methods.auto import parse_params as auto_parse_params
+from forecast_api.methods.registry import MethodRegistry
+from forecast_api.methods.registry import MethodSpec
@@ -0,0 +1,225 @@
+import numpy as np
+
+from functools import partial
+
+from forecast_api.lib.accuracy import aic
+from forecast_api.lib.accuracy import aicc
+from forecast_api.lib.accuracy import rmse
+from forecast_api.lib.diagnostics import in_current_context
+from forecast_api.lib.seasonality import detect_seasonal_periods
+from forecast_api.lib.param_parsers import (
+    parse_boolean_param,
+    parse_integer_param,
+    parse_list_param,
+    parse_numeric_param,
+    parse_string_param,
+)
+from forecast_api.methods.registry import COST_CHEAP
+
+
+CRITERIA = ['aicc', 'aic', 'holdout']
+CANDIDATE_METHODS = ['average', 'ses', 'holt', 'holtwinter']
+AVERAGE_WINDOWS = (1, 2, 4, 8, 12)
+AUTO_SEASONAL_PERIODS = 'auto'
+AUTO_SEASONAL_PERIODS_MAX = 2
+
+# a partial fit on the most recent points is only worth it when it is much shorter than the series
+_PRUNE_MIN_WINDOW = 24
+
+
+def parse_params(**params):
+
+    criterion = 'aicc'
+    if 'criterion' in params and params['criterion'] is not None:
+        criterion = parse_string_param('criterion', params['criterion'], CRITERIA)
+
+    holdout = None
+    if 'holdout' in params and params['holdout'] is not None:
+        holdout = parse_integer_param('holdout', params['holdout'], param_min=1)
+
+    seasonal_periods = []
+    if 'seasonal_periods' in params and params['seasonal_periods'] is not None:
+        if params['seasonal_periods'] == AUTO_SEASONAL_PERIODS:
+            seasonal_periods = AUTO_SEASONAL_PERIODS
+        elif isinstance(params['seasonal_periods'], list):
+            seasonal_periods = parse_list_param(
+                'seasonal_periods', params['seasonal_periods'], partial(parse_integer_param, param_min=2)
+            )
+        else:
+            seasonal_periods = [parse_integer_param('seasonal_periods', params['seasonal_periods'], param_min=2)]
+
+    methods = list(CANDIDATE_METHODS)
+    if 'methods' in params and params['methods'] is not None:
+        methods = parse_list_param(
+            'methods', params['methods'], partial(parse_string_param, allowed=CANDIDATE_METHODS), min_length=1
+        )
+
+    prune = True
+    if 'prune' in params and params['prune'] is not None:
+        prune = parse_boolean_param('prune', params['prune'])
+
+    prune_ratio = 2.0
+    if 'prune_ratio' in params and params['prune_ratio'] is not None:
+        prune_ratio = parse_numeric_param('prune_ratio', params['prune_ratio'], param_min=1)
+
+    return {
+        'criterion': criterion,
+        'holdout': holdout,
+        'seasonal_periods': seasonal_periods,
+        'methods': methods,
+        'prune': prune,
+        'prune_ratio': prune_ratio,
+    }
+
+
+def candidate_configs(input_array, fit_length, methods, seasonal_periods):
+    """(method, params) pairs that can be fitted on ``fit_length`` points of ``input_array``."""
+    positive = bool(np.all(input_array > 0))
+    candidates = []
+    if 'average' in methods:
+        candidates += [('average', {'window': window}) for window in AVERAGE_WINDOWS if window < fit_length]
+    if 'ses' in methods and fit_length >= 2:
+        candidates.append(('ses', {}))
+    if 'holt' in methods and fit_length >= 4:
+        candidates.append(('holt', {}))
+        if positive:
+            candidates.append(('holt', {'exponential': True}))
+            candidates.append(('holt', {'exponential': True, 'damped': True}))
+    if 'holtwinter' in methods:
+        for period in seasonal_periods:
+            if fit_length < 2 * period:
+                continue
+            for seasonal in (['add', 'mul'] if positive else ['add']):
+                for trend, damped in [(None, False), ('add', False), ('add', True)]:
+                    candidates.append(('holtwinter', {
+                        'trend': trend,
+                        'damped': damped,
+                        'seasonal': seasonal,
+                        'seasonal_periods': period,
+                    }))
+    return candidates
+
+
+class Auto:
+    """Fits a set of Average, Holt and Holt-Winters candidates in parallel and forecasts with the best one.
+
+    Candidates are scored by AIC/AICc of the fit on the whole series or by the
+    RMSE of a forecast of the last ``holdout`` points. With ``prune`` every
+    candidate is first fitted on only the most recent part of a long series,
+    and the ones whose error there is more than ``prune_ratio`` times the best
+    one are dropped before the full fits. With ``seasonal_periods: auto`` the
+    Holt-Winters candidates use the (up to two) periods detected in the series.
+    """
+
+    def __init__(self, params_parser, registry, executor):
+        self._parse_params = params_parser
+        self._registry = registry
+        self._executor = executor
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        input_array = np.array(input_data, dtype=float)
+        holdout = params['holdout'] or forecast_horizon
+        params['holdout'] = holdout
+        if params['seasonal_periods'] == AUTO_SEASONAL_PERIODS:
+            params['seasonal_periods'] = detect_seasonal_periods(input_array, max_periods=AUTO_SEASONAL_PERIODS_MAX)
+
+        fit_length = len(input_array) - holdout if params['criterion'] == 'holdout' else len(input_array)
+        candidates = candidate_configs(input_array, fit_length, params['methods'], params['seasonal_periods'])
+        if not candidates:
+            raise ValueError(f'input_data of length {len(input_array)} is too short to fit any candidate')
+        # cheap methods first, so they are already running when the expensive ones queue up
+        candidates.sort(key=lambda candidate: self._registry.spec(candidate[0]).cost != COST_CHEAP)
+
+        report = [{'method': method, 'config': config} for method, config in candidates]
+        alive = list(range(len(candidates)))
+        if params['prune']:
+            alive = self._prune(input_array, holdout, candidates, report, params['prune_ratio'])
+
+        results = self._score(input_array, forecast_horizon, holdout, candidates, alive, report, params)
+        if not results:
+            raise ValueError('none of the candidate models could be fitted')
+        best = min(results, key=lambda index: report[index]['score'])
+        method, config = candidates[best]
+
+        result = results[best]
+        if params['criterion'] == 'holdout':
+            result = self._registry.engine(method).fit_forecast(input_array, forecast_horizon, **config)
+
+        return {
+            'forecast': list(result['forecast']),
+            'params': params,
+            'selected': {
+                'method': method,
+                'config': config,
+                'params': result['params'],
+                'score': report[best]['score'],
+            },
+            'candidates': report,
+        }
+
+    def _submit(self, method, operation, *args, **kwargs):
+        function = in_current_context(getattr(self._registry.engine(method), operation))
+        return self._executor.submit(function, *args, **kwargs)
+
+    def _prune(self, input_array, holdout, candidates, report, prune_ratio):
+        longest_period = max([config.get('seasonal_periods', 1) for _, config in candidates])
+        window = max(4 * longest_period, _PRUNE_MIN_WINDOW) + holdout
+        if window > len(input_array) // 2:
+            return list(range(len(candidates)))
+
+        recent = input_array[-window:]
+        futures = [
+            self._submit(method, 'fit_forecast', recent[:-holdout], holdout, **config)
+            for method, config in candidates
+        ]
+        errors = {}
+        for index, future in enumerate(futures):
+            try:
+                errors[index] = rmse(recent[-holdout:], future.result()['forecast'])
+            except Exception as e:
+                report[index].update({'status': 'failed', 'error': f'{e}'})
+        if not errors:
+            return []
+
+        cutoff = prune_ratio * min(errors.values())
+        alive = []
+        for index, error in errors.items():
+            if error > cutoff:
+                report[index].update({'status': 'pruned', 'partial_score': error})
+            else:
+                alive.append(index)
+        return alive
+
+    def _score(self, input_array, forecast_horizon, holdout, candidates, alive, report, params):
+        criterion = params['criterion']
+        futures = {}
+        for index in alive:
+            method, config = candidates[index]
+            if criterion == 'holdout':
+                futures[index] = self._submit(method, 'fit_forecast', input_array[:-holdout], holdout, **config)
+            else:
+                futures[index] = self._submit(method, 'fit_evaluate', input_array, forecast_horizon, **config)
+
+        results = {}
+        for index, future in futures.items():
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                report[index].update({'status': 'failed', 'error': f'{e}'})
+        # candidates report their SSE over different numbers of one-step errors (an average of window w has
+        # n - w); all are scored over the n points of the series from their mean squared error, or the choice
+        # would depend on the units of the data
+        nobs = len(input_array)
+        information_criterion = aicc if criterion == 'aicc' else aic
+        for index, result in list(results.items()):
+            if criterion == 'holdout':
+                score = rmse(input_array[-holdout:], result['forecast'])
+            else:
+                score = information_criterion(result['sse'] / result['nobs'] * nobs, nobs, result['n_params'])
+            if not np.isfinite(score):
+                report[index].update({'status': 'failed', 'error': f'{criterion} is not finite'})
+                del results[index]
+                continue
+            report[index].update({'status': 'evaluated', 'score': score})
+        return results
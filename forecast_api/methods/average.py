@@ -1,31 +1,144 @@
 import numpy as np
 
+from forecast_api.lib.backtest import (
+    fold_cutoffs,
+    score_folds,
+)
 
 from forecast_api.lib.exceptions import (
     InvalidAverageWindowParameter,
 )
 
-from forecast_api.lib.param_parsers import (
-    parse_integer_param,
-)
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
 
 
-def parse_params(**params):
+KINDS = ['mean', 'ewm', 'seasonal_naive']
+AUTO_WINDOW = 'auto'
+AUTO_MAX_WINDOW = 52
 
-    if 'window' not in params:
-        raise InvalidAverageWindowParameter(f"'window' is a natural number and is a required parameter")
-    window = parse_integer_param('window', params['window'], param_min=1)
-
-    return {
-        'window': window,
-    }
 
+PARAMS = ParamSpec(
+    [
+        Field('window', 'integer', 'Number of points averaged, a list of windows to choose from or auto',
+              minimum=1, literals=[AUTO_WINDOW], allow_list=True, required=True,
+              error=InvalidAverageWindowParameter,
+              message="'window' is a natural number and is a required parameter"),
+        Field('kind', 'string', 'Kind of average', default='mean', choices=KINDS),
+    ],
+    description='Parameters of the moving average; a list of windows or auto picks the best in sample',
+)
 
-def model(input_array, horizon, window):
-    return [input_array[-window:].mean()]*horizon
+parse_params = PARAMS.compile()
+
+
+def candidate_windows(window, length):
+    """The windows to choose from: ``window`` itself, every window of a list, or 1 up to half the series for auto."""
+    if window == AUTO_WINDOW:
+        return list(range(1, max(1, min(AUTO_MAX_WINDOW, length // 2)) + 1))
+    if isinstance(window, list):
+        return sorted(set(window))
+    return [window]
+
+
+def _ewm_levels(input_array, window):
+    from scipy.signal import lfilter
+
+    # exponentially weighted mean with the span convention alpha = 2 / (window + 1), started at the first value
+    alpha = 2 / (window + 1)
+    initial = (1 - alpha) * input_array[..., :1]
+    levels, _ = lfilter([alpha], [1, alpha - 1], input_array, axis=-1, zi=initial)
+    return levels
+
+
+def _padded_cumsum(input_array):
+    cumsum = np.cumsum(input_array, axis=-1, dtype=float)
+    return np.concatenate([np.zeros(input_array.shape[:-1] + (1,)), cumsum], axis=-1)
+
+
+def one_step_predictions(input_array, window, kind='mean'):
+    """In-sample one-step ahead predictions of every point from ``window`` on (nan before)."""
+    predictions = np.full(input_array.shape, np.nan)
+    if window >= input_array.shape[-1]:
+        return predictions
+    if kind == 'mean':
+        cumsum = _padded_cumsum(input_array)
+        predictions[..., window:] = (cumsum[..., window:-1] - cumsum[..., :-window-1]) / window
+    elif kind == 'ewm':
+        predictions[..., window:] = _ewm_levels(input_array, window)[..., window-1:-1]
+    else:
+        predictions[..., window:] = input_array[..., :-window]
+    return predictions
+
+
+def in_sample_mse(input_array, windows, kind='mean'):
+    """One-step mean squared error of every window, shaped (windows, ...), over the points all windows predict.
+
+    Trailing means of all windows come from a single cumulative sum, so the
+    sweep is O(n) per window.
+    """
+    start = max(windows)
+    length = input_array.shape[-1]
+    if start >= length:
+        return np.full((len(windows),) + input_array.shape[:-1], np.nan)
+    if kind == 'mean':
+        times = np.arange(start, length)
+        sizes = np.asarray(windows)[:, None]
+        cumsum = _padded_cumsum(input_array)
+        predictions = np.moveaxis((cumsum[..., None, times] - cumsum[..., times - sizes]) / sizes, -2, 0)
+    else:
+        predictions = np.stack([one_step_predictions(input_array, window, kind)[..., start:] for window in windows])
+    return np.mean((input_array[..., start:] - predictions)**2, axis=-1)
+
+
+def in_sample_sse(input_array, window, kind='mean'):
+    """Sum of squared one-step errors over the points that have a full window, and their number."""
+    errors = input_array[window:] - one_step_predictions(input_array, window, kind)[window:]
+    return float(np.sum(errors**2)), len(errors)
+
+
+def _forecast_window(input_array, horizon, window, kind):
+    length = input_array.shape[-1]
+    if kind == 'mean':
+        level = input_array[..., -window:].mean(axis=-1)
+    elif kind == 'ewm':
+        level = _ewm_levels(input_array, window)[..., -1]
+    else:
+        if window > length:
+            raise InvalidAverageWindowParameter(
+                f'window ({window}) should be <= the length of input_data ({length}) if kind = {kind}'
+            )
+        return input_array[..., length - window + np.arange(horizon) % window]
+    return np.repeat(level[..., None], horizon, axis=-1)
+
+
+def model(input_array, horizon, window, kind='mean'):
+    """Forecast of every series (last axis is time) with one window or one window per series."""
+    input_array = np.asarray(input_array, dtype=float)
+    windows = np.broadcast_to(window, input_array.shape[:-1])
+    forecast = np.empty(input_array.shape[:-1] + (horizon,))
+    for unique_window in np.unique(windows):
+        rows = windows == unique_window
+        forecast[rows] = _forecast_window(input_array[rows], horizon, int(unique_window), kind)
+    return forecast
+
+
+def trailing_means(input_array, cutoffs, window):
+    """Mean of the last ``window`` points (or all of them if fewer) before every cutoff, from one cumulative sum."""
+    cumsum = np.concatenate(([0.0], np.cumsum(input_array, dtype=float)))
+    cutoffs = np.asarray(cutoffs)
+    starts = np.maximum(cutoffs - window, 0)
+    return (cumsum[cutoffs] - cumsum[starts]) / (cutoffs - starts)
 
 
 class Average:
+    """Trailing mean, exponentially weighted mean or seasonal naive forecast.
+
+    ``window`` is the number of points averaged, the span of the weighted
+    mean or the seasonal period. With a list of windows or ``auto`` the one
+    with the lowest in-sample one-step error is used, per series when
+    ``input_data`` is a 2-d batch of series. Forecasts are NumPy arrays.
+    """
 
     def __init__(self, params_parser, forecast_method):
         self._parse_params = params_parser
@@ -34,19 +147,68 @@ class Average:
     def fit_forecast(self, input_data, forecast_horizon, **params):
         return self.forecast(input_data, forecast_horizon, **params)
 
+    def fit_forecast_batch(self, input_matrix, forecast_horizon, **params):
+        """One result per row of ``input_matrix``, all forecast in one vectorized call."""
+        result = self.forecast(input_matrix, forecast_horizon, **params)
+        windows = np.broadcast_to(result['params']['window'], len(result['forecast']))
+        results = []
+        for index, (forecast, window) in enumerate(zip(result['forecast'], windows)):
+            row = {'forecast': forecast, 'params': dict(result['params'], window=int(window))}
+            if 'windows' in result:
+                row['windows'] = [
+                    {'window': entry['window'], 'mse': entry['mse'][index]} for entry in result['windows']
+                ]
+            results.append(row)
+        return results
+
+    def fit_evaluate(self, input_data, forecast_horizon, **params):
+        result = self.forecast(input_data, forecast_horizon, **params)
+        params = result['params']
+        sse, nobs = in_sample_sse(np.array(input_data, dtype=float), params['window'], params['kind'])
+        result['sse'] = sse
+        result['nobs'] = nobs
+        result['n_params'] = 1
+        return result
+
     def forecast(self, input_data, forecast_horizon, **params):
         params = self._parse_params(**params)
+        input_array = np.array(input_data, dtype=float)
+
+        result = {}
+        windows = candidate_windows(params['window'], input_array.shape[-1])
+        window = windows[0]
+        if len(windows) > 1:
+            mse = in_sample_mse(input_array, windows, params['kind'])
+            window = np.asarray(windows)[np.argmin(np.where(np.isnan(mse), np.inf, mse), axis=0)]
+            result['windows'] = [{'window': candidate, 'mse': mse[index]} for index, candidate in enumerate(windows)]
+        params['window'] = np.asarray(window).tolist()
 
         forecast = self._forecast_method(
-            np.array(input_data),
+            input_array,
             forecast_horizon,
-            params.get('window')
+            window,
+            params['kind']
         )
 
-        return {
+        return dict({
             'forecast': forecast,
             'params': params
-        }
+        }, **result)
+
+    def backtest(self, input_data, forecast_horizon, initial_window, step=1, executor=None, **params):
+        input_array = np.array(input_data, dtype=float)
+        cutoffs = fold_cutoffs(len(input_array), forecast_horizon, initial_window, step)
+        params = self._parse_params(**params)
+        if params['kind'] == 'mean' and isinstance(params['window'], int):
+            means = trailing_means(input_array, cutoffs, params['window'])
+            forecasts = np.repeat(means[:, None], forecast_horizon, axis=1)
+        else:
+            forecasts = [
+                self.forecast(input_array[:cutoff], forecast_horizon, **params)['forecast'] for cutoff in cutoffs
+            ]
+        result = score_folds(input_array, cutoffs, forecasts, forecast_horizon)
+        result['params'] = params
+        return result
 
 
 if __name__ == '__main__':
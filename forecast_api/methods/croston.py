@@ -0,0 +1,83 @@
+import numpy as np
+
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.sparse import parse_sparse_input
+
+
+VARIANTS = ['croston', 'sba', 'tsb']
+
+
+PARAMS = ParamSpec(
+    [
+        Field('variant', 'string', 'Croston, its bias corrected SBA variant or TSB', default='croston',
+              choices=VARIANTS),
+        Field('alpha', 'number', 'The alpha factor used to smooth demand sizes', default=0.1, minimum=0, maximum=1),
+        Field('beta', 'number', 'The beta factor used to smooth intervals (TSB: the demand probability)',
+              default=0.1, minimum=0, maximum=1),
+    ],
+    description='Parameters of the Croston family of intermittent demand methods',
+)
+
+parse_params = PARAMS.compile()
+
+
+def smoothed(values, alpha):
+    """Last level of exponential smoothing of ``values`` started at the first one, as one weighted sum."""
+    count = len(values)
+    weights = alpha * (1 - alpha) ** np.arange(count - 2, -1, -1)
+    return (1 - alpha) ** (count - 1) * values[0] + weights @ values[1:]
+
+
+def model(sparse, alpha, beta, variant='croston'):
+    """Demand rate per period of an intermittent series, computed over its nonzero events only.
+
+    Croston smooths the demand sizes (``alpha``) and the intervals between
+    demands (``beta``) at the events and forecasts their ratio; SBA removes
+    its bias with a factor ``1 - beta / 2``. TSB smooths the demand
+    probability every period instead, which between two events is a plain
+    geometric decay, so it too only needs the event positions. Returns the
+    rate and the smoothed components.
+    """
+    if not len(sparse.index):
+        return 0.0, {'size': 0.0}
+    size = smoothed(sparse.values, alpha)
+    intervals = np.diff(sparse.index, prepend=-1).astype(float)
+
+    if variant == 'tsb':
+        # p <- (1 - beta) p + beta at an event, p <- (1 - beta) p at a zero, from 1 / first interval
+        decay = (1 - beta) ** (sparse.length - 1 - sparse.index)
+        probability = decay[0] / intervals[0] + beta * np.sum(decay[1:])
+        return size * probability, {'size': size, 'probability': probability}
+
+    interval = smoothed(intervals, beta)
+    rate = size / interval
+    if variant == 'sba':
+        rate *= 1 - beta / 2
+    return rate, {'size': size, 'interval': interval}
+
+
+class Croston:
+    """Croston, SBA and TSB forecasts of intermittent demand.
+
+    ``input_data`` is a list or a sparse ``{length, index, values}`` object
+    with the positions and values of the nonzero points; either way only the
+    nonzero events are processed.
+    """
+
+    def __init__(self, params_parser, forecast_method):
+        self._parse_params = params_parser
+        self._forecast_method = forecast_method
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        return self.forecast(input_data, forecast_horizon, **params)
+
+    def forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        sparse = parse_sparse_input(input_data)
+        rate, components = self._forecast_method(sparse, params['alpha'], params['beta'], params['variant'])
+        return {
+            'forecast': np.full(forecast_horizon, float(rate)),
+            'params': params,
+            'components': {name: float(value) for name, value in components.items()},
+        }
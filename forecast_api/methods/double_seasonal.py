@@ -0,0 +1,159 @@
+import numpy as np
+
+from forecast_api.lib.diagnostics import record_optimize_result
+from forecast_api.lib.exceptions import (
+    InvalidSeasonalParameters,
+    InvalidTrendParameters,
+)
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.params import Rule
+from forecast_api.lib.smoothing import DoubleSeasonalSmoothing
+
+
+COEFFICIENTS = ('alpha', 'beta', 'gamma', 'delta', 'phi')
+PHI_BOUNDS = (0.8, 0.995)
+_STARTS = {'alpha': 0.1, 'beta': 0.01, 'gamma': 0.1, 'delta': 0.1, 'phi': 0.98}
+_STEP = 1e-6
+
+
+def _optimized(params):
+    optimized = {
+        'optimized_alpha': params['alpha'] is None,
+        'optimized_beta': bool(params['trend']) and params['beta'] is None,
+        'optimized_gamma': params['gamma'] is None,
+        'optimized_delta': params['delta'] is None,
+        'optimized_phi': params['damped'] and params['phi'] is None,
+    }
+    return dict(optimized, to_fit=any(optimized.values()))
+
+
+PARAMS = ParamSpec(
+    [
+        Field('seasonal_periods', 'array', 'The two seasonal periods, the shorter one first (e.g. [24, 168])',
+              items=Field('seasonal_period', 'integer', minimum=2), min_items=2, required=True,
+              error=InvalidSeasonalParameters,
+              message='seasonal_periods (a list of two periods) is a required parameter'),
+        Field('seasonal', 'string', 'Kind of the seasonal components', default='add', choices=['add', 'mul']),
+        Field('trend', 'string', 'Kind of trend component', choices=['add']),
+        Field('damped', 'boolean', 'Dampen the trend component', default=False),
+        Field('alpha', 'number', 'The alpha factor used to smooth level changes', minimum=0, maximum=1),
+        Field('beta', 'number', 'The beta factor used to smooth trend changes', minimum=0, maximum=1),
+        Field('gamma', 'number', 'The factor used to smooth the shorter cycle', minimum=0, maximum=1),
+        Field('delta', 'number', 'The factor used to smooth the longer cycle', minimum=0, maximum=1),
+        Field('phi', 'number', 'The phi factor used to damp the trend', minimum=0, maximum=1),
+    ],
+    rules=[
+        Rule(lambda p: len(p['seasonal_periods']) != 2 or p['seasonal_periods'][0] >= p['seasonal_periods'][1],
+             InvalidSeasonalParameters,
+             'seasonal_periods ({seasonal_periods}) should be two periods, the shorter one first'),
+        Rule(lambda p: p['damped'] and not p['trend'], InvalidTrendParameters,
+             'trend must be provided if damped = {damped}'),
+        Rule(lambda p: p['beta'] is not None and not p['trend'], InvalidTrendParameters,
+             'trend must be provided if beta = {beta}'),
+        Rule(lambda p: p['phi'] is not None and not p['damped'], InvalidTrendParameters,
+             'damped must be True if phi = {phi}'),
+    ],
+    derive=_optimized,
+    description='Parameters of double seasonal Holt-Winters; coefficients left out are fitted',
+)
+
+parse_params = PARAMS.compile()
+
+
+def _fit(smoothing, state, input_array, fixed, free):
+    """Minimize the mean squared one-step error over the ``free`` coefficients with L-BFGS-B.
+
+    The objective and its forward difference gradient come from a single
+    vectorized pass of the recursion over len(free) + 1 coefficient sets.
+    """
+    from scipy.optimize import minimize
+
+    bounds = np.array([PHI_BOUNDS if name == 'phi' else (0.0, 1.0) for name in free])
+
+    def _objective(x):
+        steps = np.where(x + _STEP > bounds[:, 1], -_STEP, _STEP)
+        points = np.vstack([x, x + np.diag(steps)])
+        coefficients = dict(fixed, **{name: points[:, index] for index, name in enumerate(free)})
+        _, predictions = smoothing.filter(input_array, state, **coefficients)
+        with np.errstate(over='ignore', invalid='ignore'):
+            mse = np.nan_to_num(np.mean((input_array - predictions)**2, axis=-1), nan=np.inf, posinf=np.inf)
+        if not np.isfinite(mse[0]):
+            return np.finfo(float).max, np.zeros(len(free))
+        return mse[0], np.where(np.isfinite(mse[1:]), (mse[1:] - mse[0]) / steps, 0.0)
+
+    start = np.clip([_STARTS[name] for name in free], bounds[:, 0], bounds[:, 1])
+    result = minimize(_objective, start, jac=True, method='L-BFGS-B', bounds=bounds)
+    record_optimize_result(result)
+    return dict(fixed, **dict(zip(free, result.x.tolist())))
+
+
+def model(input_array, forecast_horizon, seasonal_periods, seasonal='add', trend=None, damped=False, **coefficients):
+    """Fit the missing (None) coefficients on ``input_array`` and forecast; returns the forecast, coefficients,
+    initial state and in-sample SSE."""
+    input_array = np.asarray(input_array, dtype=float)
+    short, long = seasonal_periods
+    if input_array.shape[-1] < 2 * long:
+        raise InvalidSeasonalParameters(
+            f'input_data of length {input_array.shape[-1]} should have at least two cycles of {long} points'
+        )
+    if seasonal == 'mul' and np.any(input_array <= 0):
+        raise InvalidSeasonalParameters('seasonal = mul requires strictly positive input_data')
+
+    smoothing = DoubleSeasonalSmoothing(seasonal_periods, trend=trend, damped=damped, seasonal=seasonal)
+    state = smoothing.initial_state(input_array)
+    used = ['alpha', 'gamma', 'delta'] + (['beta'] if trend else []) + (['phi'] if damped else [])
+    fixed = {name: coefficients[name] for name in used if coefficients.get(name) is not None}
+    free = [name for name in used if coefficients.get(name) is None]
+    if free:
+        fixed = _fit(smoothing, state, input_array, fixed, free)
+
+    final, predictions = smoothing.filter(input_array, state, **fixed)
+    return {
+        'forecast': smoothing.forecast(final, forecast_horizon, fixed.get('phi', 1.0)),
+        'coefficients': fixed,
+        'initial_state': state,
+        'sse': float(np.sum((input_array - predictions)**2)),
+    }
+
+
+class DoubleSeasonalHoltWinter:
+    """Holt-Winters with two seasonal cycles (Taylor, 2003), e.g. daily and weekly cycles of hourly data."""
+
+    def __init__(self, params_parser, forecast_method):
+        self._parse_params = params_parser
+        self._forecast_method = forecast_method
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        result, _ = self._fit_forecast(input_data, forecast_horizon, **params)
+        return result
+
+    def fit_evaluate(self, input_data, forecast_horizon, **params):
+        result, fit = self._fit_forecast(input_data, forecast_horizon, **params)
+        params = result['params']
+        result['sse'] = fit['sse']
+        result['nobs'] = len(input_data)
+        result['n_params'] = sum(params[f'optimized_{name}'] for name in COEFFICIENTS)
+        return result
+
+    def forecast(self, input_data, forecast_horizon, **params):
+        if self._parse_params(**params)['to_fit']:
+            raise ValueError(f'use fit_forecast to fit model with provided parameters')
+        return self.fit_forecast(input_data, forecast_horizon, **params)
+
+    def _fit_forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        fit = self._forecast_method(
+            np.array(input_data, dtype=float),
+            forecast_horizon,
+            params['seasonal_periods'],
+            seasonal=params['seasonal'],
+            trend=params['trend'],
+            damped=params['damped'],
+            **{name: params[name] for name in COEFFICIENTS}
+        )
+        params.update(fit['coefficients'])
+        return {
+            'forecast': list(fit['forecast']),
+            'params': params
+        }, fit
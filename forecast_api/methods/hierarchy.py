@@ -0,0 +1,100 @@
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidHierarchyParameter
+from forecast_api.lib.hierarchy import (
+    RECONCILIATIONS,
+    hierarchy_from_paths,
+    parse_hierarchy_param,
+    reconcile_bottom_up,
+    reconcile_top_down,
+    reconcile_wls,
+    top_down_proportions,
+)
+from forecast_api.lib.panel import Panel
+from forecast_api.lib.param_parsers import parse_string_param
+from forecast_api.methods.panel import forecast_panel
+
+
+def _base_forecasts(registry, name, hierarchy, history, nodes, forecast_horizon, operation, **params):
+    """Fit ``nodes`` (indices into the hierarchy) of the (nodes x length) ``history`` as one panel."""
+    length = history.shape[1]
+    panel = Panel(hierarchy.labels[nodes], np.arange(len(nodes) + 1) * length, np.ascontiguousarray(history).ravel())
+    results = forecast_panel(registry, name, panel, forecast_horizon, operation=operation, **params)
+    for result in results:
+        if 'error' in result:
+            raise ValueError(f'base forecast of {result["series_id"]} failed: {result["error"]}')
+    return results
+
+
+def forecast_hierarchy(registry, name, input_data, hierarchy, forecast_horizon, reconciliation='ols', **params):
+    """Coherent forecasts of every node of a hierarchy from the histories of its leaves.
+
+    ``input_data`` holds one series per leaf (all of the same length) and
+    ``hierarchy`` the path of every leaf (see ``parse_hierarchy_param``).
+    Only the levels the ``reconciliation`` needs are fitted, through
+    ``forecast_panel``: the leaves for bottom_up, the total for top_down
+    (split by the leaves' historical proportions) and every node for the
+    least squares reconciliations (ols, wls_struct weighting a node by its
+    number of leaves, wls_var by the in-sample variance of its base fit).
+    """
+    reconciliation = parse_string_param('reconciliation', reconciliation, RECONCILIATIONS)
+    if reconciliation == 'wls_var' and not hasattr(registry.engine(name), 'fit_evaluate'):
+        # the weights are the in-sample variances of the base fits
+        evaluated = [method for method in registry if hasattr(registry.engine(method), 'fit_evaluate')]
+        raise InvalidHierarchyParameter(
+            f'reconciliation = wls_var needs the in-sample fit of {name}, use one of {", ".join(evaluated)}'
+        )
+    paths = parse_hierarchy_param('hierarchy', hierarchy)
+    try:
+        leaf_history = np.array(input_data, dtype=float)
+    except ValueError:
+        raise InvalidHierarchyParameter('input_data should hold one series per leaf, all of the same length')
+    if leaf_history.ndim != 2 or leaf_history.shape[0] != len(paths):
+        raise InvalidHierarchyParameter(
+            f'input_data should hold one series per hierarchy path ({len(paths)}), all of the same length'
+        )
+
+    hierarchy = hierarchy_from_paths(paths)
+    leaves = np.arange(hierarchy.n_aggregates, len(hierarchy))
+
+    if reconciliation == 'bottom_up':
+        results = _base_forecasts(registry, name, hierarchy, leaf_history, leaves, forecast_horizon,
+                                  'fit_forecast', **params)
+        base_nodes = leaves
+        forecast = reconcile_bottom_up(hierarchy, _forecast_matrix(results))
+    elif reconciliation == 'top_down':
+        total_history = leaf_history.sum(axis=0, keepdims=True)
+        results = _base_forecasts(registry, name, hierarchy, total_history, np.zeros(1, dtype=int),
+                                  forecast_horizon, 'fit_forecast', **params)
+        base_nodes = np.zeros(1, dtype=int)
+        forecast = reconcile_top_down(hierarchy, _forecast_matrix(results)[0], top_down_proportions(leaf_history))
+    else:
+        operation = 'fit_evaluate' if reconciliation == 'wls_var' else 'fit_forecast'
+        base_nodes = np.arange(len(hierarchy))
+        results = _base_forecasts(registry, name, hierarchy, hierarchy.aggregate(leaf_history), base_nodes,
+                                  forecast_horizon, operation, **params)
+        weights = None
+        if reconciliation == 'wls_struct':
+            weights = np.asarray(hierarchy.summing_matrix.sum(axis=1), dtype=float).ravel()
+        elif reconciliation == 'wls_var':
+            # a perfect fit has no variance: floor it so that the node still weighs
+            weights = np.maximum([result['sse'] / result['nobs'] for result in results], 1e-12)
+        forecast = reconcile_wls(hierarchy, _forecast_matrix(results), weights)
+
+    base = dict(zip(base_nodes.tolist(), results))
+    return {
+        'reconciliation': reconciliation,
+        'nodes': [
+            dict(
+                node=label,
+                level=int(level),
+                forecast=forecast[index],
+                **({'base_forecast': base[index]['forecast']} if index in base else {})
+            )
+            for index, (label, level) in enumerate(zip(hierarchy.labels.tolist(), hierarchy.levels))
+        ],
+    }
+
+
+def _forecast_matrix(results):
+    return np.array([result['forecast'] for result in results], dtype=float)
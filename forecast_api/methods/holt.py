@@ -1,141 +1,230 @@
 import numpy as np
 
 
+from forecast_api.lib.backtest import (
+    filter_folds,
+    fit_folds,
+    fold_cutoffs,
+    score_folds,
+)
+from forecast_api.lib.diagnostics import PHASE_FIT
+from forecast_api.lib.diagnostics import PHASE_FORECAST
+from forecast_api.lib.diagnostics import PHASE_INTERVALS
+from forecast_api.lib.diagnostics import PHASE_PARSE
+from forecast_api.lib.diagnostics import phase
+from forecast_api.lib.diagnostics import record_optimize_result
 from forecast_api.lib.exceptions import (
     InvalidTrendParameters
 )
-from forecast_api.lib.param_parsers import (
-    parse_boolean_param,
-    parse_numeric_param,
+from forecast_api.lib.fields import wanted
+from forecast_api.lib.intervals import INTERVALS_FIELD
+from forecast_api.lib.intervals import prediction_intervals
+from forecast_api.lib.multistart import MULTISTART_FIELD
+from forecast_api.lib.multistart import coefficient_bounds
+from forecast_api.lib.multistart import fit_smoothing
+from forecast_api.lib.multistart import multistart_report
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.params import Rule
+from forecast_api.lib.scenarios import parse_scenarios_param
+from forecast_api.lib.scenarios import scenario_forecasts
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+
+def _optimized(params):
+    optimized = {
+        'optimized_alpha': params['alpha'] is None,
+        'optimized_initial_level': params['initial_level'] is None,
+        'optimized_beta': params['beta'] is None,
+        'optimized_initial_slope': params['initial_slope'] is None,
+        'optimized_phi': params['phi'] is None and params['damped'],
+    }
+    return dict(optimized, to_fit=any(optimized.values()))
+
+
+PARAMS = ParamSpec(
+    [
+        Field('alpha', 'number', 'The alpha factor used to smooth level changes', minimum=0, maximum=1),
+        Field('beta', 'number', 'The beta factor used to smooth trend changes', minimum=0, maximum=1),
+        Field('phi', 'number', 'The phi factor used to damp the trend', minimum=0, maximum=1),
+        Field('initial_level', 'number', 'The level to be used for the first period', minimum=0),
+        Field('initial_slope', 'number', 'The trend to be used for the first period'),
+        Field('exponential', 'boolean', 'Multiplicative or additive trend (true = multiplicative)', default=False),
+        Field('damped', 'boolean', 'Dampen the trend component', default=False),
+        INTERVALS_FIELD,
+        MULTISTART_FIELD,
+    ],
+    rules=[
+        Rule(lambda p: p['exponential'] and p['initial_level'] == 0.0, InvalidTrendParameters,
+             'initial level can not be {initial_level} if exponential={exponential}'),
+        Rule(lambda p: p['damped'] and not p['exponential'], InvalidTrendParameters,
+             'exponential must True if damped = {damped}'),
+        Rule(lambda p: p['phi'] is not None and not p['damped'], InvalidTrendParameters,
+             'damped must be True if phi = {phi}'),
+    ],
+    derive=_optimized,
+    description='Parameters of the Holt exponential smoothing model; coefficients left out are fitted',
 )
 
+parse_params = PARAMS.compile()
+
+COEFFICIENT_BOUNDS = coefficient_bounds(PARAMS)
 
-def parse_params(**params):
-
-    alpha = None
-    if 'alpha' in params and params['alpha'] is not None:
-        alpha = parse_numeric_param('alpha', params['alpha'], param_min=0, param_max=1)
-
-    beta = None
-    if 'beta' in params and params['beta'] is not None:
-        beta = parse_numeric_param('beta', params['beta'], param_min=0, param_max=1)
-
-    phi = None
-    if 'phi' in params and params['phi'] is not None:
-        phi = parse_numeric_param('phi', params['phi'], param_min=0, param_max=1)
-
-    initial_level = None
-    if 'initial_level' in params and params['initial_level'] is not None:
-        initial_level = parse_numeric_param('initial_level', params['initial_level'], param_min=0)
-
-    initial_slope = None
-    if 'initial_slope' in params and params['initial_slope'] is not None:
-        initial_slope = parse_numeric_param('initial_slope', params['initial_slope'])
-
-    exponential = False
-    if 'exponential' in params and params['exponential'] is not None:
-        exponential = parse_boolean_param('exponential', params['exponential'])
-
-    damped = False
-    if 'damped' in params and params['damped'] is not None:
-        damped = parse_boolean_param('damped', params['damped'])
-
-    if exponential and initial_level == 0.0:
-        raise InvalidTrendParameters(f'initial level can not be {initial_level} if exponential={exponential}')
-    if damped and not exponential:
-        raise InvalidTrendParameters(f'exponential must True if damped = {damped}')
-    if phi is not None and not damped:
-        raise InvalidTrendParameters(f'damped must be True if phi = {phi}')
-
-    optimized_alpha = True if alpha is None else False
-    optimized_initial_level = True if initial_level is None else False
-    optimized_beta = True if beta is None else False
-    optimized_initial_slope = True if initial_slope is None else False
-    optimized_phi = True if (phi is None and damped is True) else False
-
-    to_fit = False
-    if optimized_alpha or optimized_initial_level or optimized_beta or \
-            optimized_initial_slope or optimized_phi:
-        to_fit = True
-
-    return {
-        'alpha': alpha,
-        'initial_level': initial_level,
-        'beta': beta,
-        'initial_slope': initial_slope,
-        'phi': phi,
-        'exponential': exponential,
-        'damped': damped,
-        'to_fit': to_fit,
-        'optimized_alpha': optimized_alpha,
-        'optimized_initial_level': optimized_initial_level,
-        'optimized_beta': optimized_beta,
-        'optimized_initial_slope': optimized_initial_slope,
-        'optimized_phi': optimized_phi,
+
+def smoothing_model(params):
+    """The NumPy recursion, initial state and coefficients of fully specified (parsed) ``params``."""
+    model = ExponentialSmoothing(trend='mul' if params['exponential'] else 'add', damped=params['damped'])
+    state = model.initial_state(params['initial_level'], params['initial_slope'])
+    coefficients = {
+        'alpha': params['alpha'],
+        'beta': params['beta'],
+        'phi': params['phi'] if params['damped'] else 1.0,
     }
+    return model, state, coefficients
 
 
 class Holt:
 
-    def __init__(self, params_parser, forecast_method):
+    def __init__(self, params_parser, forecast_method, executor=None):
         self._parse_params = params_parser
         self._forecast_method = forecast_method
+        # runs the refinements of a multistart fit in parallel; not sent along when the engine is pickled
+        self._executor = executor
+
+    def __getstate__(self):
+        return dict(self.__dict__, _executor=None)
 
     def fit_forecast(self, input_data, forecast_horizon, **params):
-        params = self._parse_params(**params)
+        result, _ = self._fit_forecast(input_data, forecast_horizon, **params)
+        return result
 
-        model = self._forecast_method(
-            np.array(input_data),
-            exponential=params.get('exponential', None),
-            damped=params.get('damped', None)
-        )
-        fit = model.fit(
-            smoothing_level=params.get('alpha', None),
-            initial_level=params.get('initial_level', None),
-            smoothing_slope=params.get('beta', None),
-            initial_slope=params.get('initial_slope', None),
-            damping_slope=params.get('phi', None),
-            optimized=params.get('to_fit', True)
-        )
+    def fit_evaluate(self, input_data, forecast_horizon, **params):
+        result, fit = self._fit_forecast(input_data, forecast_horizon, **params)
+        params = result['params']
+        result['sse'] = float(fit.sse) if fit is not None else result['multistart']['sse']
+        result['nobs'] = len(input_data)
+        result['n_params'] = sum([
+            params['optimized_alpha'], params['optimized_initial_level'], params['optimized_beta'],
+            params['optimized_initial_slope'], params['optimized_phi'],
+        ])
+        return result
+
+    def _fit_forecast(self, input_data, forecast_horizon, **params):
+        with phase(PHASE_PARSE):
+            params = self._parse_params(**params)
+        if params['multistart'] and params['to_fit']:
+            with phase(PHASE_FIT):
+                params, search = self._multistart_fit(input_data, params)
+            with phase(PHASE_FORECAST):
+                forecast = self._smoothed_forecast(input_data, forecast_horizon, params)
+            return self._add_intervals({
+                'forecast': forecast,
+                'params': params,
+                'multistart': multistart_report(search),
+            }, input_data), None
+
+        with phase(PHASE_FIT):
+            model = self._forecast_method(
+                np.array(input_data),
+                exponential=params.get('exponential', None),
+                damped=params.get('damped', None)
+            )
+            fit = model.fit(
+                smoothing_level=params.get('alpha', None),
+                initial_level=params.get('initial_level', None),
+                smoothing_slope=params.get('beta', None),
+                initial_slope=params.get('initial_slope', None),
+                damping_slope=params.get('phi', None),
+                optimized=params.get('to_fit', True)
+            )
+            if params['to_fit']:
+                record_optimize_result(getattr(fit, 'mle_retvals', None))
         params['alpha'] = fit.params['smoothing_level']
         params['initial_level'] = fit.params['initial_level']
         params['beta'] = fit.params['smoothing_slope']
         params['initial_slope'] = fit.params['initial_slope']
         params['phi'] = fit.params['damping_slope']
 
-        forecast = fit.forecast(
-            forecast_horizon
-        )
-        return {
+        with phase(PHASE_FORECAST):
+            forecast = fit.forecast(
+                forecast_horizon
+            )
+        return self._add_intervals({
             'forecast': list(forecast),
             'params': params
-        }
+        }, input_data), fit
 
     def forecast(self, input_data, forecast_horizon, **params):
+        """Forecast with fully specified params: one filtering pass over ``input_data``, then closed form."""
         params = self._parse_params(**params)
         if params['to_fit']:
             raise ValueError(f'use fit_forecast to fit model with provided parameters')
-        model = self._forecast_method(
-            np.array(input_data),
-            np.array(input_data),
-            exponential=params.get('exponential', None),
-            damped=params.get('damped', None)
+        return self._add_intervals({
+            'forecast': self._smoothed_forecast(input_data, forecast_horizon, params),
+            'params': params
+        }, input_data)
+
+    def _smoothed_forecast(self, input_data, forecast_horizon, params):
+        model, state, coefficients = smoothing_model(params)
+        state, _ = model.filter(np.array(input_data, dtype=float), state, **coefficients)
+        return list(model.forecast(state, forecast_horizon, coefficients['phi']))
+
+    def _multistart_fit(self, input_data, params):
+        """Fit what params leave out with the NumPy recursion, from ``multistart`` starting points."""
+        model = ExponentialSmoothing(trend='mul' if params['exponential'] else 'add', damped=params['damped'])
+        coefficients = {'alpha': params['alpha'], 'beta': params['beta']}
+        if params['damped']:
+            coefficients['phi'] = params['phi']
+        fitted, fitted_state, search = fit_smoothing(
+            model, np.array(input_data, dtype=float), coefficients,
+            {'level': params['initial_level'], 'slope': params['initial_slope']}, COEFFICIENT_BOUNDS,
+            params['multistart'], self._executor
         )
-        forecast = model.predict(
-            {
-                'smoothing_level': params.get('alpha', None),
-                'initial_level': params.get('initial_level', None),
-                'smoothing_slope': params.get('beta', None),
-                'initial_slope': params.get('initial_slope', None),
-                'damping_slope': params.get('phi', None),
-            },
-            start=len(input_data),
-            end=len(input_data)+forecast_horizon-1
+        params.update(
+            alpha=fitted['alpha'],
+            beta=fitted['beta'],
+            phi=fitted.get('phi'),
+            initial_level=fitted_state['level'],
+            initial_slope=fitted_state['slope'],
         )
-        return {
-            'forecast': list(forecast),
-            'params': params
-        }
+        return params, search
+
+    def _add_intervals(self, result, input_data):
+        params = result['params']
+        # simulated only when asked for, and not when the response leaves them out
+        if params['intervals'] is not None and wanted('intervals'):
+            with phase(PHASE_INTERVALS):
+                model, state, coefficients = smoothing_model(params)
+                result['intervals'] = prediction_intervals(
+                    model, state, coefficients, np.array(input_data, dtype=float), result['forecast'],
+                    params['intervals']
+                )
+        return result
+
+    def scenarios(self, input_data, forecast_horizon, scenarios, sse=False, **params):
+        return scenario_forecasts(
+            self._parse_params,
+            smoothing_model,
+            np.array(input_data, dtype=float),
+            forecast_horizon,
+            parse_scenarios_param('scenarios', scenarios),
+            sse,
+            **params
+        )
+
+    def backtest(self, input_data, forecast_horizon, initial_window, step=1, executor=None, **params):
+        input_array = np.array(input_data, dtype=float)
+        cutoffs = fold_cutoffs(len(input_array), forecast_horizon, initial_window, step)
+        params = self._parse_params(**params)
+        if params['to_fit']:
+            forecasts = fit_folds(self.fit_forecast, input_array, cutoffs, forecast_horizon, executor, **params)
+        else:
+            model, state, coefficients = smoothing_model(params)
+            forecasts = filter_folds(model, state, input_array, cutoffs, forecast_horizon, **coefficients)
+        result = score_folds(input_array, cutoffs, forecasts, forecast_horizon)
+        result['params'] = params
+        return result
+
 
 if __name__ == '__main__':
 
@@ -1,114 +1,144 @@
 import numpy as np
 
+from forecast_api.lib.backtest import (
+    filter_folds,
+    fit_folds,
+    fold_cutoffs,
+    score_folds,
+)
+from forecast_api.lib.diagnostics import PHASE_FIT
+from forecast_api.lib.diagnostics import PHASE_FORECAST
+from forecast_api.lib.diagnostics import PHASE_INTERVALS
+from forecast_api.lib.diagnostics import PHASE_PARSE
+from forecast_api.lib.diagnostics import phase
+from forecast_api.lib.diagnostics import record_optimize_result
 from forecast_api.lib.exceptions import (
     InvalidSeasonalParameters,
     InvalidTrendParameters
 )
-from forecast_api.lib.param_parsers import (
-    parse_boolean_param,
-    parse_integer_param,
-    parse_numeric_param,
-    parse_string_param,
+from forecast_api.lib.seasonality import detect_seasonal_periods
+from forecast_api.lib.fields import wanted
+from forecast_api.lib.intervals import INTERVALS_FIELD
+from forecast_api.lib.intervals import prediction_intervals
+from forecast_api.lib.multistart import MULTISTART_FIELD
+from forecast_api.lib.multistart import coefficient_bounds
+from forecast_api.lib.multistart import fit_smoothing
+from forecast_api.lib.multistart import multistart_report
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.params import Rule
+from forecast_api.lib.scenarios import parse_scenarios_param
+from forecast_api.lib.scenarios import scenario_forecasts
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+AUTO_SEASONAL_PERIODS = 'auto'
+
+
+def _optimized(params):
+    seasonal = bool(params['seasonal'])
+    optimized = {
+        'optimized_alpha': params['alpha'] is None,
+        'optimized_initial_level': params['initial_level'] is None,
+        'optimized_beta': params['beta'] is None,
+        'optimized_initial_slope': params['initial_slope'] is None,
+        'optimized_phi': params['phi'] is None and params['damped'],
+        'optimized_seasonal': seasonal and params['initial_seasons'] is None,
+        'optimized_gamma': seasonal and params['gamma'] is None,
+    }
+    return dict(
+        optimized,
+        optimized_seasonal_periods=params['seasonal_periods'] == AUTO_SEASONAL_PERIODS,
+        to_fit=any(optimized.values()),
+    )
+
+
+PARAMS = ParamSpec(
+    [
+        Field('alpha', 'number', 'The alpha factor used to smooth level changes', minimum=0, maximum=1),
+        Field('beta', 'number', 'The beta factor used to smooth trend changes', minimum=0, maximum=1),
+        Field('gamma', 'number', 'The gamma factor used to smooth seasonal changes', minimum=0, maximum=1),
+        Field('phi', 'number', 'The phi factor used to damp the trend', minimum=0, maximum=1),
+        Field('initial_level', 'number', 'The level to be used for the first period', minimum=0),
+        Field('initial_slope', 'number', 'The trend to be used for the first period'),
+        Field('trend', 'string', 'Kind of trend component', choices=['add', 'mul']),
+        Field('damped', 'boolean', 'Dampen the trend component', default=False),
+        Field('seasonal', 'string', 'Kind of seasonal component', choices=['add', 'mul']),
+        Field('seasonal_periods', 'integer', 'Number of periods in a season, or auto to detect it', minimum=1,
+              literals=[AUTO_SEASONAL_PERIODS]),
+        Field('initial_seasons', 'array', 'The seasonal components of the first season',
+              items=Field('initial_season', 'number')),
+        INTERVALS_FIELD,
+        MULTISTART_FIELD,
+    ],
+    rules=[
+        Rule(lambda p: p['trend'] == 'mul' and p['initial_level'] == 0.0, InvalidTrendParameters,
+             'initial level can not be {initial_level} if trend={trend}'),
+        Rule(lambda p: p['damped'] and not p['trend'], InvalidTrendParameters,
+             'trend must be provided if damped = {damped}'),
+        Rule(lambda p: p['phi'] is not None and not p['damped'], InvalidTrendParameters,
+             'damped must be True if phi = {phi}'),
+        Rule(lambda p: p['seasonal'] and p['seasonal_periods'] is None, InvalidSeasonalParameters,
+             'seasonal_periods must be provided if seasonal = {seasonal}'),
+        Rule(lambda p: p['seasonal_periods'] is not None and p['seasonal'] is None, InvalidSeasonalParameters,
+             'seasonal must be provided if seasonal_periods = {seasonal_periods}'),
+        Rule(lambda p: p['gamma'] is not None and p['seasonal'] is None, InvalidSeasonalParameters,
+             'seasonal and seasonal_periods must be provided if gamma = {gamma}'),
+        Rule(lambda p: p['initial_seasons'] is not None and p['seasonal'] is None, InvalidSeasonalParameters,
+             'seasonal and seasonal_periods must be provided if initial_seasons are'),
+        Rule(lambda p: p['initial_seasons'] is not None and len(p['initial_seasons']) != p['seasonal_periods'],
+             InvalidSeasonalParameters,
+             lambda p: f'initial_seasons should have seasonal_periods = {p["seasonal_periods"]} values '
+                       f'(got {len(p["initial_seasons"])})'),
+    ],
+    derive=_optimized,
+    description='Parameters of the Holt-Winters exponential smoothing model; coefficients left out are fitted',
 )
 
+parse_params = PARAMS.compile()
+
+COEFFICIENT_BOUNDS = coefficient_bounds(PARAMS)
 
-def parse_params(**params):
-
-    alpha = None
-    if 'alpha' in params and params['alpha'] is not None:
-        alpha = parse_numeric_param('alpha', params['alpha'], param_min=0, param_max=1)
-
-    beta = None
-    if 'beta' in params and params['beta'] is not None:
-        beta = parse_numeric_param('beta', params['beta'], param_min=0, param_max=1)
-
-    gamma = None
-    if 'gamma' in params and params['gamma'] is not None:
-        gamma = parse_numeric_param('gamma', params['gamma'], param_min=0, param_max=1)
-
-    phi = None
-    if 'phi' in params and params['phi'] is not None:
-        phi = parse_numeric_param('phi', params['phi'], param_min=0, param_max=1)
-
-    initial_level = None
-    if 'initial_level' in params and params['initial_level'] is not None:
-        initial_level = parse_numeric_param('initial_level', params['initial_level'], param_min=0)
-
-    initial_slope = None
-    if 'initial_slope' in params and params['initial_slope'] is not None:
-        initial_slope = parse_numeric_param('initial_slope', params['initial_slope'])
-
-    trend = None
-    if 'trend' in params and params['trend'] is not None:
-        trend = parse_string_param('trend', params['trend'], ['add', 'mul'])
-
-    damped = False
-    if 'damped' in params and params['damped'] is not None:
-        damped = parse_boolean_param('damped', params['damped'])
-
-    seasonal = None
-    if 'seasonal' in params and params['seasonal'] is not None:
-        seasonal = parse_string_param('seasonal', params['seasonal'], ['add', 'mul'])
-
-    seasonal_periods = None
-    if 'seasonal_periods' in params and params['seasonal_periods'] is not None:
-        seasonal_periods = parse_integer_param('seasonal_periods', params['seasonal_periods'], param_min=1)
-
-    if trend == 'mul' and initial_level == 0.0:
-        raise InvalidTrendParameters(f'initial level can not be {initial_level} if trend={trend}')
-    if damped and not trend:
-        raise InvalidTrendParameters(f'trend must be provided if damped = {damped}')
-    if phi is not None and not damped:
-        raise InvalidTrendParameters(f'damped must be True if phi = {phi}')
-
-    if seasonal and seasonal_periods is None:
-        raise InvalidSeasonalParameters(f'seasonal_periods must be provided if seasonal = {seasonal}')
-    if seasonal_periods is not None and seasonal is None:
-        raise InvalidSeasonalParameters(f'seasonal must be provided if seasonal_periods = {seasonal_periods}')
-    if gamma is not None and seasonal is None:
-        raise InvalidSeasonalParameters(f'seasonal and seasonal_periods must be provided if gamma = {gamma}')
-
-    optimized_alpha = True if alpha is None else False
-    optimized_initial_level = True if initial_level is None else False
-    optimized_beta = True if beta is None else False
-    optimized_initial_slope = True if initial_slope is None else False
-    optimized_phi = True if (phi is None and damped is True) else False
-    optimized_seasonal = True if seasonal else False
-    optimized_gamma = True if (optimized_seasonal and gamma is None) else False
-
-    to_fit = False
-    if optimized_alpha or optimized_initial_level or optimized_beta or \
-            optimized_initial_slope or optimized_seasonal or optimized_gamma or optimized_phi:
-        to_fit = True
-
-    params = {
-        'alpha': alpha,
-        'initial_level': initial_level,
-        'beta': beta,
-        'initial_slope': initial_slope,
-        'trend': trend,
-        'damped': damped,
-        'phi': phi,
-        'seasonal': seasonal,
-        'seasonal_periods': seasonal_periods,
-        'gamma': gamma,
-        'optimized_alpha': optimized_alpha,
-        'optimized_initial_level': optimized_initial_level,
-        'optimized_beta': optimized_beta,
-        'optimized_initial_slope': optimized_initial_slope,
-        'optimized_phi': optimized_phi,
-        'optimized_seasonal': optimized_seasonal,
-        'optimized_gamma': optimized_gamma,
-        'to_fit': to_fit,
+
+def smoothing_model(params):
+    """The NumPy recursion, initial state and coefficients of fully specified (parsed) ``params``."""
+    model = ExponentialSmoothing(
+        trend=params['trend'],
+        damped=params['damped'],
+        seasonal=params['seasonal'],
+        seasonal_periods=params['seasonal_periods'],
+    )
+    state = model.initial_state(params['initial_level'], params['initial_slope'], params['initial_seasons'])
+    coefficients = {
+        'alpha': params['alpha'],
+        'beta': params['beta'] if params['trend'] else 0.0,
+        'gamma': params['gamma'] if params['seasonal'] else 0.0,
+        'phi': params['phi'] if params['damped'] else 1.0,
     }
-    return params
+    return model, state, coefficients
+
+
+def unspecified_params(params):
+    """Names of the (parsed) params a forecast without fitting is missing for the trend and seasonality given."""
+    required = ['alpha', 'initial_level']
+    if params['trend']:
+        required += ['beta', 'initial_slope']
+    if params['damped']:
+        required += ['phi']
+    if params['seasonal']:
+        required += ['gamma', 'initial_seasons']
+    return [name for name in required if params[name] is None]
 
 
 class HoltWinter:
 
-    def __init__(self, params_parser, forecast_method):
+    def __init__(self, params_parser, forecast_method, executor=None):
         self._parse_params = params_parser
         self._forecast_method = forecast_method
+        # runs the refinements of a multistart fit in parallel; not sent along when the engine is pickled
+        self._executor = executor
+
+    def __getstate__(self):
+        return dict(self.__dict__, _executor=None)
 
     def _parse_data(self, input_data):
         try:
@@ -119,6 +149,15 @@ class HoltWinter:
             input_data_length = len(input_data)
         return input_data, input_data_length
 
+    def _resolve_seasonal_periods(self, input_data, params):
+        if params['seasonal_periods'] != AUTO_SEASONAL_PERIODS:
+            return params
+        detected = detect_seasonal_periods(input_data)
+        if not detected:
+            raise InvalidSeasonalParameters(f'no seasonal period could be detected in input_data')
+        params['seasonal_periods'] = detected[0]
+        return params
+
     def _create_model(self, input_data, params):
         return self._forecast_method(
             input_data,
@@ -149,7 +188,8 @@ class HoltWinter:
         params['beta'] = _parse_np_nan(fit.params['smoothing_slope'])
         params['initial_slope'] = _parse_np_nan(fit.params['initial_slope'])
         params['phi'] = _parse_np_nan(fit.params['damping_slope'])
-        params['initial_seasons'] = list(fit.params['initial_seasons'])
+        # None without seasonality, as the params accept back
+        params['initial_seasons'] = list(fit.params['initial_seasons']) if params['seasonal'] else None
         params['gamma'] = _parse_np_nan(fit.params['smoothing_seasonal'])
         return params
 
@@ -158,44 +198,151 @@ class HoltWinter:
             forecast_horizon
         )
 
-    def _predict(self, model, start_index, end_index, params):
-        return model.predict(
-            {
-                'smoothing_level': params.get('alpha', None),
-                'smoothing_slope': params.get('beta', None),
-                'smoothing_seasonal': params.get('gamma', None),
-                'damping_slope': params.get('phi', None),
-                'initial_level': params.get('initial_level', None),
-                'initial_slope': params.get('initial_slope', None),
-            },
-            start=start_index,
-            end=end_index
-        )
-
     def forecast(self, input_data, forecast_horizon, **params):
+        """Forecast with fully specified params (initial seasons included): one filtering pass, then closed form."""
         params = self._parse_params(**params)
-        if params['to_fit']:
-            raise ValueError(f'use fit_forecast to fit model with provided parameters')
-        input_data, input_data_length = self._parse_data(input_data)
-        model = self._create_model(input_data, params)
-        forecast = self._predict(model, input_data_length, input_data_length+forecast_horizon-1, params)
-        return {
-            'forecast': forecast,
+        unspecified = unspecified_params(params)
+        if unspecified:
+            raise ValueError(
+                f'use fit_forecast to fit model with provided parameters (missing {", ".join(unspecified)})'
+            )
+        input_data, _ = self._parse_data(input_data)
+        params = self._resolve_seasonal_periods(input_data, params)
+        return self._add_intervals({
+            'forecast': self._smoothed_forecast(input_data, forecast_horizon, params),
             'params': params
-        }
+        }, input_data)
 
-    def fit_forecast(self, input_data, forecast_horizon, **params):
-        params = self._parse_params(**params)
-        input_data, input_data_length = self._parse_data(input_data)
-        model = self._create_model(input_data, params)
-        fit = self._fit_model(model, params)
-        fit_params = self._fit_params(fit, params)
-        forecast = self._forecast(fit, forecast_horizon)
+    def _smoothed_forecast(self, input_data, forecast_horizon, params):
+        model, state, coefficients = smoothing_model(params)
+        state, _ = model.filter(np.asarray(input_data, dtype=float), state, **coefficients)
+        return list(model.forecast(state, forecast_horizon, coefficients['phi']))
 
-        return {
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        result, _ = self._fit_forecast(input_data, forecast_horizon, **params)
+        return result
+
+    def fit_evaluate(self, input_data, forecast_horizon, **params):
+        result, fit = self._fit_forecast(input_data, forecast_horizon, **params)
+        params = result['params']
+        result['sse'] = float(fit.sse) if fit is not None else result['multistart']['sse']
+        result['nobs'] = len(fit.fittedvalues) if fit is not None else len(input_data)
+        result['n_params'] = sum([
+            params['optimized_alpha'], params['optimized_initial_level'], params['optimized_beta'],
+            params['optimized_initial_slope'], params['optimized_phi'], params['optimized_gamma'],
+        ]) + (params['seasonal_periods'] if params['optimized_seasonal'] else 0)
+        return result
+
+    def _fit_forecast(self, input_data, forecast_horizon, **params):
+        with phase(PHASE_PARSE):
+            params = self._parse_params(**params)
+            input_data, input_data_length = self._parse_data(input_data)
+            params = self._resolve_seasonal_periods(input_data, params)
+        if params['multistart'] and params['to_fit']:
+            with phase(PHASE_FIT):
+                params, search = self._multistart_fit(input_data, params)
+            with phase(PHASE_FORECAST):
+                forecast = self._smoothed_forecast(input_data, forecast_horizon, params)
+            return self._add_intervals({
+                'forecast': forecast,
+                'params': params,
+                'multistart': multistart_report(search),
+            }, input_data), None
+        if params['initial_seasons'] is not None:
+            # the statsmodels fit takes no initial seasons, it would estimate others than the ones given
+            raise InvalidSeasonalParameters(
+                'initial_seasons can only be given to a multistart fit, or to a forecast with fit = false'
+            )
+        with phase(PHASE_FIT):
+            model = self._create_model(input_data, params)
+            fit = self._fit_model(model, params)
+            if params['to_fit']:
+                record_optimize_result(getattr(fit, 'mle_retvals', None))
+            fit_params = self._fit_params(fit, params)
+        with phase(PHASE_FORECAST):
+            forecast = self._forecast(fit, forecast_horizon)
+
+        return self._add_intervals({
             'forecast': list(forecast),
             'params': fit_params
-        }
+        }, input_data), fit
+
+    def _multistart_fit(self, input_data, params):
+        """Fit what params leave out with the NumPy recursion, from ``multistart`` starting points."""
+        model = ExponentialSmoothing(
+            trend=params['trend'],
+            damped=params['damped'],
+            seasonal=params['seasonal'],
+            seasonal_periods=params['seasonal_periods'],
+        )
+        coefficients, state = {'alpha': params['alpha']}, {'level': params['initial_level']}
+        if params['trend']:
+            coefficients['beta'], state['slope'] = params['beta'], params['initial_slope']
+        if params['damped']:
+            coefficients['phi'] = params['phi']
+        if params['seasonal']:
+            coefficients['gamma'], state['seasons'] = params['gamma'], params['initial_seasons']
+        fitted, fitted_state, search = fit_smoothing(
+            model, np.asarray(input_data, dtype=float), coefficients, state, COEFFICIENT_BOUNDS,
+            params['multistart'], self._executor
+        )
+        params.update(
+            alpha=fitted['alpha'],
+            beta=fitted.get('beta'),
+            gamma=fitted.get('gamma'),
+            phi=fitted.get('phi'),
+            initial_level=fitted_state['level'],
+            initial_slope=fitted_state['slope'],
+            initial_seasons=fitted_state['seasons'],
+        )
+        return params, search
+
+    def _add_intervals(self, result, input_data):
+        params = result['params']
+        # simulated only when asked for, and not when the response leaves them out
+        if params['intervals'] is not None and wanted('intervals'):
+            with phase(PHASE_INTERVALS):
+                model, state, coefficients = smoothing_model(params)
+                result['intervals'] = prediction_intervals(
+                    model, state, coefficients, np.asarray(input_data, dtype=float), result['forecast'],
+                    params['intervals']
+                )
+        return result
+
+    def scenarios(self, input_data, forecast_horizon, scenarios, sse=False, **params):
+        input_data, _ = self._parse_data(input_data)
+        input_array = np.asarray(input_data, dtype=float)
+        if params.get('seasonal_periods') == AUTO_SEASONAL_PERIODS:
+            # detected once, all scenarios share the structure of the model
+            params['seasonal_periods'] = self._resolve_seasonal_periods(
+                input_array, {'seasonal_periods': AUTO_SEASONAL_PERIODS}
+            )['seasonal_periods']
+        return scenario_forecasts(
+            self._parse_params,
+            smoothing_model,
+            input_array,
+            forecast_horizon,
+            parse_scenarios_param('scenarios', scenarios),
+            sse,
+            **params
+        )
+
+    def backtest(self, input_data, forecast_horizon, initial_window, step=1, executor=None, **params):
+        input_data, input_data_length = self._parse_data(input_data)
+        input_array = np.asarray(input_data, dtype=float)
+        cutoffs = fold_cutoffs(input_data_length, forecast_horizon, initial_window, step)
+        params = self._parse_params(**params)
+        # detected on the first training window only, so no fold sees its future
+        params = self._resolve_seasonal_periods(input_array[:cutoffs[0]], params)
+        if params['to_fit']:
+            forecasts = fit_folds(self.fit_forecast, input_array, cutoffs, forecast_horizon, executor, **params)
+        else:
+            model, state, coefficients = smoothing_model(params)
+            forecasts = filter_folds(model, state, input_array, cutoffs, forecast_horizon, **coefficients)
+        seasonal_periods = params['seasonal_periods'] if params['seasonal'] else 1
+        result = score_folds(input_array, cutoffs, forecasts, forecast_horizon, seasonal_periods)
+        result['params'] = params
+        return result
 
 
 if __name__ == '__main__':
@@ -0,0 +1,68 @@
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidSeasonalParameters
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.seasonality import detect_seasonal_periods_batch
+from forecast_api.methods.average import model as average_model
+
+AUTO_SEASONAL_PERIODS = 'auto'
+
+
+PARAMS = ParamSpec(
+    [
+        Field('seasonal_periods', 'integer', 'Number of periods in a season, or auto to detect it', minimum=1,
+              default=AUTO_SEASONAL_PERIODS, literals=[AUTO_SEASONAL_PERIODS]),
+    ],
+    description='Parameters of the seasonal naive method',
+)
+
+parse_params = PARAMS.compile()
+
+
+def model(input_array, forecast_horizon, seasonal_periods):
+    """Repeat the last ``seasonal_periods`` points of every series (last axis is time), one period per series.
+
+    The seasonal naive kind of the moving average, with its error in terms of seasonal_periods.
+    """
+    input_array = np.asarray(input_array, dtype=float)
+    length = input_array.shape[-1]
+    periods = np.broadcast_to(seasonal_periods, input_array.shape[:-1])
+    if np.any(periods > length):
+        raise InvalidSeasonalParameters(
+            f'seasonal_periods ({np.max(periods)}) should be <= the length of input_data ({length})'
+        )
+    return average_model(input_array, forecast_horizon, periods, kind='seasonal_naive')
+
+
+class SeasonalNaive:
+    """Seasonal naive forecast; with seasonal_periods ``auto`` the period of every series is detected (1 if none)."""
+
+    def __init__(self, params_parser, forecast_method):
+        self._parse_params = params_parser
+        self._forecast_method = forecast_method
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        input_array = np.array(input_data, dtype=float)
+        seasonal_periods = params['seasonal_periods']
+        if seasonal_periods == AUTO_SEASONAL_PERIODS:
+            rows = input_array.reshape(-1, input_array.shape[-1])
+            detected = [periods[0] if periods else 1 for periods in detect_seasonal_periods_batch(rows)]
+            seasonal_periods = np.array(detected).reshape(input_array.shape[:-1])
+        params['seasonal_periods'] = np.asarray(seasonal_periods).tolist()
+        return {
+            'forecast': self._forecast_method(input_array, forecast_horizon, seasonal_periods),
+            'params': params
+        }
+
+    def fit_forecast_batch(self, input_matrix, forecast_horizon, **params):
+        result = self.fit_forecast(input_matrix, forecast_horizon, **params)
+        periods = np.broadcast_to(result['params']['seasonal_periods'], len(result['forecast']))
+        return [
+            {'forecast': forecast, 'params': dict(result['params'], seasonal_periods=int(period))}
+            for forecast, period in zip(result['forecast'], periods)
+        ]
+
+    def forecast(self, input_data, forecast_horizon, **params):
+        return self.fit_forecast(input_data, forecast_horizon, **params)
@@ -0,0 +1,64 @@
+import logging
+
+from functools import partial
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.fields import projected
+from forecast_api.lib.fields import selecting
+
+_log = logging.getLogger(__name__)
+
+
+def forecast_panel(registry, name, panel, forecast_horizon, operation='fit_forecast', fields=None, **params):
+    """Fit and forecast every series of ``panel`` with method ``name``; one result per series, in panel order.
+
+    ``params`` are validated once up front, so a bad parameter fails the
+    whole panel; a series the method cannot forecast gets an ``error``
+    instead. When all series have the same length and the engine has a
+    ``fit_forecast_batch``, the panel's (series x length) view is forecast
+    in one call; otherwise every series (a view of the panel's values) is
+    submitted to the method's execution pool. ``operation`` can be any
+    engine operation with the signature of ``fit_forecast`` (e.g.
+    ``fit_evaluate``); the batch path is only taken for ``fit_forecast``.
+    With ``fields`` (a lib.fields.Fields) every result is projected onto
+    them, keeping its ``series_id`` and ``error``; outputs left out are not
+    computed.
+    """
+    registry.parse_params(name, **params)
+    engine = registry.engine(name)
+    series_ids = [str(series_id) for series_id in panel.series_ids]
+    if fields is not None:
+        fields = fields.with_paths('series_id', 'error')
+
+    matrix = panel.matrix()
+    if operation == 'fit_forecast' and matrix is not None and hasattr(engine, 'fit_forecast_batch'):
+        with selecting(fields):
+            results = engine.fit_forecast_batch(matrix, forecast_horizon, **params)
+        results = [dict(series_id=series_id, **result) for series_id, result in zip(series_ids, results)]
+        return results if fields is None else [fields.project(result) for result in results]
+
+    if fields is None:
+        futures = [
+            registry.submit(name, operation, panel[index], forecast_horizon, **params)
+            for index in range(len(panel))
+        ]
+    else:
+        function = partial(projected, fields, getattr(engine, operation))
+        futures = [
+            registry.submit_call_in(registry.spec(name).pool, function, panel[index], forecast_horizon, **params)
+            for index in range(len(panel))
+        ]
+    results = []
+    for series_id, future in zip(series_ids, futures):
+        try:
+            result = future.result()
+        except (InvalidParameter, ValueError) as e:
+            results.append({'series_id': series_id, 'error': str(e)})
+            continue
+        except Exception as e:
+            # one series failing unexpectedly is its error, not a 500 for the whole panel
+            _log.exception(f'Problem forecasting series {series_id}')
+            results.append({'series_id': series_id, 'error': str(e)})
+            continue
+        results.append(dict(series_id=series_id, **result))
+    return results
@@ -0,0 +1,164 @@
+import pickle
+import threading
+
+from forecast_api.lib.exceptions import UnknownForecastMethod
+from forecast_api.lib.pools import POOL_INLINE
+from forecast_api.lib.pools import POOL_NAMES
+from forecast_api.lib.pools import POOL_PROCESSES
+
+
+ENTRY_POINT_GROUP = 'forecast_api.methods'
+
+COST_CHEAP = 'cheap'
+COST_EXPENSIVE = 'expensive'
+
+# memory estimate of a method without calibration
+DEFAULT_MEMORY_PER_POINT = 256
+DEFAULT_MEMORY_OVERHEAD = 256 * 2**10
+
+
+def service(name):
+    """Provider resolving the container service ``name``."""
+    def _provide(container):
+        return container(name)
+    return _provide
+
+
+class MethodSpec:
+    """Declares a forecast method: how to build its engine and params parser and how to run it.
+
+    ``engine`` and ``params_parser`` are providers, i.e. callables taking the
+    container, exactly like the ones registered on it. ``cost`` is a hint for
+    schedulers (cheap methods are evaluated first), ``pool`` names the
+    execution pool the method's calls are submitted to. A fit on n points
+    is estimated to need ``memory_overhead + memory_per_point * n`` bytes at
+    its peak (see MemoryBudget).
+    """
+
+    def __init__(self, name, engine, params_parser, cost=COST_EXPENSIVE, pool=POOL_INLINE,
+                 memory_per_point=DEFAULT_MEMORY_PER_POINT, memory_overhead=DEFAULT_MEMORY_OVERHEAD):
+        if cost not in (COST_CHEAP, COST_EXPENSIVE):
+            raise ValueError(f'cost of {name} ({cost}) should be one of [{COST_CHEAP}, {COST_EXPENSIVE}]')
+        if pool not in POOL_NAMES:
+            raise ValueError(f'pool of {name} ({pool}) should be one of [{", ".join(POOL_NAMES)}]')
+        self.name = name
+        self.engine = engine
+        self.params_parser = params_parser
+        self.cost = cost
+        self.pool = pool
+        self.memory_per_point = memory_per_point
+        self.memory_overhead = memory_overhead
+
+    @classmethod
+    def from_services(cls, name, cost=COST_EXPENSIVE, pool=POOL_INLINE, memory_per_point=DEFAULT_MEMORY_PER_POINT,
+                      memory_overhead=DEFAULT_MEMORY_OVERHEAD):
+        """Spec for a method wired as ``services.methods.<name>`` and ``services.methods.<name>_parse_params``."""
+        return cls(
+            name,
+            engine=service(f'services.methods.{name}'),
+            params_parser=service(f'services.methods.{name}_parse_params'),
+            cost=cost,
+            pool=pool,
+            memory_per_point=memory_per_point,
+            memory_overhead=memory_overhead,
+        )
+
+
+class MethodRegistry:
+    """Forecast methods by name; engines are built on first use and then reused."""
+
+    def __init__(self, container, pools):
+        self._container = container
+        self._pools = pools
+        self._specs = {}
+        self._engines = {}
+        self._picklable = {}
+        self._lock = threading.Lock()
+
+    def register(self, spec):
+        self._specs[spec.name] = spec
+        self._engines.pop(spec.name, None)
+        self._picklable.pop(spec.name, None)
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Register the MethodSpec (or zero argument callable returning one) behind every entry point of ``group``."""
+        for entry_point in _entry_points(group):
+            spec = entry_point.load()
+            if not isinstance(spec, MethodSpec):
+                spec = spec()
+            self.register(spec)
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __iter__(self):
+        return iter(sorted(self._specs))
+
+    def spec(self, name):
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise UnknownForecastMethod(f'Not implemented: {name}')
+
+    def engine(self, name):
+        spec = self.spec(name)
+        try:
+            return self._engines[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._engines:
+                self._engines[name] = spec.engine(self._container)
+            return self._engines[name]
+
+    def parse_params(self, name, **params):
+        return self.spec(name).params_parser(self._container)(**params)
+
+    def params_spec(self, name):
+        """The ParamSpec behind a method's params parser, None for a hand written parser."""
+        parser = self.spec(name).params_parser(self._container)
+        parser = getattr(parser, 'func', parser)
+        return getattr(parser, 'spec', None)
+
+    def pool(self, name):
+        return self._pools[self.spec(name).pool]
+
+    def can_run_in(self, name, pool):
+        """Whether the method's engine can be sent to ``pool``: process pools need it to pickle."""
+        if pool != POOL_PROCESSES:
+            return True
+        if name not in self._picklable:
+            try:
+                pickle.dumps(self.engine(name))
+                self._picklable[name] = True
+            except Exception:
+                self._picklable[name] = False
+        return self._picklable[name]
+
+    def submit(self, name, operation, *args, **kwargs):
+        """Submit ``engine.<operation>(*args, **kwargs)`` to the method's execution pool."""
+        return self.submit_in(self.spec(name).pool, name, operation, *args, **kwargs)
+
+    def submit_in(self, pool, name, operation, *args, **kwargs):
+        """Submit ``engine.<operation>(*args, **kwargs)`` to the execution pool ``pool`` instead."""
+        return self._pools[pool].submit(getattr(self.engine(name), operation), *args, **kwargs)
+
+    def submit_call_in(self, pool, function, *args, **kwargs):
+        """Submit ``function(*args, **kwargs)`` to the execution pool ``pool``.
+
+        For an engine operation wrapped where it runs, e.g. by
+        ``lib.diagnostics.diagnosed`` or ``lib.fields.projected``.
+        """
+        return self._pools[pool].submit(function, *args, **kwargs)
+
+    def run(self, name, operation, *args, **kwargs):
+        return self.submit(name, operation, *args, **kwargs).result()
+
+
+def _entry_points(group):
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=group)
+    return entry_points.get(group, [])
@@ -0,0 +1,114 @@
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.optimize import golden_section
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+
+def _optimized(params):
+    return {
+        'optimized_alpha': params['alpha'] is None,
+        'to_fit': params['alpha'] is None,
+    }
+
+
+PARAMS = ParamSpec(
+    [
+        Field('alpha', 'number', 'The alpha factor used to smooth level changes', minimum=0, maximum=1),
+        Field('initial_level', 'number', 'The level to be used for the first period (default: the first value)'),
+    ],
+    derive=_optimized,
+    description='Parameters of simple exponential smoothing; alpha is fitted when left out',
+)
+
+parse_params = PARAMS.compile()
+
+
+def sse(input_array, alpha, initial_level):
+    """In-sample one-step squared error of simple exponential smoothing, for every entry of ``alpha``."""
+    model = ExponentialSmoothing()
+    _, predictions = model.filter(input_array, model.initial_state(initial_level), alpha)
+    return np.sum((input_array - predictions)**2, axis=-1)
+
+
+def model(input_array, forecast_horizon, alpha=None, initial_level=None):
+    """Simple exponential smoothing of every series (last axis is time).
+
+    The initial level defaults to the first observation; without ``alpha``
+    it is fitted by minimizing the in-sample SSE with one bounded 1-D search
+    per series, all series at once.
+    """
+    input_array = np.asarray(input_array, dtype=float)
+    if input_array.shape[-1] < 1:
+        raise InvalidParameter('input_data should have at least one point')
+    initial_level = input_array[..., 0] if initial_level is None else np.asarray(initial_level, dtype=float)
+    if alpha is None:
+        alpha = golden_section(
+            lambda alpha: sse(input_array, alpha, initial_level),
+            np.zeros(input_array.shape[:-1]),
+            np.ones(input_array.shape[:-1]),
+        )
+    smoothing = ExponentialSmoothing()
+    state, predictions = smoothing.filter(input_array, smoothing.initial_state(initial_level), alpha)
+    return {
+        'forecast': smoothing.forecast(state, forecast_horizon),
+        'alpha': np.broadcast_to(alpha, input_array.shape[:-1]),
+        'initial_level': np.broadcast_to(initial_level, input_array.shape[:-1]),
+        'level': state.level,
+        'sse': np.sum((input_array - predictions)**2, axis=-1),
+    }
+
+
+class SES:
+    """Simple exponential smoothing in NumPy, for a series or a 2-d batch of series (one per row)."""
+
+    def __init__(self, params_parser, forecast_method):
+        self._parse_params = params_parser
+        self._forecast_method = forecast_method
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        result, _ = self._fit_forecast(input_data, forecast_horizon, **params)
+        return result
+
+    def fit_evaluate(self, input_data, forecast_horizon, **params):
+        result, fit = self._fit_forecast(input_data, forecast_horizon, **params)
+        result['sse'] = float(fit['sse'])
+        result['nobs'] = len(input_data)
+        result['n_params'] = int(result['params']['optimized_alpha'])
+        return result
+
+    def fit_forecast_batch(self, input_matrix, forecast_horizon, **params):
+        result = self.fit_forecast(input_matrix, forecast_horizon, **params)
+        return [
+            {
+                'forecast': forecast,
+                'params': dict(result['params'], alpha=alpha, initial_level=initial_level),
+            }
+            for forecast, alpha, initial_level in zip(
+                result['forecast'], result['params']['alpha'], result['params']['initial_level']
+            )
+        ]
+
+    def forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        if params['to_fit']:
+            raise ValueError(f'use fit_forecast to fit model with provided parameters')
+        result, _ = self._fit_forecast(input_data, forecast_horizon, **params)
+        return result
+
+    def _fit_forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        fit = self._forecast_method(
+            np.array(input_data, dtype=float),
+            forecast_horizon,
+            alpha=params['alpha'],
+            initial_level=params['initial_level']
+        )
+        params['alpha'] = fit['alpha'].tolist()
+        params['initial_level'] = fit['initial_level'].tolist()
+        return {
+            'forecast': fit['forecast'],
+            'params': params
+        }, fit
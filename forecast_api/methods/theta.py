@@ -0,0 +1,118 @@
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.exceptions import InvalidSeasonalParameters
+from forecast_api.lib.params import Field
+from forecast_api.lib.params import ParamSpec
+from forecast_api.lib.params import Rule
+from forecast_api.lib.seasonality import seasonal_indices
+from forecast_api.methods.ses import model as ses_model
+
+
+def _derived(params):
+    return {
+        # only defaulted here, so that an explicit deseasonalize without seasonal_periods is caught, and only with
+        # seasonal_periods, so that the params returned are accepted back
+        'deseasonalize': params['deseasonalize'] or ('mul' if params['seasonal_periods'] else None),
+        'optimized_alpha': params['alpha'] is None,
+        'to_fit': params['alpha'] is None,
+    }
+
+
+PARAMS = ParamSpec(
+    [
+        Field('theta', 'number', 'Weight of the trend line (2 is the classical Theta method)', default=2.0,
+              minimum=1),
+        Field('alpha', 'number', 'The alpha factor of the exponential smoothing', minimum=0, maximum=1),
+        Field('seasonal_periods', 'integer', 'Seasonally adjust the series with this period first', minimum=2),
+        Field('deseasonalize', 'string', 'Kind of seasonal adjustment (default: mul with seasonal_periods)',
+              choices=['add', 'mul']),
+    ],
+    rules=[
+        Rule(lambda p: p['deseasonalize'] is not None and p['seasonal_periods'] is None, InvalidSeasonalParameters,
+             'seasonal_periods must be provided if deseasonalize = {deseasonalize}'),
+    ],
+    derive=_derived,
+    description='Parameters of the Theta method; alpha is fitted when left out',
+)
+
+parse_params = PARAMS.compile()
+
+
+def model(input_array, forecast_horizon, theta=2.0, alpha=None, seasonal_periods=None, deseasonalize='mul'):
+    """Theta method of every series (last axis is time), in the SES with drift form of Hyndman and Billah.
+
+    The forecast is the SES forecast plus ``(1 - 1/theta)`` times the slope
+    of the linear trend, with the drift correction
+    ``h - 1 + 1/alpha - (1 - alpha)^n / alpha``. With ``seasonal_periods``
+    the series are seasonally adjusted by classical decomposition first and
+    the forecast is reseasonalised.
+    """
+    input_array = np.asarray(input_array, dtype=float)
+    length = input_array.shape[-1]
+    if length < 2:
+        # the slope of the trend line needs two points
+        raise InvalidParameter(f'input_data of length {length} should have at least two points')
+
+    if seasonal_periods:
+        if deseasonalize == 'mul' and np.any(input_array <= 0):
+            raise InvalidSeasonalParameters('deseasonalize = mul requires strictly positive input_data')
+        indices = seasonal_indices(input_array, seasonal_periods, deseasonalize)
+        seasons = indices[..., np.arange(length) % seasonal_periods]
+        input_array = input_array / seasons if deseasonalize == 'mul' else input_array - seasons
+
+    time = np.arange(length) - (length - 1) / 2
+    slope = (input_array @ time) / (time @ time)
+
+    ses = ses_model(input_array, forecast_horizon, alpha)
+    alpha = ses['alpha'][..., None]
+    steps = np.arange(1, forecast_horizon + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # (1/alpha) * (1 - (1 - alpha)^n) tends to n as alpha tends to 0
+        correction = np.where(alpha > 0, (1 - (1 - alpha)**length) / alpha, length)
+    forecast = ses['forecast'] + (1 - 1 / theta) * slope[..., None] * (steps - 1 + correction)
+
+    if seasonal_periods:
+        future = indices[..., (length + steps - 1) % seasonal_periods]
+        forecast = forecast * future if deseasonalize == 'mul' else forecast + future
+    return {
+        'forecast': forecast,
+        'alpha': ses['alpha'],
+        'slope': slope,
+    }
+
+
+class Theta:
+    """The Theta method in NumPy, for a series or a 2-d batch of series (one per row)."""
+
+    def __init__(self, params_parser, forecast_method):
+        self._parse_params = params_parser
+        self._forecast_method = forecast_method
+
+    def fit_forecast(self, input_data, forecast_horizon, **params):
+        params = self._parse_params(**params)
+        fit = self._forecast_method(
+            np.array(input_data, dtype=float),
+            forecast_horizon,
+            theta=params['theta'],
+            alpha=params['alpha'],
+            seasonal_periods=params['seasonal_periods'],
+            deseasonalize=params['deseasonalize']
+        )
+        params['alpha'] = fit['alpha'].tolist()
+        return {
+            'forecast': fit['forecast'],
+            'params': params
+        }
+
+    def fit_forecast_batch(self, input_matrix, forecast_horizon, **params):
+        result = self.fit_forecast(input_matrix, forecast_horizon, **params)
+        return [
+            {'forecast': forecast, 'params': dict(result['params'], alpha=alpha)}
+            for forecast, alpha in zip(result['forecast'], result['params']['alpha'])
+        ]
+
+    def forecast(self, input_data, forecast_horizon, **params):
+        if self._parse_params(**params)['to_fit']:
+            raise ValueError(f'use fit_forecast to fit model with provided parameters')
+        return self.fit_forecast(input_data, forecast_horizon, **params)
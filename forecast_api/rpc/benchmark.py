@@ -0,0 +1,80 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+from wsgiref.simple_server import WSGIRequestHandler
+from wsgiref.simple_server import make_server
+
+from forecast_api.rpc.client import RpcClient
+from forecast_api.rpc.server import RpcServer
+
+
+class _QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _rate(calls, started):
+    elapsed = time.perf_counter() - started
+    return {'calls': calls, 'seconds': elapsed, 'calls_per_second': calls / elapsed}
+
+
+def _http(app, method, series, forecast_horizon, params):
+    server = make_server('127.0.0.1', 0, app, handler_class=_QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        started = time.perf_counter()
+        for input_data in series:
+            # wsgiref speaks HTTP/1.0: a connection per call, as most HTTP clients without a session
+            connection = http.client.HTTPConnection('127.0.0.1', server.server_port)
+            body = json.dumps({'input_data': input_data.tolist(), 'forecast_horizon': forecast_horizon,
+                               'params': params})
+            connection.request('POST', f'/v1/forecast/{method}', body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f'HTTP {response.status}: {response.read()!r}')
+            json.loads(response.read())
+            connection.close()
+        return _rate(len(series), started)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _rpc(registry, method, series, forecast_horizon, params, threads):
+    with tempfile.TemporaryDirectory() as directory:
+        server = RpcServer(registry, os.path.join(directory, 'forecast_api.sock'), threads=threads).start_in_thread()
+        try:
+            return _rpc_rates(server.path, method, series, forecast_horizon, params)
+        finally:
+            server.stop()
+
+
+def _rpc_rates(path, method, series, forecast_horizon, params):
+    results = {}
+    with RpcClient(path, pool_size=1) as client:
+        started = time.perf_counter()
+        for input_data in series:
+            client.fit_forecast(method, input_data, forecast_horizon, **params)
+        results['rpc'] = _rate(len(series), started)
+    with RpcClient(path) as client:
+        started = time.perf_counter()
+        client.map(method, series, forecast_horizon, **params)
+        results['rpc_pipelined'] = _rate(len(series), started)
+    return results
+
+
+def benchmark(container, app, method='average', calls=1000, length=100, forecast_horizon=10, params=None,
+              threads=None):
+    """Calls per second of the same forecasts over HTTP + JSON, over RPC one at a time and over pipelined RPC."""
+    params = {'window': 'auto'} if params is None and method == 'average' else params or {}
+    series = list(np.random.default_rng(0).normal(10.0, 1.0, size=(calls, length)))
+    results = {'http': _http(app, method, series, forecast_horizon, params)}
+    results.update(_rpc(container('registry'), method, series, forecast_horizon, params, threads))
+    return results
@@ -0,0 +1,163 @@
+import itertools
+import socket
+import threading
+import numpy as np
+
+from concurrent.futures import Future
+
+from forecast_api.rpc.protocol import (
+    DEFAULT_MAX_FRAME_BYTES,
+    encode_frame,
+    exception_of,
+    recv_frame,
+)
+
+DEFAULT_POOL_SIZE = 4
+
+
+class RpcConnection:
+    """One persistent connection to an RpcServer; requests are pipelined and matched to their responses by id.
+
+    ``submit`` writes the request and returns a Future straight away, a
+    reader thread resolves the futures as the responses arrive, in
+    whatever order the server sends them.
+    """
+
+    def __init__(self, path, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._max_frame_bytes = max_frame_bytes
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.closed = False
+        self._reader = threading.Thread(target=self._read_responses, name='rpc-client', daemon=True)
+        self._reader.start()
+
+    def submit(self, method, input_data, forecast_horizon, params=None, operation='fit_forecast', fields=None):
+        if not isinstance(input_data, dict):
+            input_data = np.asarray(input_data, dtype=float)
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError('the RPC connection is closed')
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        try:
+            frame = encode_frame({
+                'id': request_id,
+                'method': method,
+                'operation': operation,
+                'input_data': input_data,
+                'forecast_horizon': forecast_horizon,
+                'params': params or {},
+                **({} if fields is None else {'fields': fields}),
+            })
+        except Exception:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise
+        # not under self._lock: a send blocked on a full socket must not stop the responses from being read
+        with self._send_lock:
+            try:
+                self._socket.sendall(frame)
+            except OSError as e:
+                self._fail_pending(ConnectionError(f'the RPC connection failed: {e}'))
+                raise
+        return future
+
+    def _read_responses(self):
+        try:
+            while True:
+                response = recv_frame(self._socket, self._max_frame_bytes)
+                if response is None:
+                    break
+                with self._lock:
+                    future = self._pending.pop(response.get('id'), None)
+                if future is None:
+                    # an error the server could not tie to a request ends the connection
+                    if 'error' in response:
+                        self._fail_pending(exception_of(response['error']))
+                    continue
+                if 'error' in response:
+                    future.set_exception(exception_of(response['error']))
+                else:
+                    future.set_result(response['result'])
+        except Exception as e:
+            self._fail_pending(ConnectionError(f'the RPC connection failed: {e}'))
+        finally:
+            self._fail_pending(ConnectionError('the RPC connection was closed'))
+
+    def _fail_pending(self, exception):
+        with self._lock:
+            self._close_locked()
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(exception)
+
+    def _close_locked(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+        self._reader.join()
+
+
+class RpcClient:
+    """Pool of ``pool_size`` persistent connections to an RpcServer, used in turn and reopened when they fail.
+
+    ``fit_forecast`` is a blocking call; ``submit`` and ``map`` pipeline
+    requests, so many series are in flight on every connection at once.
+    Errors are raised as the server raised them: InvalidParameter,
+    UnknownForecastMethod, PayloadTooLarge, or RpcError.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+        self._path = path
+        self._max_frame_bytes = max_frame_bytes
+        self._connections = [None] * pool_size
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        slot = next(self._turns) % len(self._connections)
+        with self._lock:
+            connection = self._connections[slot]
+            if connection is None or connection.closed:
+                connection = self._connections[slot] = RpcConnection(self._path, self._max_frame_bytes)
+            return connection
+
+    def submit(self, method, input_data, forecast_horizon, params=None, operation='fit_forecast', fields=None):
+        return self._connection().submit(method, input_data, forecast_horizon, params, operation, fields)
+
+    def fit_forecast(self, method, input_data, forecast_horizon, **params):
+        return self.submit(method, input_data, forecast_horizon, params).result()
+
+    def forecast(self, method, input_data, forecast_horizon, **params):
+        return self.submit(method, input_data, forecast_horizon, params, operation='forecast').result()
+
+    def map(self, method, series, forecast_horizon, **params):
+        """Results of every series of ``series``, all pipelined, in order; the first error is raised."""
+        futures = [self.submit(method, input_data, forecast_horizon, params) for input_data in series]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, [None] * len(self._connections)
+        for connection in connections:
+            if connection is not None:
+                connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,375 @@
+import hmac
+import ipaddress
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast_api.lib.batch import fit_series
+from forecast_api.rpc.protocol import (
+    encode_frame,
+    recv_frame,
+)
+
+_log = logging.getLogger(__name__)
+
+# messages: a worker registers and then heartbeats; it is sent shards and sends back their results
+MSG_REGISTER = 'register'
+MSG_REGISTERED = 'registered'
+MSG_HEARTBEAT = 'heartbeat'
+MSG_SHARD = 'shard'
+MSG_RESULT = 'result'
+MSG_STOP = 'stop'
+
+DEFAULT_SHARD_SIZE = 100
+DEFAULT_HEARTBEAT_INTERVAL = 2.0
+DEFAULT_HEARTBEAT_TIMEOUT = 10.0
+DEFAULT_MAX_ATTEMPTS = 3
+# the first frame of a connection, before it is known to be a worker
+MAX_REGISTER_BYTES = 2**16
+
+
+def parse_address(address):
+    """``(host, port)`` of ``host:port``."""
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f'address {address} should be host:port')
+    return host, int(port)
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_listen(host, token):
+    """ValueError unless a coordinator may listen on ``host``: beyond loopback, workers must bring ``token``.
+
+    Whoever registers as a worker is sent the series and can send back
+    results, so an open port needs a shared secret.
+    """
+    if token is None and not _is_loopback(host):
+        raise ValueError(f'a coordinator listening on {host} (not loopback) needs a token')
+
+
+class _Shard:
+
+    def __init__(self, shard_id, series):
+        self.shard_id = shard_id
+        self.series = series
+        self.attempts = 0
+
+
+class _RemoteWorker:
+    """The coordinator's view of a registered worker."""
+
+    def __init__(self, name, sock, slots):
+        self.name = name
+        self.socket = sock
+        self.slots = slots
+        self.shards = set()
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.socket.sendall(encode_frame(message))
+
+
+class Coordinator:
+    """Shards batch work across the workers registered over TCP and gathers their results.
+
+    Workers (``forecast-api worker``, see Worker) connect to ``address``
+    and are sent shards of ``shard_size`` series, up to ``slots`` at a
+    time each. A worker that disconnects, or sends no heartbeat for
+    ``heartbeat_timeout`` seconds, is dropped and its shards are sent to
+    another; a shard lost ``max_attempts`` times is given up, its series
+    get an error. Only ``max_pending`` shards are read from the input at a
+    time, so memory stays flat however large the run is. No broker is
+    involved: every worker on every host talks to this one process.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, heartbeat_timeout=DEFAULT_HEARTBEAT_TIMEOUT,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, token=None):
+        check_listen(host, token)
+        self._heartbeat_timeout = heartbeat_timeout
+        self._max_attempts = max_attempts
+        self._token = token
+        self._listener = socket.create_server((host, port))
+        self.address = self._listener.getsockname()[:2]
+        self._condition = threading.Condition()
+        self._workers = []
+        self._queue = deque()
+        self._pending = {}
+        self._completed = []
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._accept, name='coordinator-accept', daemon=True),
+            threading.Thread(target=self._monitor, name='coordinator-monitor', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def workers(self):
+        with self._condition:
+            return [worker.name for worker in self._live_workers()]
+
+    def wait_for_workers(self, count, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._live_workers()) >= count, timeout)
+
+    def run(self, method, series, forecast_horizon, params=None, shard_size=DEFAULT_SHARD_SIZE, max_pending=None):
+        """Yield the results of the ``(series_id, values)`` of ``series``, a shard at a time, as they complete."""
+        series = iter(series)
+        shard_ids = itertools.count()
+        exhausted = False
+        work = {'method': method, 'forecast_horizon': forecast_horizon, 'params': params or {}}
+
+        while True:
+            with self._condition:
+                limit = max_pending or max(2 * sum(worker.slots for worker in self._live_workers()), 2)
+                while not exhausted and len(self._pending) < limit:
+                    chunk = list(itertools.islice(series, shard_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    shard = _Shard(next(shard_ids), [[series_id, values] for series_id, values in chunk])
+                    self._pending[shard.shard_id] = shard
+                    self._queue.append(shard)
+                if exhausted and not self._pending and not self._completed:
+                    return
+                assignments = self._assign()
+                if not assignments and not self._completed:
+                    self._condition.wait(self._heartbeat_timeout / 4)
+                completed, self._completed = self._completed, []
+
+            for worker, shard in assignments:
+                try:
+                    worker.send(dict(work, type=MSG_SHARD, shard_id=shard.shard_id, series=shard.series))
+                except OSError:
+                    self._lose(worker, 'could not be sent its shard')
+            for results in completed:
+                yield results
+
+    def _live_workers(self):
+        return [worker for worker in self._workers if worker.alive]
+
+    def _assign(self):
+        """Hand the queued shards to the workers with free slots, least busy first (under the condition)."""
+        assignments = []
+        while self._queue:
+            free = [worker for worker in self._live_workers() if len(worker.shards) < worker.slots]
+            if not free:
+                break
+            worker = min(free, key=lambda worker: len(worker.shards) / worker.slots)
+            shard = self._queue.popleft()
+            shard.attempts += 1
+            worker.shards.add(shard.shard_id)
+            assignments.append((worker, shard))
+        return assignments
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                sock, peer = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_worker, args=(sock, peer), name='coordinator-worker',
+                             daemon=True).start()
+
+    def _authorized(self, token):
+        if self._token is None:
+            return True
+        # in constant time, the time taken must not tell how much of a guess was right
+        return isinstance(token, str) and hmac.compare_digest(token.encode(), self._token.encode())
+
+    def _serve_worker(self, sock, peer):
+        try:
+            message = recv_frame(sock, MAX_REGISTER_BYTES)
+        except Exception:
+            message = None
+        if not message or message.get('type') != MSG_REGISTER or not self._authorized(message.get('token')):
+            _log.warning(f'refused a worker from {peer[0]}:{peer[1]}')
+            sock.close()
+            return
+
+        worker = _RemoteWorker(message.get('name') or f'{peer[0]}:{peer[1]}', sock, max(message.get('slots', 1), 1))
+        with self._condition:
+            self._workers.append(worker)
+            self._condition.notify_all()
+        _log.info(f'worker {worker.name} registered with {worker.slots} slots')
+        try:
+            worker.send({'type': MSG_REGISTERED})
+            while True:
+                message = recv_frame(sock)
+                if message is None:
+                    break
+                with self._condition:
+                    worker.last_seen = time.monotonic()
+                    if message.get('type') == MSG_RESULT:
+                        self._complete(worker, message['shard_id'], message['results'])
+        except Exception as e:
+            _log.warning(f'worker {worker.name} failed: {e!r}')
+        self._lose(worker, 'disconnected')
+
+    def _complete(self, worker, shard_id, results):
+        worker.shards.discard(shard_id)
+        # a shard given up on a lost worker may still arrive: only its first result counts
+        if self._pending.pop(shard_id, None) is not None:
+            self._completed.append(results)
+        self._condition.notify_all()
+
+    def _monitor(self):
+        while not self._closed:
+            time.sleep(self._heartbeat_timeout / 4)
+            deadline = time.monotonic() - self._heartbeat_timeout
+            with self._condition:
+                silent = [worker for worker in self._live_workers() if worker.last_seen < deadline]
+            for worker in silent:
+                self._lose(worker, f'sent no heartbeat for {self._heartbeat_timeout}s')
+
+    def _lose(self, worker, reason):
+        with self._condition:
+            if not worker.alive:
+                return
+            worker.alive = False
+            self._workers.remove(worker)
+            lost, worker.shards = worker.shards, set()
+            for shard_id in sorted(lost):
+                shard = self._pending.get(shard_id)
+                if shard is None:
+                    continue
+                if shard.attempts < self._max_attempts:
+                    self._queue.appendleft(shard)
+                else:
+                    del self._pending[shard_id]
+                    error = f'shard lost {shard.attempts} times, last on worker {worker.name}'
+                    self._completed.append([{'series_id': series_id, 'error': error} for series_id, _ in shard.series])
+            self._condition.notify_all()
+        if not self._closed:
+            _log.warning(f'worker {worker.name} {reason}, {len(lost)} shards to retry')
+        _close_socket(worker.socket)
+
+    def close(self):
+        """Stop every worker and stop listening."""
+        self._closed = True
+        with self._condition:
+            workers = self._live_workers()
+        for worker in workers:
+            try:
+                worker.send({'type': MSG_STOP})
+            except OSError:
+                pass
+            self._lose(worker, 'stopped')
+        _close_socket(self._listener)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Worker:
+    """Runs the shards a Coordinator sends it with the method services of ``registry``.
+
+    Connects to the coordinator at ``address`` (retrying for up to
+    ``connect_timeout`` seconds, so workers may start first), registers
+    ``slots`` concurrent shards and heartbeats every
+    ``heartbeat_interval`` seconds, including while it fits. ``run``
+    returns when the coordinator stops it or goes away.
+    """
+
+    def __init__(self, registry, address, slots=1, name=None, heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL,
+                 connect_timeout=60.0, token=None):
+        self._registry = registry
+        self._address = address
+        self._slots = slots
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}:{id(self):x}'
+        self._heartbeat_interval = heartbeat_interval
+        self._connect_timeout = connect_timeout
+        self._token = token
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _connect(self):
+        deadline = time.monotonic() + self._connect_timeout
+        while True:
+            try:
+                return socket.create_connection(self._address)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _send(self, message):
+        with self._send_lock:
+            self._socket.sendall(encode_frame(message))
+
+    def run(self):
+        self._socket = self._connect()
+        self._send({'type': MSG_REGISTER, 'name': self.name, 'slots': self._slots, 'token': self._token})
+        heartbeat = threading.Thread(target=self._heartbeat, name='worker-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self._slots, thread_name_prefix='worker') as executor:
+                while True:
+                    message = recv_frame(self._socket)
+                    if message is None or message.get('type') == MSG_STOP:
+                        break
+                    if message.get('type') == MSG_SHARD:
+                        executor.submit(self._run_shard, message)
+        except OSError:
+            pass
+        finally:
+            self.stop()
+            heartbeat.join()
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self._heartbeat_interval):
+            try:
+                self._send({'type': MSG_HEARTBEAT})
+            except OSError:
+                return
+
+    def _run_shard(self, shard):
+        try:
+            engine = self._registry.engine(shard['method'])
+            results = [
+                fit_series(engine, series_id, values, shard['forecast_horizon'], shard['params'])
+                for series_id, values in shard['series']
+            ]
+        except Exception as e:
+            # the shard must be answered, or it would only be retried on another worker to fail there again
+            _log.exception(f'shard {shard["shard_id"]} failed')
+            results = [{'series_id': series_id, 'error': str(e)} for series_id, _ in shard['series']]
+        try:
+            self._send({'type': MSG_RESULT, 'shard_id': shard['shard_id'], 'results': results})
+        except OSError:
+            _log.warning(f'the result of shard {shard["shard_id"]} could not be sent')
+
+    def stop(self):
+        self._stopped.set()
+        if self._socket is not None:
+            _close_socket(self._socket)
+
+
+def _close_socket(sock):
+    # shut down first: closing alone does not wake a thread blocked reading it
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
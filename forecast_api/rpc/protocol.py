@@ -0,0 +1,119 @@
+import struct
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.exceptions import RpcError
+from forecast_api.lib.exceptions import UnknownForecastMethod
+
+
+# every frame is a big endian unsigned 32 bit length followed by that many bytes of msgpack
+HEADER = struct.Struct('>I')
+DEFAULT_MAX_FRAME_BYTES = 256 * 2**20
+
+# msgpack extension type of a float64 array, sent as its little endian bytes instead of a list of floats
+EXT_FLOAT64 = 1
+
+ERROR_BAD_REQUEST = 'bad_request'
+ERROR_NOT_IMPLEMENTED = 'not_implemented'
+ERROR_TOO_LARGE = 'too_large'
+ERROR_INTERNAL = 'internal'
+
+_ERRORS = {
+    ERROR_BAD_REQUEST: InvalidParameter,
+    ERROR_NOT_IMPLEMENTED: UnknownForecastMethod,
+    ERROR_TOO_LARGE: PayloadTooLarge,
+}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError('the RPC server and client require msgpack to be installed')
+    return msgpack
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return _msgpack().ExtType(EXT_FLOAT64, np.ascontiguousarray(value, dtype='<f8').tobytes())
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'Object of type {type(value).__name__} cannot be sent over RPC')
+
+
+def _ext_hook(code, data):
+    if code == EXT_FLOAT64:
+        # copied, the methods may write into their input
+        return np.frombuffer(data, dtype='<f8').copy()
+    return _msgpack().ExtType(code, data)
+
+
+def pack(message):
+    return _msgpack().packb(message, default=_default, use_bin_type=True)
+
+
+def unpack(payload):
+    return _msgpack().unpackb(payload, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def encode_frame(message):
+    payload = pack(message)
+    return HEADER.pack(len(payload)) + payload
+
+
+def frame_size(header, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+    """Payload size announced by a frame ``header``; PayloadTooLarge past ``max_frame_bytes``."""
+    (size,) = HEADER.unpack(header)
+    if max_frame_bytes is not None and size > max_frame_bytes:
+        raise PayloadTooLarge(f'the frame ({size} bytes) is larger than {max_frame_bytes} bytes')
+    return size
+
+
+def recv_exactly(sock, size):
+    """``size`` bytes of a blocking socket, None if it is closed first."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            return None
+        received += count
+    return bytes(buffer)
+
+
+def recv_frame(sock, max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+    """The next message of a blocking socket, None once it is closed."""
+    header = recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    payload = recv_exactly(sock, frame_size(header, max_frame_bytes))
+    if payload is None:
+        return None
+    return unpack(payload)
+
+
+def error_of(exception):
+    """``{kind, message}`` of an exception raised serving a request."""
+    if isinstance(exception, UnknownForecastMethod):
+        kind = ERROR_NOT_IMPLEMENTED
+    elif isinstance(exception, PayloadTooLarge):
+        kind = ERROR_TOO_LARGE
+    elif isinstance(exception, (InvalidParameter, ValueError, TypeError)):
+        kind = ERROR_BAD_REQUEST
+    else:
+        kind = ERROR_INTERNAL
+    return {'kind': kind, 'message': str(exception)}
+
+
+def exception_of(error):
+    """The exception a client raises for an ``error`` response, the one the server raised where it can."""
+    exception = _ERRORS.get(error.get('kind'))
+    if exception is None:
+        return RpcError(error.get('kind'), error.get('message'))
+    return exception(error.get('message'))
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.exceptions import UnknownForecastMethod
+from forecast_api.lib.fields import parse_fields_param
+from forecast_api.lib.fields import projected
+from forecast_api.rpc.protocol import (
+    DEFAULT_MAX_FRAME_BYTES,
+    ERROR_INTERNAL,
+    HEADER,
+    encode_frame,
+    error_of,
+    frame_size,
+    unpack,
+)
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# what a request may call on an engine
+OPERATIONS = ('fit_forecast', 'forecast')
+
+
+class RpcServer:
+    """Forecasts over a Unix domain socket: length prefixed msgpack frames on persistent connections.
+
+    A request is ``{id, method, input_data, forecast_horizon, params[,
+    operation][, fields]}`` (``operation`` defaults to ``fit_forecast``,
+    ``fields`` projects the result as in the HTTP API) and is answered by
+    ``{id, result}`` or ``{id, error: {kind, message}}``. Requests are
+    pipelined: each one is run by the registry, exactly as the HTTP API
+    runs it, on one of ``threads`` threads as soon as it is read, and
+    answered as soon as it is done, in any order. At most
+    ``max_in_flight`` requests of a connection run at once, then reading
+    it pauses.
+    """
+
+    def __init__(self, registry, path, threads=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 max_frame_bytes=DEFAULT_MAX_FRAME_BYTES):
+        self._registry = registry
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=threads or os.cpu_count(), thread_name_prefix='rpc')
+        self._max_in_flight = max_in_flight
+        self._max_frame_bytes = max_frame_bytes
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_unix_server(self._serve_connection, path=self.path)
+        _log.info(f'RPC server listening on {self.path}')
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve_forever())
+        finally:
+            self._executor.shutdown()
+
+    def start_in_thread(self):
+        """Serve from a daemon thread (e.g. for tests and benchmarks), ``stop`` ends it."""
+        started = threading.Event()
+
+        async def _serve():
+            await self.start()
+            started.set()
+            async with self._server:
+                try:
+                    await self._server.serve_forever()
+                except asyncio.CancelledError:
+                    pass
+
+        thread = threading.Thread(target=asyncio.run, args=(_serve(),), name='rpc-server', daemon=True)
+        thread.start()
+        started.wait()
+        self._thread = thread
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve_connection(self, reader, writer):
+        in_flight = asyncio.Semaphore(self._max_in_flight)
+        running = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                    payload = await reader.readexactly(frame_size(header, self._max_frame_bytes))
+                except asyncio.IncompleteReadError:
+                    break
+                except PayloadTooLarge as e:
+                    # the rest of the stream cannot be framed anymore: answer and hang up
+                    writer.write(encode_frame({'id': None, 'error': error_of(e)}))
+                    break
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self._respond(payload, writer, in_flight))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, payload, writer, in_flight):
+        try:
+            frame = await self._loop.run_in_executor(self._executor, self._handle, payload)
+            writer.write(frame)
+            await writer.drain()
+        finally:
+            in_flight.release()
+
+    def _handle(self, payload):
+        """The response frame of a request frame; packed here, off the event loop."""
+        request_id = None
+        try:
+            request = unpack(payload)
+            request_id = request.get('id')
+            method, operation = request.get('method'), request.get('operation', 'fit_forecast')
+            if operation not in OPERATIONS or not hasattr(self._registry.engine(method), operation):
+                raise UnknownForecastMethod(f'Not implemented: {method} with operation {operation}')
+            missing = [field for field in ('input_data', 'forecast_horizon') if field not in request]
+            if missing:
+                raise InvalidParameter(f'{", ".join(missing)} should be given')
+            fields = parse_fields_param('fields', request.get('fields'))
+            args = (request['input_data'], request['forecast_horizon'])
+            params = request.get('params') or {}
+            if fields is None:
+                result = self._registry.run(method, operation, *args, **params)
+            else:
+                function = getattr(self._registry.engine(method), operation)
+                pool = self._registry.spec(method).pool
+                result = self._registry.submit_call_in(pool, projected, fields, function, *args, **params).result()
+            return encode_frame({'id': request_id, 'result': result})
+        except Exception as e:
+            error = error_of(e)
+            if error['kind'] == ERROR_INTERNAL:
+                _log.exception('Problem generating forecast')
+            return encode_frame({'id': request_id, 'error': error})
@@ -1,18 +1,53 @@
+import time
 import traceback
 import falcon
 import structlog
 
+from forecast_api.api.backtest import BacktestResource
+from forecast_api.api.hierarchy import HierarchyResource
+from forecast_api.api.idempotency import IdempotencyMiddleware
+from forecast_api.api.metrics import MetricsResource
+from forecast_api.api.openapi import OpenAPIResource
 from forecast_api.api.ping import PingResource
-from forecast_api.api.forecast import ForecastResource
 from forecast_api.api.forecast import GenericForecastResource
+from forecast_api.api.panel import PanelResource
+from forecast_api.api.scenarios import ScenariosResource
 
 from forecast_api.app import create_container
+from forecast_api.app import warm_up
+from forecast_api.lib.memory import private_bytes
+from forecast_api.lib.memory import rss_bytes
+from forecast_api.lib.serialization import json_handler
 
 _log = structlog.get_logger(__name__)
 
 
 def configure_callable(ini_path=None):
-    return create_callable(create_container(ini_path))
+    started = time.perf_counter()
+    container = create_container(ini_path)
+    app = create_callable(container)
+
+    warmed_up = container('config').getboolean('forecast_api', 'warm_up', fallback=False)
+    if warmed_up:
+        warm_up(container)
+
+    _log.info(
+        f'application loaded in {time.perf_counter() - started:.3f}s '
+        f'(warm_up={warmed_up}, rss={rss_bytes() / 2**20:.1f}MB)'
+    )
+    _register_postfork_report()
+    return app
+
+
+def _register_postfork_report():
+    try:
+        from uwsgidecorators import postfork
+    except ImportError:
+        return
+
+    @postfork
+    def _report_worker_memory():
+        _log.info(f'worker started (rss={rss_bytes() / 2**20:.1f}MB, private={private_bytes() / 2**20:.1f}MB)')
 
 
 def handle_uncaught_exceptions(ex, request, response, params):
@@ -27,33 +62,62 @@ def handle_uncaught_exceptions(ex, request, response, params):
 
 
 def create_callable(container):
-    app = falcon.API()
+    app = falcon.API(middleware=[
+        IdempotencyMiddleware(container('idempotency_store')),
+    ])
+    app.resp_options.media_handlers[falcon.MEDIA_JSON] = json_handler()
     app.add_route(
         '/alert/ping',
         PingResource()
     )
     app.add_route(
-        '/v1/forecast/average',
-        ForecastResource(
-            container('services.methods.average')
-
+        '/alert/metrics',
+        MetricsResource(
+            container('metrics')
         )
     )
     app.add_route(
-        '/v1/forecast/holt',
-        ForecastResource(
-            container('services.methods.holt')
+        '/v1/openapi.json',
+        OpenAPIResource(
+            container('registry')
         )
     )
     app.add_route(
-        '/v1/forecast/holtwinter',
-        ForecastResource(
-            container('services.methods.holtwinter')
+        '/v1/forecast/{forecast_method}',
+        GenericForecastResource(
+            container('registry'),
+            container('request_limits'),
+            container('memory_budget'),
+            container('metrics')
         )
     )
     app.add_route(
-        '/v1/forecast/{forecast_method}',
-        GenericForecastResource(
+        '/v1/backtest/{forecast_method}',
+        BacktestResource(
+            container('registry'),
+            container('services.pools.backtest'),
+            container('request_limits')
+        )
+    )
+
+    app.add_route(
+        '/v1/scenarios/{forecast_method}',
+        ScenariosResource(
+            container('registry')
+        )
+    )
+
+    app.add_route(
+        '/v1/panel/{forecast_method}',
+        PanelResource(
+            container('registry')
+        )
+    )
+
+    app.add_route(
+        '/v1/hierarchy/{forecast_method}',
+        HierarchyResource(
+            container('registry')
         )
     )
 
@@ -48,6 +48,11 @@ setup(
     ],
     packages=find_packages(
         exclude=["*.tests", "*.tests.*", "tests.*", "tests"]),
+    entry_points={
+        'console_scripts': [
+            'forecast-api = forecast_api.cli:main',
+        ],
+    },
     include_package_data=True,
     zip_safe=False,
 )
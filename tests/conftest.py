@@ -1,6 +1,8 @@
 import pytest
 import webtest
 
+import numpy as np
+
 from forecast_api.wsgi import create_callable
 from forecast_api.app import create_container
 
@@ -24,6 +26,23 @@ def webapi(app):
     return webtest.TestApp(app)
 
 
+@pytest.fixture
+def average_body():
+    """Builder of a /v1/forecast/average request body, with ``changes`` to its fields."""
+    def _body(**changes):
+        body = {'input_data': [1, 2, 3, 4], 'forecast_horizon': 2, 'params': {'window': 2}}
+        body.update(changes)
+        return body
+    return _body
+
+
+@pytest.fixture
+def seasonal_input():
+    """Four years of a noisy monthly series with trend and seasonality."""
+    time = np.arange(48)
+    return list(50 + 0.3 * time + 8 * np.sin(2 * np.pi * time / 12) + np.random.default_rng(1).normal(0, 1, 48))
+
+
 def pytest_addoption(parser):
     parser.addoption(
         '--ini-file',
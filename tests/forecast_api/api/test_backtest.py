@@ -0,0 +1,66 @@
+import numpy as np
+
+
+def test_post_average_backtest(webapi):
+
+    response = webapi.post_json(
+        '/v1/backtest/average',
+        {
+            'input_data': [1, 2, 3, 4, 5, 6, 7, 8],
+            'forecast_horizon': 2,
+            'initial_window': 4,
+            'step': 2,
+            'params': {
+                'window': 2
+            }
+        },
+        status=200
+    )
+    folds = response.json['folds']
+    assert [fold['cutoff'] for fold in folds] == [4, 6]
+    assert folds[0]['forecast'] == [3.5, 3.5]
+    assert response.json['aggregate']['mae'] == 2.0
+
+
+def test_post_holt_backtest_with_fixed_params(webapi, container):
+    input_data = list(10 + np.arange(30) * 0.5 + np.sin(np.arange(30)))
+    params = {'alpha': 0.5, 'beta': 0.1, 'initial_level': 10.0, 'initial_slope': 0.5}
+
+    response = webapi.post_json(
+        '/v1/backtest/holt',
+        {
+            'input_data': input_data,
+            'forecast_horizon': 3,
+            'initial_window': 10,
+            'step': 5,
+            'params': params
+        },
+        status=200
+    )
+
+    holt = container('services.methods.holt')
+    for fold in response.json['folds']:
+        # every fold continues the filter, it must match a fresh single fold backtest on the same prefix
+        single = holt.backtest(input_data[:fold['cutoff'] + 3], 3, fold['cutoff'], **params)
+        np.testing.assert_allclose(fold['forecast'], single['folds'][0]['forecast'])
+
+
+def test_post_backtest_bad_window(webapi):
+    webapi.post_json(
+        '/v1/backtest/average',
+        {
+            'input_data': [1, 2, 3],
+            'forecast_horizon': 2,
+            'initial_window': 4,
+            'params': {'window': 2}
+        },
+        status=400
+    )
+
+
+def test_post_backtest_not_implemented(webapi):
+    webapi.post_json(
+        '/v1/backtest/auto',
+        {'input_data': [1, 2, 3], 'forecast_horizon': 1, 'initial_window': 1, 'params': {}},
+        status=501
+    )
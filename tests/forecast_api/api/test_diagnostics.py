@@ -0,0 +1,88 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.diagnostics import collecting
+from forecast_api.lib.diagnostics import diagnosed
+from forecast_api.lib.diagnostics import record_optimizer
+from forecast_api.lib.optimize import golden_section
+
+
+def test_diagnostics_on_request(webapi, seasonal_input):
+    body = {'input_data': seasonal_input, 'forecast_horizon': 3, 'params': {}}
+    response = webapi.post_json('/v1/forecast/ses', body, status=200)
+    assert 'diagnostics' not in response.json
+    assert response.headers.get('ETag')
+
+    response = webapi.post_json('/v1/forecast/ses', dict(body, diagnostics=True), status=200)
+    diagnostics = response.json['diagnostics']
+    assert diagnostics['optimizer_runs'] == 1
+    assert diagnostics['iterations'] > 0
+    assert diagnostics['function_evaluations'] == diagnostics['iterations'] + 2
+    assert diagnostics['converged'] is True
+    assert diagnostics['nobs'] == 48
+    assert diagnostics['aic'] == pytest.approx(48 * np.log(diagnostics['sse'] / 48) + 2 * diagnostics['n_params'])
+    assert diagnostics['phases']['total'] > 0
+    # only in the diagnostics, the forecast is what it is without them
+    assert 'sse' not in response.json
+    assert 'ETag' not in response.headers
+
+
+def test_diagnostics_of_multistart_phases(webapi, seasonal_input):
+    body = {
+        'input_data': seasonal_input,
+        'forecast_horizon': 3,
+        'params': {'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 12, 'multistart': 4},
+        'diagnostics': True,
+    }
+    result = webapi.post_json('/v1/forecast/holtwinter', body, status=200).json
+    diagnostics = result['diagnostics']
+    # every refinement records, from whichever thread of the pool it ran on
+    assert diagnostics['optimizer_runs'] == result['multistart']['refined'] == 5
+    assert {'parse', 'fit', 'forecast', 'total'} <= set(diagnostics['phases'])
+    assert diagnostics['phases']['fit'] <= diagnostics['phases']['total']
+
+
+def test_diagnostics_without_optimizer(webapi):
+    body = {'input_data': [1, 2, 3, 4], 'forecast_horizon': 2, 'params': {'window': 2}, 'diagnostics': True}
+    diagnostics = webapi.post_json('/v1/forecast/average', body, status=200).json['diagnostics']
+    assert diagnostics['optimizer_runs'] == 0
+    assert diagnostics['converged'] is None
+
+
+def test_invalid_diagnostics_option(webapi):
+    body = {'input_data': [1, 2, 3, 4], 'forecast_horizon': 2, 'params': {}, 'diagnostics': 'maybe'}
+    webapi.post_json('/v1/forecast/ses', body, status=400)
+
+
+def test_fit_effort_metrics(webapi, container, seasonal_input):
+    body = {'input_data': seasonal_input, 'forecast_horizon': 3, 'params': {}}
+    webapi.post_json('/v1/forecast/ses', body, status=200)
+    webapi.post_json('/v1/forecast/ses', body, status=200)
+
+    metrics = container('metrics')
+    assert metrics.summary('forecast_fit_iterations', method='ses')[0] == 2
+    assert metrics.summary('forecast_fit_phase_seconds', method='ses', phase='total')[0] == 2
+    text = webapi.get('/alert/metrics', status=200).text
+    assert 'forecast_fit_function_evaluations_count{method="ses"} 2' in text
+
+
+def test_unconverged_runs_are_reported():
+    def _fit():
+        golden_section(lambda x: (x - 0.3) ** 2, 0.0, 1.0, max_iterations=3)
+        record_optimizer(7, 9, True)
+        return 'fitted'
+
+    result, diagnostics = diagnosed(_fit)
+    assert result == 'fitted'
+    assert diagnostics['optimizer_runs'] == 2
+    assert diagnostics['iterations'] == 10
+    assert diagnostics['converged'] is False
+    assert diagnostics['message'] == 'maximum number of iterations'
+
+
+def test_nothing_is_recorded_outside_collection():
+    record_optimizer(1, 1, False)
+    with collecting() as diagnostics:
+        pass
+    assert diagnostics.optimizer_runs == 0
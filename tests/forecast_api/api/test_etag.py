@@ -0,0 +1,69 @@
+import pytest
+
+
+def test_forecast_has_a_strong_etag(webapi, average_body):
+    first = webapi.post_json('/v1/forecast/average', average_body(), status=200)
+    again = webapi.post_json('/v1/forecast/average', average_body(input_data=[1.0, 2.0, 3.0, 4.0]), status=200)
+    assert first.headers['ETag'].startswith('"') and not first.headers['ETag'].startswith('W/')
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+@pytest.mark.parametrize('changes', [
+    {'input_data': [1, 2, 3, 5]},
+    {'forecast_horizon': 3},
+    {'params': {'window': 3}},
+    {'fit': False},
+    {'fields': 'forecast'},
+])
+def test_etag_changes_with_the_request(webapi, changes, average_body):
+    first = webapi.post_json('/v1/forecast/average', average_body(), status=200)
+    other = webapi.post_json('/v1/forecast/average', average_body(**changes), status=200)
+    assert other.headers['ETag'] != first.headers['ETag']
+
+
+def test_etag_of_canonical_params(webapi, average_body):
+    implicit = webapi.post_json('/v1/forecast/average', average_body(), status=200)
+    explicit = webapi.post_json('/v1/forecast/average', average_body(params={'window': 2, 'kind': 'mean'}), status=200)
+    assert explicit.headers['ETag'] == implicit.headers['ETag']
+
+
+def test_not_modified_without_a_fit(webapi, container, monkeypatch, average_body):
+    etag = webapi.post_json('/v1/forecast/average', average_body(), status=200).headers['ETag']
+    monkeypatch.setattr(container('registry'), 'run', pytest.fail)
+
+    response = webapi.post_json('/v1/forecast/average', average_body(), headers={'If-None-Match': etag}, status=304)
+    assert response.headers['ETag'] == etag
+    assert response.body == b''
+
+
+def test_stale_etag_gets_the_forecast(webapi, average_body):
+    response = webapi.post_json(
+        '/v1/forecast/average', average_body(), headers={'If-None-Match': '"stale"'}, status=200
+    )
+    assert response.json['forecast'] == [3.5, 3.5]
+
+
+def test_invalid_params_have_no_etag(webapi, average_body):
+    response = webapi.post_json('/v1/forecast/average', average_body(params={'window': -1}), status=400)
+    assert 'ETag' not in response.headers
+
+
+@pytest.mark.parametrize('intervals, tagged', [
+    ({'n_paths': 50}, False),
+    ({'n_paths': 50, 'seed': 1}, True),
+    ({'method': 'analytic'}, True),
+])
+def test_etag_only_of_reproducible_intervals(webapi, intervals, tagged):
+    params = {'alpha': 0.5, 'beta': 0.1, 'initial_level': 1.0, 'initial_slope': 1.0, 'intervals': intervals}
+    body = {'input_data': [1, 2, 3, 4, 5, 6], 'forecast_horizon': 2, 'fit': False, 'params': params}
+    response = webapi.post_json('/v1/forecast/holt', body, status=200)
+    assert ('ETag' in response.headers) == tagged
+    assert 'intervals' in response.json
+
+
+def test_etag_of_canonical_fields(webapi, average_body):
+    etags = {
+        webapi.post_json('/v1/forecast/average', average_body(fields=fields), status=200).headers['ETag']
+        for fields in ['forecast,params', 'params,forecast', ['forecast', 'params', 'forecast']]
+    }
+    assert len(etags) == 1
@@ -44,3 +44,116 @@ def test_post_holt(webapi):
         },
         status=200
     )
+
+
+def test_post_average(webapi):
+
+    response = webapi.post_json(
+        '/v1/forecast/average',
+        {
+            'input_data': [1, 2, 3, 4],
+            'forecast_horizon': 3,
+            'params': {
+                'window': 2
+            }
+        },
+        headers={
+            'Content-Type': "application/json",
+        },
+        status=200
+    )
+    assert response.json == {'forecast': [3.5, 3.5, 3.5], 'params': {'window': 2, 'kind': 'mean'}}
+
+
+def test_post_unknown_method(webapi):
+
+    webapi.post_json(
+        '/v1/forecast/nomethod',
+        {
+            'input_data': [1, 2, 3, 4],
+            'forecast_horizon': 3,
+            'params': {}
+        },
+        status=501
+    )
+
+
+def test_post_auto(webapi):
+
+    response = webapi.post_json(
+        '/v1/forecast/auto',
+        {
+            'input_data': [1, 2, 3, 4, 5, 6, 7, 8],
+            'forecast_horizon': 2,
+            'params': {
+                'methods': ['average']
+            }
+        },
+        status=200
+    )
+    assert response.json['selected']['method'] == 'average'
+    assert len(response.json['forecast']) == 2
+
+
+def test_post_holtwinter_without_fit(webapi):
+    params = {
+        'alpha': 0.5,
+        'gamma': 0.5,
+        'initial_level': 2.5,
+        'seasonal': 'add',
+        'seasonal_periods': 4,
+        'initial_seasons': [-1.5, -0.5, 0.5, 1.5],
+    }
+    response = webapi.post_json(
+        '/v1/forecast/holtwinter',
+        {
+            'input_data': [1, 2, 3, 4, 1, 2, 3, 4],
+            'forecast_horizon': 6,
+            'fit': False,
+            'params': params
+        },
+        status=200
+    )
+    assert response.json['forecast'] == [1.0, 2.0, 3.0, 4.0, 1.0, 2.0]
+
+    params['initial_seasons'] = [0.0, 0.0, 0.0, 0.0]
+    response = webapi.post_json(
+        '/v1/forecast/holtwinter',
+        {'input_data': [1, 2, 3, 4, 1, 2, 3, 4], 'forecast_horizon': 6, 'fit': False, 'params': params},
+        status=200
+    )
+    assert response.json['forecast'] != [1.0, 2.0, 3.0, 4.0, 1.0, 2.0]
+
+
+def test_post_without_fit_missing_params(webapi):
+    webapi.post_json(
+        '/v1/forecast/holt',
+        {'input_data': [1, 2, 3], 'forecast_horizon': 1, 'fit': False, 'params': {'alpha': 0.5}},
+        status=400
+    )
+
+
+def test_post_without_fit_unsupported(webapi):
+    webapi.post_json(
+        '/v1/forecast/auto',
+        {'input_data': [1, 2, 3], 'forecast_horizon': 1, 'fit': False, 'params': {}},
+        status=501
+    )
+
+
+def test_post_with_timestamps(webapi):
+    response = webapi.post_json(
+        '/v1/forecast/average',
+        {
+            'input_data': [1, 2, 4],
+            'timestamps': ['2020-01-06', '2020-01-13', '2020-01-27'],
+            'frequency': 'W-MON',
+            'aggregation': 'mean',
+            'forecast_horizon': 2,
+            'params': {'window': 2}
+        },
+        status=200
+    )
+    assert response.json['forecast'] == [3.5, 3.5]
+    assert response.json['timestamps'] == ['2020-02-03T00:00:00', '2020-02-10T00:00:00']
+    assert response.json['frequency'] == 'W-MON'
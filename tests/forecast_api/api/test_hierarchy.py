@@ -0,0 +1,66 @@
+import pytest
+
+import numpy as np
+
+
+payload = {
+    'input_data': [
+        [1, 2, 3, 4, 5, 6, 7, 8],
+        [2, 2, 2, 2, 2, 2, 2, 2],
+        [5, 4, 6, 5, 4, 6, 5, 4],
+    ],
+    'hierarchy': [['north', 'a'], ['north', 'b'], ['south', 'c']],
+    'forecast_horizon': 3,
+}
+
+
+@pytest.mark.parametrize('reconciliation', ['bottom_up', 'top_down', 'ols', 'wls_struct', 'wls_var'])
+def test_post_hierarchy_is_coherent(webapi, reconciliation):
+    response = webapi.post_json(
+        '/v1/hierarchy/ses',
+        dict(payload, reconciliation=reconciliation),
+        status=200
+    )
+    nodes = {node['node']: node for node in response.json['nodes']}
+    assert list(nodes) == ['total', 'north', 'south', 'north/a', 'north/b', 'south/c']
+    forecasts = {label: np.array(node['forecast']) for label, node in nodes.items()}
+    np.testing.assert_allclose(forecasts['total'], forecasts['north'] + forecasts['south'])
+    np.testing.assert_allclose(forecasts['north'], forecasts['north/a'] + forecasts['north/b'])
+    np.testing.assert_allclose(forecasts['south'], forecasts['south/c'])
+
+    fitted = [label for label, node in nodes.items() if 'base_forecast' in node]
+    expected = {
+        'bottom_up': ['north/a', 'north/b', 'south/c'],
+        'top_down': ['total'],
+    }.get(reconciliation, list(nodes))
+    assert fitted == expected
+
+
+def test_post_hierarchy_bottom_up_keeps_leaf_forecasts(webapi):
+    response = webapi.post_json(
+        '/v1/hierarchy/average',
+        dict(payload, reconciliation='bottom_up', params={'window': 3}),
+        status=200
+    )
+    for node in response.json['nodes'][-3:]:
+        assert node['forecast'] == node['base_forecast']
+
+
+@pytest.mark.parametrize('changes', [
+    {'reconciliation': 'mint_full'},
+    {'hierarchy': [['north', 'a'], ['north', 'b']]},
+    {'input_data': [[1, 2, 3], [1, 2], [1, 2, 3]]},
+    {'params': {'alpha': 2}},
+])
+def test_post_hierarchy_invalid(webapi, changes):
+    webapi.post_json('/v1/hierarchy/ses', dict(payload, **changes), status=400)
+
+
+def test_post_hierarchy_unknown_method(webapi):
+    webapi.post_json('/v1/hierarchy/nope', payload, status=501)
+
+
+def test_post_hierarchy_wls_var_needs_an_in_sample_fit(webapi):
+    response = webapi.post_json('/v1/hierarchy/croston', dict(payload, reconciliation='wls_var'), status=400)
+    supported = response.json['description'].split('use one of ')[-1].split(', ')
+    assert 'ses' in supported and 'croston' not in supported
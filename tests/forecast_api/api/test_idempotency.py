@@ -0,0 +1,64 @@
+import pytest
+
+from forecast_api.api import panel
+
+
+CSV = b'series_id,value\na,1\na,2\na,3\nb,4\nb,5\nb,6\n'
+URL = '/v1/panel/average?forecast_horizon=1&params={"window":2}'
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def counting_forecast_panel(*args, **kwargs):
+        calls.append(args)
+        return forecast_panel(*args, **kwargs)
+
+    forecast_panel = panel.forecast_panel
+    monkeypatch.setattr(panel, 'forecast_panel', counting_forecast_panel)
+    return calls
+
+
+def _post(webapi, key, body=CSV, status=200):
+    return webapi.post(URL, body, content_type='text/csv', headers={'Idempotency-Key': key}, status=status)
+
+
+def test_retry_replays_the_response(webapi, calls):
+    first = _post(webapi, 'key-1')
+    retry = _post(webapi, 'key-1')
+    assert retry.json == first.json
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert len(calls) == 1
+
+    _post(webapi, 'key-2')
+    assert len(calls) == 2
+
+
+def test_key_reused_for_another_request(webapi, calls):
+    _post(webapi, 'key-1')
+    _post(webapi, 'key-1', CSV + b'c,7\n', status=422)
+
+
+def test_key_reused_for_another_body_of_the_same_length(webapi, calls):
+    first = _post(webapi, 'key-1')
+    other = CSV.replace(b'a,3', b'a,9')
+    assert len(other) == len(CSV)
+    _post(webapi, 'key-1', other, status=422)
+    assert len(calls) == 1
+    assert _post(webapi, 'key-1').json == first.json
+
+
+def test_failed_request_can_be_retried(webapi, calls):
+    _post(webapi, 'key-1', b'series_id,value\na,x\n', status=400)
+    _post(webapi, 'key-1', b'series_id,value\na,1\na,2\nc,3\n', status=200)
+
+
+def test_without_key_every_request_runs(webapi, calls):
+    webapi.post(URL, CSV, content_type='text/csv', status=200)
+    webapi.post(URL, CSV, content_type='text/csv', status=200)
+    assert len(calls) == 2
+
+
+def test_key_too_long(webapi):
+    _post(webapi, 'k' * 256, status=400)
@@ -0,0 +1,56 @@
+import pytest
+import webtest
+
+from forecast_api.lib.memory import MemoryBudget
+from forecast_api.lib.metrics import Metrics
+from forecast_api.wsgi import create_callable
+
+
+def _body(points):
+    return {'input_data': list(range(1, points + 1)), 'forecast_horizon': 2, 'params': {'window': 2}}
+
+
+@pytest.fixture
+def budget_webapi(container):
+    container.add_provider(
+        name='memory_budget', provider=lambda c: MemoryBudget(2**40, sampling='rss', metrics=c('metrics')), cache=True
+    )
+    return webtest.TestApp(create_callable(container))
+
+
+def test_metrics_of_sampled_requests(budget_webapi):
+    budget_webapi.post_json('/v1/forecast/average', _body(8), status=200)
+    budget_webapi.post_json('/v1/forecast/average', _body(8), status=200)
+
+    response = budget_webapi.get('/alert/metrics', status=200)
+    assert response.content_type == 'text/plain'
+    assert 'forecast_memory_peak_bytes_count{method="average"} 2' in response.text
+    assert '# TYPE process_resident_memory_bytes gauge' in response.text
+
+
+def test_post_over_memory_budget(container):
+    container.add_provider(name='memory_budget', provider=lambda c: MemoryBudget(1), cache=True)
+    webapi = webtest.TestApp(create_callable(container))
+    response = webapi.post_json('/v1/forecast/average', _body(8), status=413)
+    assert 'needs ~' in response.json['description']
+
+
+def test_render_prometheus_text():
+    metrics = Metrics()
+    metrics.increment('requests_total', method='ses')
+    metrics.increment('requests_total', 2, method='average')
+    metrics.observe('peak_bytes', 10, method='a"b')
+    metrics.observe('peak_bytes', 30, method='a"b')
+    metrics.set_gauge('rss_bytes', 1.5)
+    assert metrics.render().splitlines() == [
+        '# TYPE requests_total counter',
+        'requests_total{method="average"} 2',
+        'requests_total{method="ses"} 1',
+        '# TYPE peak_bytes summary',
+        'peak_bytes_count{method="a\\"b"} 2',
+        'peak_bytes_sum{method="a\\"b"} 40.0',
+        '# TYPE peak_bytes_max gauge',
+        'peak_bytes_max{method="a\\"b"} 30',
+        '# TYPE rss_bytes gauge',
+        'rss_bytes 1.5',
+    ]
@@ -0,0 +1,10 @@
+def test_get_openapi(webapi):
+    response = webapi.get('/v1/openapi.json', status=200)
+    document = response.json
+    assert document['openapi'].startswith('3.')
+    assert '/forecast/holtwinter' in document['paths']
+    schemas = document['components']['schemas']
+    alpha = schemas['HoltwinterParams']['properties']['alpha']
+    assert (alpha['minimum'], alpha['maximum']) == (0, 1)
+    assert schemas['AverageParams']['required'] == ['window']
+    assert schemas['HoltwinterRequest']['properties']['params'] == {'$ref': '#/components/schemas/HoltwinterParams'}
@@ -0,0 +1,45 @@
+from forecast_api.methods import MethodSpec
+
+
+def _post_csv(webapi, path, body, status):
+    return webapi.post(path, body, headers={'Content-Type': 'text/csv'}, status=status)
+
+
+def test_post_average_panel(webapi):
+    body = 'series_id,value\n' + ''.join(f'{series},{value}\n' for value in range(1, 5) for series in 'ab')
+    response = _post_csv(webapi, '/v1/panel/average?forecast_horizon=2&params={"window":2}', body, 200)
+    assert response.json['results'] == [
+        {'series_id': 'a', 'forecast': [3.5, 3.5], 'params': {'window': 2, 'kind': 'mean'}},
+        {'series_id': 'b', 'forecast': [3.5, 3.5], 'params': {'window': 2, 'kind': 'mean'}},
+    ]
+
+
+def test_post_panel_with_timestamps_and_unequal_lengths(webapi):
+    body = 'series_id,timestamp,value\na,2020-01-02,2\nb,2020-01-01,5\na,2020-01-01,1\n'
+    response = _post_csv(
+        webapi, '/v1/panel/average?forecast_horizon=1&params={"window":1}&timestamp_column=timestamp', body, 200
+    )
+    assert [result['forecast'] for result in response.json['results']] == [[2.0], [5.0]]
+
+
+def test_post_panel_bad_params(webapi):
+    _post_csv(webapi, '/v1/panel/average?forecast_horizon=1&params={"window":0}', 'series_id,value\na,1\n', 400)
+
+
+def test_post_panel_unsupported_media(webapi):
+    webapi.post_json('/v1/panel/average?forecast_horizon=1', {'input_data': [1]}, status=415)
+
+
+def test_panel_series_failing_unexpectedly(webapi, container):
+    class Picky:
+        def fit_forecast(self, input_data, forecast_horizon):
+            if input_data[0] == 5:
+                raise TypeError('unexpected series')
+            return {'forecast': [input_data[-1]] * forecast_horizon, 'params': {}}
+
+    container('registry').register(MethodSpec('picky', lambda c: Picky(), lambda c: lambda **params: params))
+    response = _post_csv(webapi, '/v1/panel/picky?forecast_horizon=1', 'series_id,value\na,1\nb,5\n', 200)
+    assert response.json['results'] == [
+        {'series_id': 'a', 'forecast': [1.0], 'params': {}},
+        {'series_id': 'b', 'error': 'unexpected series'},
+    ]
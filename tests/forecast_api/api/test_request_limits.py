@@ -0,0 +1,35 @@
+import pytest
+import webtest
+
+from forecast_api.lib.streaming import RequestLimits
+from forecast_api.wsgi import create_callable
+
+
+@pytest.fixture
+def limited_webapi(container):
+    container.add_provider(name='request_limits', provider=lambda c: RequestLimits(200, 8, 16), cache=True)
+    return webtest.TestApp(create_callable(container))
+
+
+def _body(points):
+    return {'input_data': list(range(1, points + 1)), 'forecast_horizon': 2, 'params': {'window': 2}}
+
+
+def test_post_within_limits(limited_webapi):
+    response = limited_webapi.post_json('/v1/forecast/average', _body(8), status=200)
+    assert response.json['forecast'] == [7.5, 7.5]
+
+
+def test_post_too_many_points(limited_webapi):
+    limited_webapi.post_json('/v1/forecast/average', _body(9), status=413)
+
+
+def test_post_body_too_large(limited_webapi):
+    body = dict(_body(4), padding='x' * 200)
+    limited_webapi.post_json('/v1/forecast/average', body, status=413)
+    limited_webapi.post_json('/v1/backtest/average', dict(body, initial_window=2), status=413)
+
+
+def test_post_invalid_input_data(limited_webapi):
+    limited_webapi.post('/v1/forecast/average', b'{"input_data": [1, "a"]}', content_type='application/json',
+                        status=400)
@@ -0,0 +1,62 @@
+from forecast_api.methods import holtwinter
+
+
+def test_fields_project_the_forecast(webapi, average_body):
+    response = webapi.post_json('/v1/forecast/average', average_body(fields='forecast'), status=200)
+    assert response.json == {'forecast': [3.5, 3.5]}
+
+    response = webapi.post_json('/v1/forecast/average', average_body(fields=['params.window']), status=200)
+    assert response.json == {'params': {'window': 2}}
+
+
+def test_bad_fields(webapi, average_body):
+    webapi.post_json('/v1/forecast/average', average_body(fields='params..window'), status=400)
+    webapi.post_json('/v1/forecast/average', average_body(fields={'forecast': True}), status=400)
+
+
+def test_unrequested_outputs_are_not_computed(webapi, monkeypatch, seasonal_input):
+    calls = []
+    prediction_intervals = holtwinter.prediction_intervals
+
+    def counting_prediction_intervals(*args, **kwargs):
+        calls.append(1)
+        return prediction_intervals(*args, **kwargs)
+
+    monkeypatch.setattr(holtwinter, 'prediction_intervals', counting_prediction_intervals)
+    params = {
+        'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 12, 'multistart': 2,
+        'intervals': {'levels': [80]},
+    }
+    body = {'input_data': seasonal_input, 'forecast_horizon': 3, 'params': params}
+
+    result = webapi.post_json('/v1/forecast/holtwinter', body, status=200).json
+    assert len(result['intervals']) == 1 and len(calls) == 1
+
+    result = webapi.post_json('/v1/forecast/holtwinter', dict(body, fields='forecast,params.alpha'), status=200).json
+    assert set(result) == {'forecast', 'params'} and set(result['params']) == {'alpha'}
+    assert len(calls) == 1
+
+    # diagnostics still report the fit quality, which is not a field of the response
+    body = dict(body, fields='forecast', diagnostics=True)
+    result = webapi.post_json('/v1/forecast/holtwinter', body, status=200).json
+    assert set(result) == {'forecast', 'diagnostics'}
+    assert result['diagnostics']['sse'] > 0 and 'intervals' not in result['diagnostics']['phases']
+    assert len(calls) == 1
+
+
+def test_timestamps_only_when_wanted(webapi, average_body):
+    body = average_body(timestamps=['2020-01-01', '2020-01-02', '2020-01-03', '2020-01-04'])
+    assert 'timestamps' in webapi.post_json('/v1/forecast/average', body, status=200).json
+    assert 'timestamps' not in webapi.post_json('/v1/forecast/average', dict(body, fields='forecast'), status=200).json
+
+
+def test_panel_fields(webapi):
+    body = 'series_id,value\n' + ''.join(f'{series},{value}\n' for value in range(1, 5) for series in 'ab')
+    response = webapi.post(
+        '/v1/panel/average?forecast_horizon=2&params={"window":2}&fields=forecast', body,
+        headers={'Content-Type': 'text/csv'}, status=200,
+    )
+    assert response.json['results'] == [
+        {'series_id': 'a', 'forecast': [3.5, 3.5]},
+        {'series_id': 'b', 'forecast': [3.5, 3.5]},
+    ]
@@ -0,0 +1,39 @@
+def test_post_holtwinter_scenarios(webapi):
+    response = webapi.post_json(
+        '/v1/scenarios/holtwinter',
+        {
+            'input_data': [1, 2, 3, 4, 1, 2, 3, 4, 1, 2, 3, 4],
+            'forecast_horizon': 4,
+            'scenarios': {'alpha': [0.1, 0.5, 0.9], 'beta': [0.1], 'gamma': [0.0, 0.5]},
+            'sse': True,
+            'params': {
+                'trend': 'add',
+                'seasonal': 'add',
+                'seasonal_periods': 4,
+                'initial_level': 2.5,
+                'initial_slope': 0.0,
+                'initial_seasons': [-1.5, -0.5, 0.5, 1.5],
+            }
+        },
+        status=200
+    )
+    assert len(response.json['scenarios']) == 6
+    assert len(response.json['sse']) == 6
+    # a perfectly seasonal series is forecast exactly whatever the coefficients
+    assert response.json['forecast'] == [[1.0, 2.0, 3.0, 4.0]] * 6
+
+
+def test_post_scenarios_not_fully_specified(webapi):
+    webapi.post_json(
+        '/v1/scenarios/holt',
+        {'input_data': [1, 2, 3], 'forecast_horizon': 1, 'scenarios': [{'alpha': 0.5}]},
+        status=400
+    )
+
+
+def test_post_scenarios_unsupported_method(webapi):
+    webapi.post_json(
+        '/v1/scenarios/average',
+        {'input_data': [1, 2, 3], 'forecast_horizon': 1, 'scenarios': [{'alpha': 0.5}]},
+        status=501
+    )
@@ -0,0 +1,52 @@
+import pytest
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.fields import parse_fields_param
+from forecast_api.lib.fields import projected
+from forecast_api.lib.fields import wanted
+
+
+RESULT = {
+    'forecast': [1.0, 2.0],
+    'params': {'alpha': 0.5, 'beta': 0.1},
+    'intervals': [{'level': 80, 'lower': [0.5], 'upper': [1.5]}, {'level': 95, 'lower': [0.1], 'upper': [1.9]}],
+}
+
+
+def test_parse_fields_param():
+    assert parse_fields_param('fields', None) is None
+    assert str(parse_fields_param('fields', 'params.alpha, forecast')) == 'forecast,params.alpha'
+    assert str(parse_fields_param('fields', ['forecast'])) == 'forecast'
+
+
+@pytest.mark.parametrize('value', ['', 'forecast,', 'params..alpha', 'params.1', [], [1], 3])
+def test_parse_bad_fields_param(value):
+    with pytest.raises(InvalidParameter):
+        parse_fields_param('fields', value)
+
+
+def test_project():
+    fields = parse_fields_param('fields', 'forecast,params.alpha,intervals.level,missing')
+    assert fields.project(RESULT) == {
+        'forecast': [1.0, 2.0],
+        'params': {'alpha': 0.5},
+        'intervals': [{'level': 80}, {'level': 95}],
+    }
+    # a path keeps all below it, longer ones under it change nothing
+    assert parse_fields_param('fields', 'params,params.alpha').project(RESULT) == {'params': RESULT['params']}
+
+
+def test_wants():
+    fields = parse_fields_param('fields', 'params.alpha,intervals')
+    assert fields.wants('params') and fields.wants('params.alpha') and fields.wants('intervals.level')
+    assert not fields.wants('forecast') and not fields.wants('params.beta')
+    assert fields.with_paths('forecast').wants('forecast')
+
+
+def test_projected_lets_the_call_know_what_is_wanted():
+    def _call():
+        return {'forecast': [1.0], 'intervals': 'computed' if wanted('intervals') else None}
+
+    assert wanted('intervals')
+    assert projected(parse_fields_param('fields', 'forecast'), _call) == {'forecast': [1.0]}
+    assert projected(parse_fields_param('fields', 'intervals'), _call) == {'intervals': 'computed'}
@@ -0,0 +1,78 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.hierarchy import (
+    hierarchy_from_paths,
+    parse_hierarchy_param,
+    reconcile_top_down,
+    reconcile_wls,
+    top_down_proportions,
+)
+
+
+paths = [['north', 'food', 'a'], ['north', 'food', 'b'], ['north', 'toys', 'c'], ['south', 'food', 'd']]
+
+
+@pytest.fixture
+def hierarchy():
+    return hierarchy_from_paths(parse_hierarchy_param('hierarchy', paths))
+
+
+def test_summing_matrix(hierarchy):
+    assert hierarchy.labels.tolist() == [
+        'total', 'north', 'south', 'north/food', 'north/toys', 'south/food',
+        'north/food/a', 'north/food/b', 'north/toys/c', 'south/food/d',
+    ]
+    assert hierarchy.levels.tolist() == [0, 1, 1, 2, 2, 2, 3, 3, 3, 3]
+    np.testing.assert_array_equal(hierarchy.summing_matrix.toarray(), [
+        [1, 1, 1, 1],
+        [1, 1, 1, 0],
+        [0, 0, 0, 1],
+        [1, 1, 0, 0],
+        [0, 0, 1, 0],
+        [0, 0, 0, 1],
+        [1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 1, 0],
+        [0, 0, 0, 1],
+    ])
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_wls_matches_dense_mint(hierarchy, weighted):
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(len(hierarchy), 3))
+    weights = rng.uniform(0.5, 2.0, len(hierarchy)) if weighted else np.ones(len(hierarchy))
+    summing = hierarchy.summing_matrix.toarray()
+    inverse = np.diag(1 / weights)
+    expected = summing @ np.linalg.solve(summing.T @ inverse @ summing, summing.T @ inverse @ base)
+
+    reconciled = reconcile_wls(hierarchy, base, weights if weighted else None)
+    np.testing.assert_allclose(reconciled, expected, atol=1e-12)
+    np.testing.assert_allclose(reconciled[0], reconciled[-4:].sum(axis=0))
+
+
+def test_wls_keeps_coherent_forecasts(hierarchy):
+    coherent = hierarchy.aggregate(np.arange(8.0).reshape(4, 2))
+    np.testing.assert_allclose(reconcile_wls(hierarchy, coherent), coherent)
+
+
+def test_top_down(hierarchy):
+    proportions = top_down_proportions(np.array([[1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [4.0, 4.0]]))
+    np.testing.assert_allclose(proportions, [0.1, 0.2, 0.3, 0.4])
+    reconciled = reconcile_top_down(hierarchy, np.array([10.0, 20.0]), proportions)
+    np.testing.assert_allclose(reconciled[0], [10.0, 20.0])
+    np.testing.assert_allclose(reconciled[1], [6.0, 12.0])
+
+
+@pytest.mark.parametrize('value', [
+    [],
+    'north',
+    [['north', 'a'], ['north']],
+    [['north', 'a'], ['north', 'a']],
+])
+def test_invalid_hierarchy(value):
+    with pytest.raises(InvalidParameter):
+        hierarchy_from_paths(parse_hierarchy_param('hierarchy', value))
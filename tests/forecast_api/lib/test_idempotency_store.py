@@ -0,0 +1,74 @@
+import threading
+import pytest
+
+from forecast_api.lib.exceptions import IdempotencyKeyInProgress
+from forecast_api.lib.exceptions import IdempotencyKeyReused
+from forecast_api.lib.idempotency import IdempotencyStore
+from forecast_api.lib.idempotency import StoredResponse
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+RESPONSE = StoredResponse('200 OK', {'results': []})
+
+
+def test_begin_complete_replay():
+    store = IdempotencyStore()
+    assert store.begin(('/v1/panel', 'k'), 'request') is None
+    store.complete(('/v1/panel', 'k'), RESPONSE)
+    assert store.begin(('/v1/panel', 'k'), 'request') is RESPONSE
+    # keys are scoped
+    assert store.begin(('/v1/backtest', 'k'), 'request') is None
+
+
+def test_reused_key():
+    store = IdempotencyStore()
+    store.begin(('/', 'k'), 'request')
+    with pytest.raises(IdempotencyKeyReused):
+        store.begin(('/', 'k'), 'other request')
+
+
+def test_retry_waits_for_the_running_request():
+    store = IdempotencyStore()
+    store.begin(('/', 'k'), 'request')
+    replayed = []
+    retry = threading.Thread(target=lambda: replayed.append(store.begin(('/', 'k'), 'request')))
+    retry.start()
+    store.complete(('/', 'k'), RESPONSE)
+    retry.join(5)
+    assert replayed == [RESPONSE]
+
+
+def test_retry_gives_up_waiting():
+    store = IdempotencyStore(wait_seconds=0)
+    store.begin(('/', 'k'), 'request')
+    with pytest.raises(IdempotencyKeyInProgress):
+        store.begin(('/', 'k'), 'request')
+
+
+def test_released_key_runs_again():
+    store = IdempotencyStore()
+    store.begin(('/', 'k'), 'request')
+    store.release(('/', 'k'))
+    assert store.begin(('/', 'k'), 'request') is None
+
+
+def test_expiry_and_eviction():
+    clock = Clock()
+    store = IdempotencyStore(ttl_seconds=10, max_entries=2, clock=clock)
+    for key in 'abc':
+        store.begin(('/', key), 'request')
+        store.complete(('/', key), RESPONSE)
+    assert len(store) == 2
+    assert store.begin(('/', 'a'), 'request') is None
+
+    clock.now = 11
+    assert store.begin(('/', 'd'), 'request') is None
+    assert len(store) == 1
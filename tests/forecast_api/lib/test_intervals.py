@@ -0,0 +1,65 @@
+import pytest
+
+import numpy as np
+
+from statistics import NormalDist
+
+from forecast_api.lib.exceptions import InvalidIntervalsParameter
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.intervals import parse_intervals_param
+from forecast_api.lib.intervals import prediction_intervals
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+
+random_walk = np.cumsum(np.random.default_rng(0).standard_normal(200))
+
+
+def _intervals(method, model, coefficients, initial, **kwargs):
+    state = model.initial_state(*initial)
+    final_state, _ = model.filter(random_walk, state, **coefficients)
+    forecast = model.forecast(final_state, 6, coefficients.get('phi', 1.0))
+    intervals = parse_intervals_param('intervals', dict(method=method, **kwargs))
+    return forecast, prediction_intervals(model, state, coefficients, random_walk, forecast, intervals)
+
+
+def test_parse_defaults():
+    assert parse_intervals_param('intervals', {}) == {
+        'levels': [80.0, 95.0], 'method': 'simulate', 'n_paths': 1000, 'chunk_size': 10000, 'seed': None,
+    }
+
+
+@pytest.mark.parametrize('value', [
+    [], {'levels': 95}, {'levels': [100]}, {'levels': [0]}, {'n_paths': 0}, {'method': 'bootstrap'}, {'paths': 10},
+])
+def test_parse_invalid(value):
+    with pytest.raises(InvalidParameter):
+        parse_intervals_param('intervals', value)
+
+
+def test_analytic_random_walk():
+    # with alpha = 1 the k-step forecast error is the sum of k innovations
+    model = ExponentialSmoothing()
+    forecast, (interval,) = _intervals('analytic', model, {'alpha': 1.0}, (0.0,), levels=[95])
+    sigma = np.sqrt(np.mean(np.diff(random_walk, prepend=0.0)**2))
+    expected = NormalDist().inv_cdf(0.975) * sigma * np.sqrt(np.arange(1, 7))
+    np.testing.assert_allclose(np.array(interval['upper']) - forecast, expected)
+    np.testing.assert_allclose(forecast - np.array(interval['lower']), expected)
+
+
+@pytest.mark.parametrize('spec, coefficients, initial', [
+    ((None, False, None, None), {'alpha': 0.5}, (0.0,)),
+    (('add', True, 'add', 4), {'alpha': 0.5, 'beta': 0.2, 'gamma': 0.1, 'phi': 0.9}, (0.0, 0.0, [0, 0, 0, 0])),
+])
+def test_simulated_matches_analytic(spec, coefficients, initial):
+    model = ExponentialSmoothing(*spec)
+    _, analytic = _intervals('analytic', model, coefficients, initial)
+    _, simulated = _intervals('simulate', model, coefficients, initial, n_paths=40000, chunk_size=10000, seed=1)
+    for expected, interval in zip(analytic, simulated):
+        np.testing.assert_allclose(interval['lower'], expected['lower'], rtol=0.05, atol=0.1)
+        np.testing.assert_allclose(interval['upper'], expected['upper'], rtol=0.05, atol=0.1)
+
+
+def test_analytic_rejects_multiplicative_models():
+    model = ExponentialSmoothing('mul')
+    with pytest.raises(InvalidIntervalsParameter):
+        _intervals('analytic', model, {'alpha': 0.5, 'beta': 0.1}, (10.0, 1.0))
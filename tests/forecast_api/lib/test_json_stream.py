@@ -0,0 +1,80 @@
+import io
+import json
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.streaming import FloatBuffer
+from forecast_api.lib.streaming import parse_json_stream
+
+
+def _parse(media, chunk_size=3, **limits):
+    body = media if isinstance(media, bytes) else json.dumps(media).encode()
+    return parse_json_stream(io.BytesIO(body), chunk_size=chunk_size, **limits)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 64])
+def test_input_data_is_streamed_into_an_array(chunk_size):
+    media = {
+        'params': {'input_data': [1], 'name': 'say "input_data": [2]'},
+        'input_data': [1, 2.5, -3e-2, 1234567.125, 0],
+        'forecast_horizon': 3,
+    }
+    parsed = _parse(media, chunk_size)
+    assert isinstance(parsed['input_data'], np.ndarray)
+    assert parsed['input_data'].tolist() == media['input_data']
+    assert {key: value for key, value in parsed.items() if key != 'input_data'} == \
+        {key: value for key, value in media.items() if key != 'input_data'}
+
+
+@pytest.mark.parametrize('input_data', [
+    [[1, 2], [3, 4]],
+    {'length': 5, 'index': [1, 3], 'values': [2, 1]},
+    None,
+])
+def test_other_input_data_is_left_to_json(input_data):
+    assert _parse({'input_data': input_data, 'forecast_horizon': 1})['input_data'] == input_data
+
+
+def test_empty_input_data():
+    assert _parse({'input_data': []})['input_data'].tolist() == []
+
+
+@pytest.mark.parametrize('body', [
+    b'{"input_data": [1, 2,]}',
+    b'{"input_data": [1,, 2]}',
+    b'{"input_data": [1, "2"]}',
+    b'{"input_data": [1, null]}',
+    b'{"input_data": [1, 2',
+    b'{"input_data": [1, 2]',
+    b'[1, 2]',
+])
+def test_invalid_body(body):
+    with pytest.raises(ValueError):
+        _parse(body)
+
+
+@pytest.mark.parametrize('indent', [None, 2, 30, 100])
+def test_pretty_printed_bodies_with_any_chunk_size(indent):
+    media = {'input_data': [1, -2.5, 3e4, 0.125], 'forecast_horizon': 2}
+    body = json.dumps(media, indent=indent).encode()
+    for chunk_size in range(1, len(body) + 1):
+        assert _parse(body, chunk_size)['input_data'].tolist() == media['input_data']
+    assert _parse(b'{"input_data": [1,' + b' ' * 70 + b'2 ' + b' ' * 70 + b', 3]}', 8)['input_data'].tolist() == \
+        [1, 2, 3]
+
+
+def test_limits():
+    with pytest.raises(PayloadTooLarge):
+        _parse({'input_data': list(range(10))}, max_points=9)
+    with pytest.raises(PayloadTooLarge):
+        _parse({'input_data': list(range(10))}, max_bytes=20)
+    assert len(_parse({'input_data': list(range(10))}, max_points=10, max_bytes=100)['input_data']) == 10
+
+
+def test_float_buffer_grows():
+    buffer = FloatBuffer(capacity=2)
+    for start in range(0, 100, 7):
+        buffer.extend(np.arange(start, min(start + 7, 100), dtype=float))
+    assert buffer.array().tolist() == list(range(100))
@@ -0,0 +1,137 @@
+import numpy as np
+import pickle
+import pytest
+import threading
+import time
+
+from forecast_api.lib import memory
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.memory import MemoryBudget
+from forecast_api.lib.memory import input_length
+from forecast_api.lib.memory import sample_memory
+from forecast_api.lib.metrics import Metrics
+from forecast_api.lib.pools import POOL_INLINE
+from forecast_api.lib.pools import POOL_PROCESSES
+from forecast_api.methods import MethodSpec
+
+
+@pytest.fixture
+def spec():
+    return MethodSpec('average', None, None, memory_per_point=100, memory_overhead=1000)
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    monkeypatch.setattr(memory, 'rss_bytes', lambda: 10000)
+
+
+def test_tracemalloc_sample_sees_the_allocation():
+    with sample_memory('tracemalloc') as sample:
+        block = np.ones(10**6)
+        del block
+    assert 8 * 10**6 <= sample.peak_bytes < 9 * 10**6
+
+
+def test_concurrent_tracemalloc_samples_do_not_reset_each_other():
+    allocated = threading.Event()
+    samples = {}
+
+    def _first():
+        with sample_memory('tracemalloc') as samples['first']:
+            block = np.ones(10**6)
+            del block
+            allocated.set()
+            time.sleep(0.2)
+
+    def _second():
+        allocated.wait(5)
+        with sample_memory('tracemalloc') as samples['second']:
+            np.ones(10)
+
+    threads = [threading.Thread(target=_first), threading.Thread(target=_second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert samples['first'].peak_bytes >= 8 * 10**6
+    assert samples['second'].peak_bytes < 10**6
+
+
+def test_sampling_off_measures_nothing():
+    with sample_memory('off') as sample:
+        np.ones(10**5)
+    assert sample.as_dict() == {'mode': 'off', 'peak_bytes': 0, 'rss_delta_bytes': 0}
+
+
+def test_unknown_sampling_mode():
+    with pytest.raises(ValueError):
+        with sample_memory('valgrind'):
+            pass
+
+
+@pytest.mark.parametrize('input_data, length', [
+    ([1, 2, 3], 3),
+    (np.zeros(5), 5),
+    ({'length': 7, 'index': [1], 'values': [2]}, 7),
+    ({'length': 'seven'}, 0),
+    (None, 0),
+])
+def test_input_length(input_data, length):
+    assert input_length(input_data) == length
+
+
+def test_without_budget_every_request_is_admitted(spec):
+    assert MemoryBudget().admit(spec, 10**9) == POOL_INLINE
+
+
+def test_admitted_within_budget(spec, rss):
+    assert MemoryBudget(10000 + 1000 + 100 * 50).admit(spec, 50) == POOL_INLINE
+
+
+def test_rejected_over_budget(spec, rss):
+    metrics = Metrics()
+    with pytest.raises(PayloadTooLarge, match='average on 51 points needs ~6100 bytes'):
+        MemoryBudget(16000, metrics=metrics).admit(spec, 51)
+    assert metrics.counter('forecast_memory_rejected_total', method='average') == 1
+
+
+def test_rerouted_over_budget(spec, rss):
+    metrics = Metrics()
+    budget = MemoryBudget(16000, over_budget='reroute', metrics=metrics)
+    assert budget.admit(spec, 51) == POOL_PROCESSES
+    assert metrics.counter('forecast_memory_rerouted_total', method='average') == 1
+    # too large for any worker, or an engine that cannot be sent to a process
+    with pytest.raises(PayloadTooLarge):
+        budget.admit(spec, 200)
+    with pytest.raises(PayloadTooLarge):
+        budget.admit(spec, 51, can_reroute=False)
+
+
+def test_sample_records_metrics(spec):
+    metrics = Metrics()
+    with MemoryBudget(sampling='tracemalloc', metrics=metrics).sample(spec, 10**5, POOL_INLINE):
+        np.ones(10**5)
+    count, total, maximum = metrics.summary('forecast_memory_peak_bytes', method='average')
+    assert count == 1 and total == maximum >= 8 * 10**5
+
+
+def test_fits_in_process_pools_are_not_sampled(spec):
+    metrics = Metrics()
+    with MemoryBudget(sampling='rss', metrics=metrics).sample(spec, 10**5, POOL_PROCESSES) as sample:
+        assert sample is None
+    assert metrics.summary('forecast_memory_peak_bytes', method='average') is None
+
+
+def test_invalid_budget_config():
+    with pytest.raises(ValueError):
+        MemoryBudget(over_budget='swap')
+
+
+def test_engines_can_be_sent_to_process_pools(container):
+    registry = container('registry')
+    engine = pickle.loads(pickle.dumps(registry.engine('holt')))
+    assert engine._parse_params(exponential=False) == registry.parse_params('holt', exponential=False)
+    assert registry.can_run_in('ses', POOL_PROCESSES)
+    # auto fits its candidates through the worker's own registry
+    assert not registry.can_run_in('auto', POOL_PROCESSES)
+    assert registry.can_run_in('auto', POOL_INLINE)
@@ -0,0 +1,60 @@
+import pytest
+
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast_api.lib.multistart import halton
+from forecast_api.lib.multistart import multistart_minimize
+
+
+def _wells(points):
+    # a shallow minimum near 0.17 next to the start, the deepest one near 0.83
+    x = np.asarray(points)[:, 0]
+    return (x - 0.1) ** 2 * (x - 0.8) ** 2 - 0.05 * x
+
+
+def test_halton_points():
+    points = halton(8, 2)
+    assert points.shape == (8, 2)
+    assert np.all((points >= 0) & (points < 1))
+    assert list(points[:4, 0]) == [0.5, 0.25, 0.75, 0.125]
+    assert points[:3, 1] == pytest.approx([1 / 3, 2 / 3, 1 / 9])
+    # low discrepancy: each quarter of the first axis gets four of the first 16 points
+    assert sorted(np.floor(halton(16, 1)[:, 0] * 4)) == sorted([0, 1, 2, 3] * 4)
+
+
+def test_halton_dimensions_are_limited():
+    with pytest.raises(ValueError):
+        halton(4, 17)
+
+
+def test_single_start_stays_in_the_local_minimum():
+    result = multistart_minimize(_wells, [0.0], [(0.0, 1.0)], 1, starts=0)
+    assert result.x[0] == pytest.approx(0.17, abs=0.02)
+    assert result.screened == result.refined == 1
+
+
+@pytest.mark.parametrize('executor', [None, ThreadPoolExecutor(2)])
+def test_multistart_escapes_the_local_minimum(executor):
+    result = multistart_minimize(_wells, [0.0], [(0.0, 1.0)], 1, starts=16, executor=executor)
+    assert result.x[0] == pytest.approx(0.83, abs=0.02)
+    assert result.fun == min(result.objectives)
+    assert result.screened == 17
+    assert len(result.objectives) == result.refined
+
+
+def test_multistart_stops_early_once_no_round_improves():
+    result = multistart_minimize(_wells, [0.0], [(0.0, 1.0)], 1, starts=64, parallelism=2, patience=2)
+    assert result.stopped_early
+    assert result.refined < result.screened
+    assert result.x[0] == pytest.approx(0.83, abs=0.02)
+
+
+def test_infeasible_starts_are_ranked_last():
+    def _objective(points):
+        x = np.asarray(points)[:, 0]
+        return np.where(x < 0.5, np.nan, (x - 0.7) ** 2)
+
+    result = multistart_minimize(_objective, [0.0], [(0.0, 1.0)], 1, starts=8)
+    assert result.x[0] == pytest.approx(0.7, abs=1e-3)
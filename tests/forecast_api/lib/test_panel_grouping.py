@@ -0,0 +1,30 @@
+import io
+
+import numpy as np
+
+from forecast_api.lib.panel import (
+    panel_from_columns,
+    read_panel_csv,
+)
+
+
+def test_groups_by_series_and_timestamp():
+    panel = panel_from_columns(['b', 'a', 'b', 'a', 'c'], [1.0, 2.0, 3.0, 4.0, 5.0], timestamps=[2, 2, 1, 1, 1])
+    assert list(panel.series_ids) == ['a', 'b', 'c']
+    assert [list(values) for _, values in panel] == [[4.0, 2.0], [3.0, 1.0], [5.0]]
+
+
+def test_series_are_views_of_one_array():
+    panel = panel_from_columns([1, 1, 2, 2], [1.0, 2.0, 3.0, 4.0])
+    assert all(np.shares_memory(values, panel.values) for _, values in panel)
+    assert np.shares_memory(panel.matrix(), panel.values)
+    assert panel.matrix().tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_unequal_lengths_have_no_matrix():
+    assert panel_from_columns(['a', 'a', 'b'], [1.0, 2.0, 3.0]).matrix() is None
+
+
+def test_read_csv_keeps_series_ids_as_strings():
+    panel = read_panel_csv(io.StringIO('series_id,value\n007,1\n007,2\n10,3\n'))
+    assert list(panel.series_ids) == ['007', '10']
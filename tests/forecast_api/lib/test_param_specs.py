@@ -0,0 +1,103 @@
+import pytest
+import re
+
+from forecast_api.lib.exceptions import (
+    InvalidNumericParameter,
+    InvalidParameter,
+    InvalidSeasonalParameters,
+    InvalidTrendParameters,
+)
+from forecast_api.lib.params import (
+    Field,
+    ParamSpec,
+    Rule,
+    parse_params_batch,
+)
+from forecast_api.methods.holtwinter import parse_params as holtwinter_parse_params
+
+
+spec = ParamSpec(
+    [
+        Field('alpha', 'number', minimum=0, maximum=1),
+        Field('window', 'integer', minimum=1, literals=['auto'], allow_list=True, default='auto'),
+        Field('damped', 'boolean', default=False),
+        Field('trend', 'string', choices=['add', 'mul']),
+    ],
+    rules=[
+        Rule(lambda p: p['damped'] and not p['trend'], InvalidTrendParameters, 'trend must be provided if damped'),
+    ],
+    derive=lambda p: {'to_fit': p['alpha'] is None},
+)
+parse_params = spec.compile()
+
+
+def test_compiled_parse():
+    assert parse_params(alpha=1, window=[2, 3]) == {
+        'alpha': 1.0, 'window': [2, 3], 'damped': False, 'trend': None, 'to_fit': False,
+    }
+    assert parse_params()['window'] == 'auto'
+    with pytest.raises(InvalidNumericParameter):
+        parse_params(alpha=2)
+    with pytest.raises(InvalidParameter):
+        parse_params(window='always')
+    with pytest.raises(InvalidTrendParameters):
+        parse_params(damped=True)
+
+
+def test_batch_reports_every_error():
+    param_sets = [
+        {'alpha': 0.5},
+        {'alpha': 1.5, 'window': 0},
+        {'alpha': 'high'},
+        {'damped': True},
+        {'alpha': True},
+    ]
+    results, errors = parse_params.batch(param_sets)
+    assert results[0] == parse_params(alpha=0.5)
+    assert results[1:] == [None] * 4
+    assert [index for index, _ in errors] == [1, 1, 2, 3, 4]
+    assert all(isinstance(error, InvalidParameter) for _, error in errors)
+    # the errors are those of the one set parser
+    with pytest.raises(InvalidParameter, match=re.escape(str(errors[0][1]))):
+        parse_params(alpha=1.5)
+
+
+def test_batch_matches_holtwinter_parse_params():
+    param_sets = [
+        {'alpha': alpha, 'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 4, 'gamma': gamma}
+        for alpha in (0.0, 0.5, 1.0) for gamma in (0.1, 0.9)
+    ]
+    results, errors = holtwinter_parse_params.batch(param_sets)
+    assert errors == []
+    assert results == [holtwinter_parse_params(**params) for params in param_sets]
+
+    results, errors = holtwinter_parse_params.batch([{'seasonal': 'add'}, {'initial_seasons': [1, 2]}])
+    assert results == [None, None]
+    assert [type(error) for _, error in errors] == [InvalidSeasonalParameters] * 2
+
+
+def test_batch_of_hand_written_parser():
+    def hand_written(**params):
+        if params.get('window', 1) < 1:
+            raise InvalidParameter('window should be >= 1')
+        return params
+
+    results, errors = parse_params_batch(hand_written, [{'window': 2}, {'window': 0}])
+    assert results == [{'window': 2}, None]
+    assert [index for index, _ in errors] == [1]
+
+
+def test_openapi():
+    schema = spec.openapi()
+    assert schema['type'] == 'object'
+    assert schema['properties']['alpha'] == {'type': 'number', 'minimum': 0, 'maximum': 1}
+    assert schema['properties']['window'] == {
+        'oneOf': [
+            {'type': 'integer', 'minimum': 1},
+            {'type': 'array', 'items': {'type': 'integer', 'minimum': 1}, 'minItems': 1},
+            {'type': 'string', 'enum': ['auto']},
+        ],
+        'default': 'auto',
+    }
+    assert schema['properties']['trend'] == {'type': 'string', 'enum': ['add', 'mul']}
+    assert 'required' not in schema
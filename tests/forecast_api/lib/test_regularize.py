@@ -0,0 +1,42 @@
+import pytest
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.regularize import (
+    future_timestamps,
+    regularize,
+)
+
+
+timestamps = ['2020-01-01T00:00', '2020-01-01T12:00', '2020-01-03T00:00', '2020-01-06T00:00', '2020-01-04T00:00']
+
+
+def test_sum_fills_gaps_with_zero():
+    regular = regularize([1, 2, 3, 4, 5], timestamps, 'D')
+    assert regular.values.tolist() == [3, 0, 3, 5, 0, 4]
+    assert future_timestamps(regular, 2) == ['2020-01-07T00:00:00', '2020-01-08T00:00:00']
+
+
+@pytest.mark.parametrize('aggregation, fill, expected', [
+    ('mean', None, [1.5, 2.25, 3, 5, 4.5, 4]),
+    ('last', 'previous', [2, 2, 3, 5, 5, 4]),
+    ('sum', 'interpolate', [3, 3, 3, 5, 4.5, 4]),
+])
+def test_aggregation_and_fill(aggregation, fill, expected):
+    assert regularize([1, 2, 3, 4, 5], timestamps, 'D', aggregation, fill).values.tolist() == expected
+
+
+def test_frequency_is_inferred_from_smallest_spacing():
+    regular = regularize([1, 2, 4], ['2020-01-01', '2020-01-02', '2020-01-04'], aggregation='mean')
+    assert regular.values.tolist() == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'timestamps': ['2020-01-01']},
+    {'timestamps': ['2020-01-01', 'not a date']},
+    {'timestamps': ['2020-01-01', '2020-01-02', '2020-01-03']},
+    {'timestamps': ['2020-01-01', '2020-01-02'], 'frequency': 'fortnightly'},
+    {'timestamps': ['2020-01-01', '2020-01-02'], 'aggregation': 'median'},
+])
+def test_invalid(kwargs):
+    with pytest.raises(InvalidParameter):
+        regularize([1, 2], **kwargs)
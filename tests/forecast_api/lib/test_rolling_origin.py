@@ -0,0 +1,33 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.backtest import fold_cutoffs
+from forecast_api.lib.backtest import score_folds
+from forecast_api.lib.exceptions import InvalidBacktestParameter
+
+
+def test_fold_cutoffs():
+    assert fold_cutoffs(10, 2, 5, 2) == [5, 7]
+    assert fold_cutoffs(10, 1, 8) == [8, 9]
+
+
+def test_fold_cutoffs_too_short():
+    with pytest.raises(InvalidBacktestParameter):
+        fold_cutoffs(10, 3, 9)
+
+
+def test_score_folds():
+    input_array = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    scores = score_folds(input_array, [3, 4], [np.array([3.0, 3.0]), np.array([4.0, 4.0])], 2)
+    first, second = scores['folds']
+    assert (first['mae'], first['rmse']) == (1.5, pytest.approx(np.sqrt(2.5)))
+    assert first['mase'] == 1.5
+    assert second['mape'] == pytest.approx(100 * (1 / 5 + 2 / 6) / 2)
+    assert scores['aggregate']['mae'] == 1.5
+
+
+def test_undefined_scores_are_none():
+    scores = score_folds(np.array([0.0, 0.0, 0.0, 0.0]), [2], [np.array([0.0, 0.0])], 2)
+    assert scores['folds'][0]['mape'] is None
+    assert scores['aggregate']['mase'] is None
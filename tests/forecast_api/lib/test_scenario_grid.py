@@ -0,0 +1,52 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import (
+    InvalidParameter,
+    InvalidScenariosParameter,
+)
+from forecast_api.lib.scenarios import parse_scenarios_param
+from forecast_api.methods.holt import parse_params
+from forecast_api.methods.holt import smoothing_model
+
+
+input_array = 10 + np.arange(30) * 0.5 + np.sin(np.arange(30))
+initial_state = {'initial_level': 10.0, 'initial_slope': 0.5}
+
+
+def test_grid_is_every_combination():
+    scenarios = parse_scenarios_param('scenarios', {'alpha': [0.1, 0.5], 'beta': [0.1, 0.2, 0.3]})
+    assert len(scenarios) == 6
+    assert {'alpha': 0.5, 'beta': 0.3} in scenarios
+
+
+@pytest.mark.parametrize('scenarios', [[], {}, {'alpha': []}, 'string', [{'trend': 'add'}], {'window': [1]}, [1]])
+def test_invalid_scenarios(scenarios):
+    with pytest.raises(InvalidParameter):
+        parse_scenarios_param('scenarios', scenarios)
+
+
+def test_scenarios_match_single_forecasts(container):
+    holt = container('services.methods.holt')
+    grid = {'alpha': [0.2, 0.8], 'beta': [0.0, 0.3]}
+    result = holt.scenarios(input_array, 4, grid, sse=True, **initial_state)
+
+    assert result['forecast'].shape == (4, 4)
+    for scenario, forecast, sse in zip(result['scenarios'], result['forecast'], result['sse']):
+        model, state, coefficients = smoothing_model(parse_params(**dict(initial_state, **scenario)))
+        state, predictions = model.filter(input_array, state, **coefficients)
+        np.testing.assert_allclose(forecast, model.forecast(state, 4))
+        np.testing.assert_allclose(sse, np.sum((input_array - predictions)**2))
+
+
+def test_scenarios_must_be_fully_specified(container):
+    holt = container('services.methods.holt')
+    with pytest.raises(InvalidScenariosParameter):
+        holt.scenarios(input_array, 4, [{'alpha': 0.5}], **initial_state)
+
+
+def test_invalid_scenario_value(container):
+    holt = container('services.methods.holt')
+    with pytest.raises(InvalidScenariosParameter, match=r'scenarios\[1\]'):
+        holt.scenarios(input_array, 4, [{'alpha': 0.5, 'beta': 0.1}, {'alpha': 1.5, 'beta': 0.1}], **initial_state)
@@ -0,0 +1,46 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.seasonality import (
+    autocorrelation,
+    detect_seasonal_periods,
+    detect_seasonal_periods_batch,
+)
+
+
+def _seasonal(length, period, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(length)
+    return np.sin(2 * np.pi * time / period) + 0.1 * rng.standard_normal(length) + 0.01 * time
+
+
+def test_autocorrelation_matches_direct_computation():
+    series = np.random.default_rng(1).standard_normal(50)
+    time = np.arange(50) - 24.5
+    residuals = series - series.mean() - (series @ time / (time @ time)) * time
+    expected = [
+        (residuals[lag:] @ residuals[:50 - lag] / (50 - lag)) / (residuals @ residuals / 50) for lag in range(10)
+    ]
+    np.testing.assert_allclose(autocorrelation(series, max_lag=9)[0], expected)
+
+
+@pytest.mark.parametrize('period', [4, 7, 12, 24])
+def test_detects_period(period):
+    assert detect_seasonal_periods(_seasonal(10 * period, period)) == [period]
+
+
+def test_detects_two_periods():
+    time = np.arange(24 * 7 * 6)
+    series = np.sin(2 * np.pi * time / 24) + 0.8 * np.sin(2 * np.pi * time / 168)
+    assert sorted(detect_seasonal_periods(series, max_periods=2)) == [24, 168]
+
+
+def test_no_period_in_noise_or_short_series():
+    assert detect_seasonal_periods(np.random.default_rng(2).standard_normal(60)) == []
+    assert detect_seasonal_periods([1.0, 2.0, 3.0]) == []
+
+
+def test_batch():
+    batch = np.vstack([_seasonal(84, 7), _seasonal(84, 12), np.zeros(84)])
+    assert detect_seasonal_periods_batch(batch) == [[7], [12], []]
@@ -0,0 +1,79 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+
+series = 10 + np.sin(np.arange(40) * np.pi / 2) + 0.1 * np.arange(40)
+models = [
+    ((None, False, None, None), {'alpha': 0.3}, (10.0, None, None)),
+    (('add', False, None, None), {'alpha': 0.3, 'beta': 0.1}, (10.0, 0.1, None)),
+    (('add', True, 'add', 4), {'alpha': 0.3, 'beta': 0.1, 'gamma': 0.2, 'phi': 0.9}, (10.0, 0.1, [1, 0, -1, 0])),
+    (('mul', True, 'mul', 4), {'alpha': 0.3, 'beta': 0.1, 'gamma': 0.2, 'phi': 0.9}, (10.0, 1.01, [1.1, 1, 0.9, 1])),
+]
+
+
+def _reference_filter(model, input_array, initial_level, initial_slope, initial_seasons,
+                      alpha, beta=0.0, gamma=0.0, phi=1.0):
+    level, slope = initial_level, initial_slope if model.trend else (1.0 if model.trend == 'mul' else 0.0)
+    seasons = list(initial_seasons or [])
+    predictions = []
+    for observation in input_array:
+        damped = (slope ** phi if model.trend == 'mul' else slope * phi) if model.damped else slope
+        base = level * damped if model.trend == 'mul' else (level + damped if model.trend else level)
+        season = seasons[-model.seasonal_periods] if model.seasonal else None
+        if model.seasonal == 'mul':
+            predictions.append(base * season)
+            new_level = alpha * observation / season + (1 - alpha) * base
+            seasons.append(gamma * observation / base + (1 - gamma) * season)
+        elif model.seasonal == 'add':
+            predictions.append(base + season)
+            new_level = alpha * (observation - season) + (1 - alpha) * base
+            seasons.append(gamma * (observation - base) + (1 - gamma) * season)
+        else:
+            predictions.append(base)
+            new_level = alpha * observation + (1 - alpha) * base
+        if model.trend == 'mul':
+            slope = beta * new_level / level + (1 - beta) * damped
+        elif model.trend == 'add':
+            slope = beta * (new_level - level) + (1 - beta) * damped
+        level = new_level
+    return predictions
+
+
+@pytest.mark.parametrize('spec, coefficients, initial', models)
+def test_filter_matches_reference_recursion(spec, coefficients, initial):
+    model = ExponentialSmoothing(*spec)
+    _, predictions = model.filter(series, model.initial_state(*initial), **coefficients)
+    np.testing.assert_allclose(predictions, _reference_filter(model, series, *initial, **coefficients))
+
+
+@pytest.mark.parametrize('spec, coefficients, initial', models)
+def test_filter_continues_from_state(spec, coefficients, initial):
+    model = ExponentialSmoothing(*spec)
+    state, predictions = model.filter(series, model.initial_state(*initial), **coefficients)
+    halfway, first = model.filter(series[:17], model.initial_state(*initial), **coefficients)
+    resumed, second = model.filter(series[17:], halfway, **coefficients)
+    np.testing.assert_allclose(np.concatenate([first, second]), predictions)
+    phi = coefficients.get('phi', 1.0)
+    np.testing.assert_allclose(model.forecast(resumed, 6, phi), model.forecast(state, 6, phi))
+
+
+def test_filter_vectorised_over_coefficients():
+    model = ExponentialSmoothing('add', False, 'add', 4)
+    alphas = np.array([0.1, 0.5, 0.9])
+    state, predictions = model.filter(series, model.initial_state(10.0, 0.1, [1, 0, -1, 0]), alphas, 0.1, 0.2)
+    forecasts = model.forecast(state, 5)
+    assert predictions.shape == (3, 40)
+    assert forecasts.shape == (3, 5)
+    for index, alpha in enumerate(alphas):
+        single_state, single = model.filter(series, model.initial_state(10.0, 0.1, [1, 0, -1, 0]), alpha, 0.1, 0.2)
+        np.testing.assert_allclose(predictions[index], single)
+        np.testing.assert_allclose(forecasts[index], model.forecast(single_state, 5))
+
+
+def test_forecast_closed_form():
+    model = ExponentialSmoothing('add', True, 'add', 2)
+    state = model.initial_state(10.0, 1.0, [1.0, -1.0])
+    np.testing.assert_allclose(model.forecast(state, 3, 0.5), [10 + 0.5 + 1, 10 + 0.75 - 1, 10 + 0.875 + 1])
@@ -0,0 +1,98 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import (
+    InvalidIntegerParameter,
+    InvalidListParameter,
+    InvalidStringParameter,
+)
+from forecast_api.methods.auto import candidate_configs
+
+
+@pytest.fixture
+def parse_params(container):
+    def _parse_params(**kwargs):
+        parse_params = container('services.methods.auto_parse_params')
+        return parse_params(**kwargs)
+    return _parse_params
+
+
+@pytest.fixture
+def auto(container):
+    return container('services.methods.auto')
+
+
+class TestParameters:
+
+    def test_defaults(self, parse_params):
+        params = parse_params()
+        assert params['criterion'] == 'aicc'
+        assert params['methods'] == ['average', 'ses', 'holt', 'holtwinter']
+        assert params['seasonal_periods'] == []
+
+    @pytest.mark.parametrize('seasonal_periods, expected', [(4, [4]), ([4, 12], [4, 12])])
+    def test_seasonal_periods(self, parse_params, seasonal_periods, expected):
+        assert parse_params(seasonal_periods=seasonal_periods)['seasonal_periods'] == expected
+
+    @pytest.mark.parametrize('params, exception', [
+        ({'criterion': 'bic'}, InvalidStringParameter),
+        ({'methods': 'holt'}, InvalidListParameter),
+        ({'methods': []}, InvalidListParameter),
+        ({'methods': ['arima']}, InvalidStringParameter),
+        ({'seasonal_periods': [1]}, InvalidIntegerParameter),
+        ({'holdout': 0}, InvalidIntegerParameter),
+    ])
+    def test_invalid(self, parse_params, params, exception):
+        with pytest.raises(exception):
+            parse_params(**params)
+
+
+def test_candidates_respect_series_length():
+    candidates = candidate_configs(np.arange(1, 11, dtype=float), 10, ['average', 'holtwinter'], [4, 7])
+    windows = [config['window'] for method, config in candidates if method == 'average']
+    periods = {config['seasonal_periods'] for method, config in candidates if method == 'holtwinter'}
+    assert windows == [1, 2, 4, 8]
+    assert periods == {4}
+
+
+def test_candidates_without_positive_data_skip_multiplicative_models():
+    candidates = candidate_configs(np.array([0.0, 1, 2, 0, 1, 2, 0, 1]), 8, ['holt', 'holtwinter'], [3])
+    assert ('holt', {'exponential': True}) not in candidates
+    assert all(config['seasonal'] == 'add' for method, config in candidates if method == 'holtwinter')
+
+
+@pytest.mark.parametrize('criterion', ['aic', 'aicc', 'holdout'])
+def test_selects_best_average_window(auto, criterion):
+    # a level shift: only the shortest window follows it
+    input_data = [0.0] * 30 + [10.0] * 30
+    res = auto.fit_forecast(input_data, 3, methods=['average'], criterion=criterion, prune=False)
+    assert res['selected']['method'] == 'average'
+    assert res['selected']['config'] == {'window': 1}
+    assert res['forecast'] == [10.0, 10.0, 10.0]
+    assert {candidate['status'] for candidate in res['candidates']} == {'evaluated'}
+
+
+def test_prunes_dominated_candidates(auto):
+    # the level shift is recent enough that the longest windows still average over the old level
+    input_data = [0.0] * 192 + [10.0] * 8
+    res = auto.fit_forecast(input_data, 2, methods=['average'], criterion='holdout')
+    statuses = {candidate['config']['window']: candidate['status'] for candidate in res['candidates']}
+    assert statuses == {1: 'evaluated', 2: 'evaluated', 4: 'evaluated', 8: 'pruned', 12: 'pruned'}
+
+
+def test_too_short(auto):
+    with pytest.raises(ValueError):
+        auto.fit_forecast([1.0], 1, methods=['average'])
+
+
+@pytest.mark.parametrize('criterion', ['aic', 'aicc'])
+def test_selection_does_not_depend_on_the_units(auto, criterion):
+    # averages report fewer one-step errors than ses; scoring them as they are made the choice depend on the scale
+    walk = np.cumsum(np.random.default_rng(3).normal(0, 1, 60))
+    selected = [
+        auto.fit_forecast(list(walk * scale), 3, methods=['average', 'ses'], criterion=criterion, prune=False)
+        for scale in (0.001, 1, 1000)
+    ]
+    choices = [(res['selected']['method'], res['selected']['config']) for res in selected]
+    assert choices == [choices[0]] * 3
@@ -0,0 +1,79 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import (
+    InvalidAverageWindowParameter,
+    InvalidParameter,
+)
+from forecast_api.methods.average import (
+    in_sample_mse,
+    one_step_predictions,
+)
+
+
+@pytest.fixture
+def average(container):
+    return container('services.methods.average')
+
+
+@pytest.fixture
+def parse_params(container):
+    return container('services.methods.average_parse_params')
+
+
+@pytest.mark.parametrize('window', [1, 2, [1, 3], 'auto'])
+def test_valid_window(parse_params, window):
+    assert parse_params(window=window) == {'window': window, 'kind': 'mean'}
+
+
+@pytest.mark.parametrize('window', [0, -1, 'string', [], [0, 2], 1.5])
+def test_invalid_window(parse_params, window):
+    with pytest.raises(InvalidParameter):
+        parse_params(window=window)
+
+
+def test_invalid_kind(parse_params):
+    with pytest.raises(InvalidParameter):
+        parse_params(window=2, kind='median')
+
+
+def test_sweep_matches_single_windows():
+    input_array = np.random.default_rng(0).normal(size=(3, 40))
+    windows = [1, 3, 5, 7]
+    expected = np.stack([
+        np.mean((input_array - one_step_predictions(input_array, window))[..., 7:]**2, axis=-1)
+        for window in windows
+    ])
+    assert np.allclose(in_sample_mse(input_array, windows), expected)
+
+
+def test_auto_window_per_series(average):
+    result = average.forecast([[1, 2, 3, 4, 5, 6, 7, 8], [5, 1, 5, 1, 5, 1, 5, 1]], 2, window='auto')
+    assert result['params']['window'] == [1, 2]
+    assert result['forecast'].tolist() == [[8, 8], [3, 3]]
+    assert [entry['window'] for entry in result['windows']] == [1, 2, 3, 4]
+
+
+def test_ewm(average):
+    result = average.forecast([1, 2, 3, 4, 5, 6, 7, 8], 3, window=3, kind='ewm')
+    # pandas.Series(...).ewm(span=3, adjust=False).mean()
+    assert np.allclose(result['forecast'], 7.0078125)
+
+
+def test_seasonal_naive(average):
+    result = average.forecast([1, 2, 3, 4, 5], 4, window=3, kind='seasonal_naive')
+    assert result['forecast'].tolist() == [3, 4, 5, 3]
+
+
+def test_seasonal_naive_longer_than_input(average):
+    with pytest.raises(InvalidAverageWindowParameter):
+        average.forecast([1, 2], 1, window=3, kind='seasonal_naive')
+
+
+def test_fit_forecast_batch_splits_rows(average):
+    results = average.fit_forecast_batch(np.array([[1, 2, 3, 4, 5, 6, 7, 8], [5, 1, 5, 1, 5, 1, 5, 1]]), 1,
+                                         window='auto')
+    assert [result['params']['window'] for result in results] == [1, 2]
+    assert [list(result['forecast']) for result in results] == [[8.0], [3.0]]
+    assert results[1]['windows'][1] == {'window': 2, 'mse': 4.0}
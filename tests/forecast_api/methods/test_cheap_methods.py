@@ -0,0 +1,114 @@
+import pytest
+
+import numpy as np
+
+from statsmodels.tsa.forecasting.theta import ThetaModel
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.optimize import golden_section
+from forecast_api.lib.seasonality import seasonal_indices
+from forecast_api.methods.ses import sse
+
+
+series = 10 + np.arange(48) * 0.3 + 3 * np.sin(np.arange(48) * 2 * np.pi / 12) + \
+    np.random.default_rng(0).normal(size=48) * 0.3
+
+
+def test_golden_section_is_vectorized():
+    centres = np.array([0.1, 0.5, 0.9])
+    np.testing.assert_allclose(golden_section(lambda x: (x - centres)**2, 0, 1), centres, atol=1e-5)
+
+
+def test_ses_alpha_minimizes_sse(container):
+    ses = container('services.methods.ses')
+    result = ses.fit_forecast(series, 2)
+    alpha = result['params']['alpha']
+    for other in (alpha - 0.01, alpha + 0.01):
+        if 0 <= other <= 1:
+            assert sse(series, alpha, series[0]) <= sse(series, other, series[0])
+    assert len(set(result['forecast'])) == 1
+
+
+def test_ses_batch_matches_single_series(container):
+    ses = container('services.methods.ses')
+    batch = np.stack([series, series[::-1]])
+    for row, result in zip(batch, ses.fit_forecast_batch(batch, 3)):
+        single = ses.fit_forecast(row, 3)
+        np.testing.assert_allclose(result['forecast'], single['forecast'])
+        assert result['params']['alpha'] == pytest.approx(single['params']['alpha'])
+
+
+def test_ses_forecast_needs_alpha(container):
+    with pytest.raises(ValueError):
+        container('services.methods.ses').forecast(series, 1)
+
+
+def test_theta_of_a_line_continues_it(container):
+    theta = container('services.methods.theta')
+    result = theta.fit_forecast(np.arange(1.0, 21.0), 3, alpha=1.0)
+    # SES with alpha = 1 forecasts the last value, half the slope is added per step
+    np.testing.assert_allclose(result['forecast'], [20.5, 21.0, 21.5])
+
+
+@pytest.mark.parametrize('params, theta_model', [
+    ({}, {'deseasonalize': False}),
+    ({'seasonal_periods': 12, 'deseasonalize': 'add'}, {'period': 12, 'method': 'additive'}),
+    ({'seasonal_periods': 12, 'deseasonalize': 'mul'}, {'period': 12, 'method': 'multiplicative'}),
+])
+def test_theta_matches_statsmodels(container, params, theta_model):
+    time = np.arange(72)
+    input_data = 20 + 0.1 * time + 3 * np.sin(time * 2 * np.pi / 12) + np.random.default_rng(2).normal(size=72) * 1.5
+    expected = ThetaModel(input_data, use_test=False, **theta_model).fit()
+    theta = container('services.methods.theta')
+
+    # the same forecast for the same alpha, and the same alpha up to the tolerance of the two optimizers
+    given = theta.fit_forecast(input_data, 6, alpha=expected.params['alpha'], **params)
+    np.testing.assert_allclose(given['forecast'], expected.forecast(6), rtol=1e-9)
+    fitted = theta.fit_forecast(input_data, 6, **params)
+    assert fitted['params']['alpha'] == pytest.approx(expected.params['alpha'], abs=1e-4)
+    np.testing.assert_allclose(fitted['forecast'], expected.forecast(6), rtol=1e-5)
+
+
+@pytest.mark.parametrize('kind', ['add', 'mul'])
+def test_seasonal_indices_are_normalised(kind):
+    indices = seasonal_indices(series, 12, kind)
+    assert indices.shape == (12,)
+    assert indices.mean() == pytest.approx(1.0 if kind == 'mul' else 0.0)
+    assert np.argmax(indices) == 3
+
+
+def test_theta_invalid_params(container):
+    parse_params = container('services.methods.theta_parse_params')
+    with pytest.raises(InvalidParameter):
+        parse_params(theta=0.5)
+    with pytest.raises(InvalidParameter):
+        parse_params(deseasonalize='add')
+
+
+@pytest.mark.parametrize('params', [{}, {'seasonal_periods': 12}])
+def test_theta_fitted_params_forecast_again(container, params):
+    theta = container('services.methods.theta')
+    result = theta.fit_forecast(series, 4, **params)
+    assert result['params']['deseasonalize'] == ('mul' if params else None)
+    again = theta.forecast(series, 4, **result['params'])
+    np.testing.assert_allclose(again['forecast'], result['forecast'])
+
+
+@pytest.mark.parametrize('name, input_data', [('ses', []), ('theta', []), ('theta', [1.0])])
+def test_too_short_input_data(container, name, input_data):
+    with pytest.raises(InvalidParameter):
+        container(f'services.methods.{name}').fit_forecast(input_data, 2)
+
+
+def test_seasonal_naive_detects_period(container):
+    seasonal_naive = container('services.methods.seasonal_naive')
+    result = seasonal_naive.fit_forecast(series, 14)
+    assert result['params']['seasonal_periods'] == 12
+    np.testing.assert_allclose(result['forecast'], np.concatenate([series[-12:], series[-12:-10]]))
+
+
+def test_seasonal_naive_batch_with_per_row_periods(container):
+    seasonal_naive = container('services.methods.seasonal_naive')
+    batch = np.array([[1.0, 2.0, 1.0, 2.0, 1.0, 2.0, 1.0, 2.0], [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]])
+    results = seasonal_naive.fit_forecast_batch(batch, 3, seasonal_periods=2)
+    assert [list(result['forecast']) for result in results] == [[1.0, 2.0, 1.0], [7.0, 8.0, 7.0]]
@@ -0,0 +1,65 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+
+
+dense = [0, 0, 3, 0, 0, 0, 2, 0, 5, 0, 0, 0]
+sparse = {'length': 12, 'index': [2, 6, 8], 'values': [3, 2, 5]}
+
+
+def _dense_reference(input_data, alpha, beta, variant):
+    size = interval = None
+    probability, periods = None, 1
+    for value in input_data:
+        if variant == 'tsb' and size is not None:
+            probability += beta * ((value > 0) - probability)
+        if value > 0:
+            if size is None:
+                size, interval, probability = value, periods, 1 / periods
+            else:
+                size += alpha * (value - size)
+                interval += beta * (periods - interval)
+            periods = 1
+        else:
+            periods += 1
+    if variant == 'tsb':
+        return size * probability
+    return size / interval * (1 - beta / 2 if variant == 'sba' else 1)
+
+
+@pytest.mark.parametrize('variant', ['croston', 'sba', 'tsb'])
+def test_sparse_matches_dense_recursion(container, variant):
+    croston = container('services.methods.croston')
+    result = croston.fit_forecast(sparse, 3, alpha=0.3, beta=0.2, variant=variant)
+    np.testing.assert_allclose(result['forecast'], [_dense_reference(dense, 0.3, 0.2, variant)] * 3)
+    np.testing.assert_allclose(result['forecast'], croston.fit_forecast(dense, 3, alpha=0.3, beta=0.2,
+                                                                        variant=variant)['forecast'])
+
+
+def test_no_demand(container):
+    result = container('services.methods.croston').fit_forecast({'length': 5}, 2)
+    assert list(result['forecast']) == [0.0, 0.0]
+
+
+@pytest.mark.parametrize('input_data', [
+    {'index': [1], 'values': [1]},
+    {'length': 5, 'index': [1, 1], 'values': [1, 2]},
+    {'length': 5, 'index': [5], 'values': [1]},
+    {'length': 5, 'index': [1, 2], 'values': [1]},
+    {'length': 5, 'index': [1], 'values': [1], 'zeros': 4},
+])
+def test_invalid_sparse_input(container, input_data):
+    with pytest.raises(InvalidParameter):
+        container('services.methods.croston').fit_forecast(input_data, 1)
+
+
+def test_post_sparse_input(webapi):
+    response = webapi.post_json(
+        '/v1/forecast/croston',
+        {'input_data': sparse, 'forecast_horizon': 2, 'params': {'variant': 'sba'}},
+        status=200
+    )
+    assert response.json['params'] == {'variant': 'sba', 'alpha': 0.1, 'beta': 0.1}
+    assert set(response.json['components']) == {'size', 'interval'}
@@ -0,0 +1,111 @@
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.smoothing import DoubleSeasonalSmoothing
+from forecast_api.lib.smoothing import ExponentialSmoothing
+
+
+def _hourly(weeks=4, seed=0):
+    time = np.arange(168 * weeks)
+    daily = 10 * np.sin(2 * np.pi * time / 24)
+    weekend = 20 * (time % 168 >= 120)
+    return 100 + daily + weekend + np.random.default_rng(seed).normal(size=len(time))
+
+
+def _taylor_reference(input_data, level, slope, short_seasons, long_seasons, alpha, beta, gamma, delta):
+    short_seasons, long_seasons = list(short_seasons), list(long_seasons)
+    predictions = []
+    for time, observation in enumerate(input_data):
+        first, second = short_seasons[time % 24], long_seasons[time % 168]
+        predictions.append(level + slope + first + second)
+        new_level = alpha * (observation - first - second) + (1 - alpha) * (level + slope)
+        slope = beta * (new_level - level) + (1 - beta) * slope
+        level = new_level
+        short_seasons[time % 24] = gamma * (observation - level - second) + (1 - gamma) * first
+        long_seasons[time % 168] = delta * (observation - level - first) + (1 - delta) * second
+    return predictions
+
+
+def test_recursion_matches_reference():
+    input_array = _hourly(2)
+    smoothing = DoubleSeasonalSmoothing([24, 168], trend='add')
+    state = smoothing.initial_state(input_array)
+    _, predictions = smoothing.filter(input_array, state, alpha=0.3, beta=0.1, gamma=0.2, delta=0.4)
+    np.testing.assert_allclose(predictions, _taylor_reference(
+        input_array, state.level, state.slope, *state.seasons, alpha=0.3, beta=0.1, gamma=0.2, delta=0.4
+    ))
+
+
+def test_recursion_reduces_to_single_seasonal():
+    # the short cycle is updated with the new level (statsmodels uses the previous one), so it is held fixed
+    input_array = _hourly(2)[:200]
+    smoothing = DoubleSeasonalSmoothing([24, 168], trend='add')
+    state = smoothing.initial_state(input_array)
+    state = state._replace(seasons=(state.seasons[0], np.zeros(168)))
+    final, predictions = smoothing.filter(input_array, state, alpha=0.3, beta=0.1, gamma=0.0, delta=0.0)
+
+    single = ExponentialSmoothing(trend='add', seasonal='add', seasonal_periods=24)
+    single_state = single.initial_state(state.level, state.slope, state.seasons[0])
+    single_final, single_predictions = single.filter(input_array, single_state, alpha=0.3, beta=0.1, gamma=0.0)
+    np.testing.assert_allclose(predictions, single_predictions)
+    np.testing.assert_allclose(smoothing.forecast(final, 30), single.forecast(single_final, 30))
+
+
+def test_recursion_is_vectorized_over_coefficients():
+    input_array = _hourly(2)
+    smoothing = DoubleSeasonalSmoothing([24, 168])
+    state = smoothing.initial_state(input_array)
+    alphas = np.array([0.1, 0.5])
+    _, predictions = smoothing.filter(input_array, state, alpha=alphas, gamma=0.1, delta=0.2)
+    for row, alpha in enumerate(alphas):
+        np.testing.assert_allclose(predictions[row], smoothing.filter(input_array, state, alpha, 0, 0.1, 0.2)[1])
+
+
+def test_fit_forecast_beats_single_seasonal(container):
+    input_data = _hourly()
+    train, test = input_data[:-48], input_data[-48:]
+    result = container('services.methods.double_seasonal').fit_forecast(train, 48, seasonal_periods=[24, 168])
+    single = container('services.methods.seasonal_naive').fit_forecast(train, 48, seasonal_periods=24)
+    error = np.sqrt(np.mean((np.array(result['forecast']) - test)**2))
+    assert error < 2
+    assert error < np.sqrt(np.mean((np.array(single['forecast']) - test)**2))
+    for name in ('alpha', 'gamma', 'delta'):
+        assert 0 <= result['params'][name] <= 1
+    assert result['params']['beta'] is None
+
+
+def test_fit_evaluate_and_forecast(container):
+    method = container('services.methods.double_seasonal')
+    input_data = _hourly(2)
+    result = method.fit_evaluate(input_data, 5, seasonal_periods=[24, 168], trend='add', damped=True)
+    assert result['n_params'] == 5
+    assert result['nobs'] == len(input_data)
+    assert 0.8 <= result['params']['phi'] <= 0.995
+
+    coefficients = {name: result['params'][name] for name in ('alpha', 'beta', 'gamma', 'delta', 'phi')}
+    forecast = method.forecast(input_data, 5, seasonal_periods=[24, 168], trend='add', damped=True, **coefficients)
+    np.testing.assert_allclose(forecast['forecast'], result['forecast'])
+    with pytest.raises(ValueError):
+        method.forecast(input_data, 5, seasonal_periods=[24, 168], alpha=0.1)
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'seasonal_periods': 24},
+    {'seasonal_periods': [24]},
+    {'seasonal_periods': [168, 24]},
+    {'seasonal_periods': [24, 168], 'seasonal': 'log'},
+    {'seasonal_periods': [24, 168], 'damped': True},
+    {'seasonal_periods': [24, 168], 'beta': 0.1},
+    {'seasonal_periods': [24, 168], 'delta': 1.5},
+])
+def test_invalid_params(container, params):
+    with pytest.raises(InvalidParameter):
+        container('services.methods.double_seasonal_parse_params')(**params)
+
+
+def test_short_input(container):
+    with pytest.raises(InvalidParameter):
+        container('services.methods.double_seasonal').fit_forecast(_hourly(1), 5, seasonal_periods=[24, 168])
@@ -12,6 +12,7 @@ from forecast_api.lib.exceptions import (
     InvalidSeasonalParameters,
     InvalidTrendParameters,
 )
+from forecast_api.methods.holtwinter import unspecified_params
 
 
 valid_coefficient_values = list(np.arange(0, 1, 0.1))
@@ -379,3 +380,58 @@ class TestSeasonalParameters:
         assert params['gamma'] == gamma
         assert params['optimized_gamma'] is False
         assert params['optimized_seasonal'] is True
+
+
+class TestAutoSeasonalPeriods:
+
+    @pytest.mark.parametrize('seasonal', valid_seasonal_values)
+    def test_auto_seasonal_periods(self, parse_params, seasonal):
+        params = parse_params(**{'seasonal': seasonal, 'seasonal_periods': 'auto'})
+        assert params['seasonal_periods'] == 'auto'
+        assert params['optimized_seasonal_periods'] is True
+
+    def test_auto_seasonal_periods_without_seasonal(self, parse_params):
+        with pytest.raises(InvalidSeasonalParameters):
+            parse_params(**{'seasonal_periods': 'auto'})
+
+    @pytest.mark.parametrize('seasonal_periods', valid_seasonal_period_values)
+    def test_fixed_seasonal_periods(self, parse_params, seasonal_periods):
+        params = parse_params(**{'seasonal': 'add', 'seasonal_periods': seasonal_periods})
+        assert params['optimized_seasonal_periods'] is False
+
+
+class TestInitialSeasons:
+
+    @pytest.mark.parametrize('seasonal', valid_seasonal_values)
+    def test_valid_initial_seasons(self, parse_params, seasonal):
+        params = parse_params(**{'seasonal': seasonal, 'seasonal_periods': 4, 'initial_seasons': [1, 2, 3, 4]})
+        assert params['initial_seasons'] == [1.0, 2.0, 3.0, 4.0]
+        assert params['optimized_seasonal'] is False
+        assert params['optimized_gamma'] is True
+
+    @pytest.mark.parametrize('initial_seasons', [[1, 2, 3], [1, 2, 3, 4, 5]])
+    def test_wrong_number_of_initial_seasons(self, parse_params, initial_seasons):
+        with pytest.raises(InvalidSeasonalParameters):
+            parse_params(**{'seasonal': 'add', 'seasonal_periods': 4, 'initial_seasons': initial_seasons})
+
+    def test_initial_seasons_without_seasonal(self, parse_params):
+        with pytest.raises(InvalidSeasonalParameters):
+            parse_params(**{'initial_seasons': [1, 2, 3, 4]})
+
+
+class TestUnspecifiedParams:
+
+    def test_no_trend_needs_no_slope(self, parse_params):
+        params = parse_params(alpha=0.5, initial_level=1.0)
+        assert params['to_fit'] is True
+        assert unspecified_params(params) == []
+
+    def test_seasonal_needs_initial_seasons(self, parse_params):
+        params = parse_params(alpha=0.5, gamma=0.1, initial_level=1.0, seasonal='add', seasonal_periods=2)
+        assert unspecified_params(params) == ['initial_seasons']
+
+    def test_forecast_without_trend(self, container):
+        holtwinter = container('services.methods.holtwinter')
+        result = holtwinter.forecast([1, 2, 3], 2, alpha=0.5, initial_level=1.0)
+        # levels 1 -> 1 -> 1.5 -> 2.25
+        assert result['forecast'] == [2.25, 2.25]
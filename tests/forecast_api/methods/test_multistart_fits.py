@@ -0,0 +1,87 @@
+import pickle
+import pytest
+
+import numpy as np
+
+from forecast_api.lib.exceptions import InvalidParameter
+
+
+def _seasonal(cycles=8, periods=12):
+    time = np.arange(cycles * periods)
+    noise = np.random.default_rng(1).normal(0, 1, len(time))
+    return list(50 + 0.3 * time + 8 * np.sin(2 * np.pi * time / periods) + noise)
+
+
+def test_holtwinter_multistart_fit(container):
+    method = container('services.methods.holtwinter')
+    input_data = _seasonal()
+    params = {'trend': 'mul', 'seasonal': 'mul', 'seasonal_periods': 12, 'damped': True}
+    single = method.fit_evaluate(input_data, 12, multistart=1, **params)
+    result = method.fit_evaluate(input_data, 12, multistart=16, **params)
+
+    assert result['sse'] <= single['sse'] + 1e-9
+    report = result['multistart']
+    assert report['sse'] == result['sse']
+    assert report['screened'] == 17
+    assert report['objectives']['min'] == report['sse'] <= report['objectives']['max']
+    assert len(result['forecast']) == 12
+    assert len(result['params']['initial_seasons']) == 12
+    for name in ('alpha', 'beta', 'gamma', 'phi'):
+        assert 0 <= result['params'][name] <= 1
+
+    # the fitted params reproduce the forecast without fitting
+    forecast = method.forecast(input_data, 12, **{**result['params'], 'multistart': 0})
+    np.testing.assert_allclose(forecast['forecast'], result['forecast'])
+
+
+def test_holt_multistart_keeps_given_coefficients(container):
+    method = container('services.methods.holt')
+    input_data = _seasonal()
+    result = method.fit_evaluate(input_data, 5, multistart=8, alpha=0.4)
+    assert result['params']['alpha'] == 0.4
+    assert result['params']['optimized_alpha'] is False
+    assert result['nobs'] == len(input_data)
+    assert result['multistart']['refined'] <= 9
+
+
+def test_multiplicative_fit_needs_positive_data(container):
+    with pytest.raises(ValueError):
+        container('services.methods.holt').fit_forecast([1, -1, 2, 3], 2, multistart=4, exponential=True)
+
+
+def test_engines_pickle_without_their_pool(container):
+    method = container('services.methods.holtwinter')
+    assert method._executor is not None
+    assert pickle.loads(pickle.dumps(method))._executor is None
+
+
+def test_fitted_state_is_within_the_param_bounds(container):
+    # an unbounded additive fit puts the initial level below 0, which the params do not accept back
+    method = container('services.methods.holt')
+    input_data = [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3]
+    result = method.fit_forecast(input_data, 2, multistart=4)
+    assert result['params']['initial_level'] >= 0
+    params = container('services.methods.holt_parse_params')(**result['params'])
+    np.testing.assert_allclose(method.forecast(input_data, 2, **params)['forecast'], result['forecast'])
+
+
+def test_non_seasonal_fit_params_can_be_used_without_fitting(container):
+    method = container('services.methods.holtwinter')
+    input_data = list(range(1, 11))
+    result = method.fit_forecast(input_data, 2, trend='add', multistart=3)
+    assert result['params']['initial_seasons'] is None
+    np.testing.assert_allclose(method.forecast(input_data, 2, **result['params'])['forecast'], result['forecast'])
+
+
+def test_given_initial_seasons_are_kept_or_refused(container):
+    method = container('services.methods.holtwinter')
+    input_data = _seasonal()
+    seasons = [8 * np.sin(2 * np.pi * period / 12) for period in range(12)]
+    params = {'trend': 'add', 'seasonal': 'add', 'seasonal_periods': 12, 'initial_seasons': seasons}
+    with pytest.raises(InvalidParameter):
+        method.fit_forecast(input_data, 2, **params)
+
+    result = method.fit_evaluate(input_data, 2, multistart=4, **params)
+    assert result['params']['initial_seasons'] == seasons
+    # the coefficients, level and slope, not the seasons given
+    assert result['n_params'] == 5
@@ -0,0 +1,48 @@
+import pytest
+
+from forecast_api.lib.exceptions import UnknownForecastMethod
+from forecast_api.methods import MethodSpec
+from forecast_api.methods.registry import COST_CHEAP
+
+
+@pytest.fixture
+def registry(container):
+    return container('registry')
+
+
+def test_builtin_methods_are_registered(registry):
+    assert list(registry) == [
+        'auto', 'average', 'croston', 'double_seasonal', 'holt', 'holtwinter', 'seasonal_naive', 'ses', 'theta',
+    ]
+
+
+def test_unknown_method(registry):
+    with pytest.raises(UnknownForecastMethod):
+        registry.engine('nomethod')
+
+
+def test_engines_are_built_lazily_and_reused(container, registry):
+    built = []
+
+    def engine(c):
+        built.append(c)
+        return c('services.methods.average')
+
+    registry.register(
+        MethodSpec('lazy', engine, lambda c: c('services.methods.average_parse_params'), cost=COST_CHEAP)
+    )
+    assert built == []
+    assert registry.engine('lazy') is registry.engine('lazy')
+    assert built == [container]
+
+
+def test_run_dispatches_to_engine(registry):
+    result = registry.run('average', 'fit_forecast', [1, 2, 3, 4], 2, window=2)
+    assert list(result['forecast']) == [3.5, 3.5]
+    assert registry.parse_params('average', window=2) == {'window': 2, 'kind': 'mean'}
+
+
+@pytest.mark.parametrize('field, value', [('cost', 'free'), ('pool', 'gpu')])
+def test_invalid_spec(field, value):
+    with pytest.raises(ValueError):
+        MethodSpec('bad', None, None, **{field: value})
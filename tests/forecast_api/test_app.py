@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+from forecast_api.lib.lazy import LazyImport
+
+
+def test_create_container_does_not_import_statsmodels():
+    code = (
+        'import sys\n'
+        'from forecast_api.wsgi import create_callable\n'
+        'from forecast_api.app import create_container\n'
+        'create_callable(create_container("forecast_api/confs/testing.ini"))\n'
+        'assert "statsmodels" not in sys.modules, "statsmodels imported at startup"\n'
+        'assert "pandas" not in sys.modules, "pandas imported at startup"\n'
+        'assert "scipy.optimize" not in sys.modules, "scipy.optimize imported at startup"\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_lazy_import_resolves_on_first_call():
+    lazy_max = LazyImport('builtins', 'max')
+    assert not lazy_max.resolved
+    assert lazy_max(1, 3, 2) == 3
+    assert lazy_max.resolved
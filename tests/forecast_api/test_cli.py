@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+
+from forecast_api.cli import main
+from forecast_api.lib.batch import fit_series
+
+
+def _batch(request, *args):
+    return main(['batch', *args, '--config', request.config.getoption('ini_file'), '--workers', '2'])
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return {result['series_id']: result for result in map(json.loads, f)}
+
+
+def test_batch_npy_matches_api(request, tmp_path, container):
+    input_array = np.random.default_rng(0).normal(size=(20, 30))
+    np.save(tmp_path / 'series.npy', input_array)
+    output = str(tmp_path / 'forecasts.jsonl')
+
+    assert _batch(request, str(tmp_path / 'series.npy'), output, '--forecast-horizon', '3',
+                  '--params', '{"window": "auto"}') == 0
+
+    results = _read_jsonl(output)
+    assert sorted(results, key=int) == [str(index) for index in range(20)]
+    average = container('services.methods.average')
+    expected = average.fit_forecast(input_array[7], 3, window='auto')
+    np.testing.assert_allclose(results['7']['forecast'], expected['forecast'])
+    assert results['7']['params'] == expected['params']
+
+
+def test_batch_csv_resumes_from_checkpoint(request, tmp_path):
+    lines = ['series_id,value'] + [f'{series},{value}' for series in 'abc' for value in range(1, 5)]
+    (tmp_path / 'series.csv').write_text('\n'.join(lines) + '\n')
+    (tmp_path / 'forecasts.csv.checkpoint').write_text('b\n')
+    output = str(tmp_path / 'forecasts.csv')
+
+    assert _batch(request, str(tmp_path / 'series.csv'), output, '--forecast-horizon', '2',
+                  '--params', '{"window": 2}', '--chunk-size', '3') == 0
+
+    rows = (tmp_path / 'forecasts.csv').read_text().splitlines()
+    assert rows[0] == 'series_id,step,forecast'
+    assert sorted(rows[1:]) == ['a,1,3.5', 'a,2,3.5', 'c,1,3.5', 'c,2,3.5']
+    assert set((tmp_path / 'forecasts.csv.checkpoint').read_text().split()) == {'a', 'b', 'c'}
+
+
+def test_batch_reports_failed_series(request, tmp_path):
+    np.save(tmp_path / 'series.npy', np.ones((2, 5)))
+    output = str(tmp_path / 'forecasts.jsonl')
+
+    assert _batch(request, str(tmp_path / 'series.npy'), output, '--forecast-horizon', '1',
+                  '--params', '{"window": 0}') == 1
+    assert all('error' in result for result in _read_jsonl(output).values())
+
+
+def test_unexpected_errors_fail_only_their_series():
+    class Broken:
+        def fit_forecast(self, input_data, forecast_horizon, **params):
+            raise TypeError('unexpected keyword argument')
+
+    assert fit_series(Broken(), 'a', [1.0, 2.0], 1, {}) == {'series_id': 'a', 'error': 'unexpected keyword argument'}
+
+
+def test_batch_unsorted_csv(request, tmp_path):
+    (tmp_path / 'series.csv').write_text('series_id,value\na,1\nb,5\na,2\nb,6\n')
+    output = str(tmp_path / 'forecasts.jsonl')
+
+    assert _batch(request, str(tmp_path / 'series.csv'), output, '--forecast-horizon', '1',
+                  '--params', '{"window": 2}', '--unsorted') == 0
+    results = _read_jsonl(output)
+    assert results['a']['forecast'] == [1.5]
+    assert results['b']['forecast'] == [5.5]
+
+
+def test_openapi_matches_api(request, tmp_path, webapi):
+    output = tmp_path / 'openapi.json'
+    assert main(['openapi', str(output), '--config', request.config.getoption('ini_file')]) == 0
+    assert json.loads(output.read_text()) == webapi.get('/v1/openapi.json').json
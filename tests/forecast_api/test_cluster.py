@@ -0,0 +1,147 @@
+import json
+import socket
+import threading
+import numpy as np
+import pytest
+
+pytest.importorskip('msgpack')
+
+from forecast_api.cli import CLUSTER_TOKEN_ENV  # noqa: E402
+from forecast_api.cli import _cluster_token  # noqa: E402
+from forecast_api.cli import create_parser  # noqa: E402
+from forecast_api.cli import main  # noqa: E402
+from forecast_api.methods import MethodSpec  # noqa: E402
+from forecast_api.rpc.cluster import MSG_REGISTER  # noqa: E402
+from forecast_api.rpc.cluster import Coordinator  # noqa: E402
+from forecast_api.rpc.cluster import Worker  # noqa: E402
+from forecast_api.rpc.protocol import encode_frame  # noqa: E402
+from forecast_api.rpc.protocol import recv_frame  # noqa: E402
+
+SERIES = [(f's{index}', np.arange(1.0, 6.0) + index) for index in range(23)]
+
+
+def _start_workers(registry, address, count, **kwargs):
+    workers = [Worker(registry, address, **kwargs) for _ in range(count)]
+    threads = [threading.Thread(target=worker.run, daemon=True) for worker in workers]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _silent_worker(address):
+    """Registers, takes a shard and then never answers nor heartbeats."""
+    sock = socket.create_connection(address)
+    sock.sendall(encode_frame({'type': MSG_REGISTER, 'name': 'silent', 'slots': 1, 'token': None}))
+    return sock
+
+
+def _results(coordinator, **kwargs):
+    return {
+        result['series_id']: result
+        for shard in coordinator.run('average', SERIES, 2, {'window': 2}, shard_size=4, **kwargs)
+        for result in shard
+    }
+
+
+def test_results_of_every_shard_are_gathered(container):
+    with Coordinator() as coordinator:
+        threads = _start_workers(container('registry'), coordinator.address, 3)
+        assert coordinator.wait_for_workers(3, timeout=5)
+        results = _results(coordinator)
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+    assert sorted(results) == sorted(series_id for series_id, _ in SERIES)
+    assert list(results['s7']['forecast']) == [11.5, 11.5]
+    assert results['s7']['params'] == {'window': 2, 'kind': 'mean'}
+
+
+def test_lost_shards_are_retried(container):
+    with Coordinator(heartbeat_timeout=0.4) as coordinator:
+        silent = _silent_worker(coordinator.address)
+        assert coordinator.wait_for_workers(1, timeout=5)
+        _start_workers(container('registry'), coordinator.address, 1, heartbeat_interval=0.1)
+        assert coordinator.wait_for_workers(2, timeout=5)
+        results = _results(coordinator)
+        assert 'silent' not in coordinator.workers
+    silent.close()
+    assert len(results) == len(SERIES)
+    assert not [result for result in results.values() if 'error' in result]
+
+
+def test_shard_given_up_after_max_attempts():
+    with Coordinator(heartbeat_timeout=0.2, max_attempts=1) as coordinator:
+        silent = _silent_worker(coordinator.address)
+        assert coordinator.wait_for_workers(1, timeout=5)
+        shards = coordinator.run('average', SERIES[:3], 2, shard_size=3, max_pending=1)
+        assert next(shards) == [
+            {'series_id': series_id, 'error': 'shard lost 1 times, last on worker silent'}
+            for series_id, _ in SERIES[:3]
+        ]
+    silent.close()
+
+
+def test_worker_with_wrong_token_is_refused():
+    with Coordinator(token='secret') as coordinator:
+        with socket.create_connection(coordinator.address) as sock:
+            sock.sendall(encode_frame({'type': MSG_REGISTER, 'name': 'intruder', 'slots': 1, 'token': 'guess'}))
+            assert recv_frame(sock) is None
+        assert coordinator.workers == []
+
+
+def test_one_failing_series_fails_alone(container):
+    class Picky:
+        def fit_forecast(self, input_data, forecast_horizon):
+            if input_data[0] == 8:
+                raise TypeError('unexpected series')
+            return {'forecast': [input_data[-1]] * forecast_horizon, 'params': {}}
+
+    container('registry').register(MethodSpec('picky', lambda c: Picky(), lambda c: None))
+    with Coordinator() as coordinator:
+        _start_workers(container('registry'), coordinator.address, 1)
+        results = [result for shard in coordinator.run('picky', SERIES[:10], 1, {}, shard_size=5) for result in shard]
+    errors = {result['series_id']: result['error'] for result in results if 'error' in result}
+    assert errors == {'s7': 'unexpected series'}
+    assert len(results) == 10
+
+
+def test_only_loopback_without_token(request, tmp_path, monkeypatch):
+    monkeypatch.delenv(CLUSTER_TOKEN_ENV, raising=False)
+    with pytest.raises(ValueError):
+        Coordinator('0.0.0.0')
+    with Coordinator('0.0.0.0', token='secret') as coordinator:
+        assert coordinator.address[0] == '0.0.0.0'
+
+    np.save(tmp_path / 'series.npy', np.ones((2, 5)))
+    assert main(['coordinator', str(tmp_path / 'series.npy'), str(tmp_path / 'forecasts.jsonl'),
+                 '--forecast-horizon', '1', '--listen', '0.0.0.0:0']) == 2
+
+
+def test_coordinator_cli(request, tmp_path, container):
+    np.save(tmp_path / 'series.npy', np.arange(60.0).reshape(12, 5))
+    output = str(tmp_path / 'forecasts.jsonl')
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    _start_workers(container('registry'), ('127.0.0.1', port), 2, connect_timeout=10)
+    assert main(['coordinator', str(tmp_path / 'series.npy'), output, '--forecast-horizon', '1',
+                 '--params', '{"window": 2}', '--listen', f'127.0.0.1:{port}', '--shard-size', '5']) == 0
+
+    with open(output) as f:
+        results = {result['series_id']: result for result in map(json.loads, f)}
+    assert sorted(results, key=int) == [str(index) for index in range(12)]
+    assert results['3']['forecast'] == [18.5]
+
+
+def test_token_from_a_file_or_the_environment(monkeypatch, tmp_path):
+    parser = create_parser()
+    token_file = tmp_path / 'token'
+    token_file.write_text('from-file\n')
+    monkeypatch.setenv(CLUSTER_TOKEN_ENV, 'from-env')
+    assert _cluster_token(parser.parse_args(['worker', 'host:1', '--token-file', str(token_file)])) == 'from-file'
+    assert _cluster_token(parser.parse_args(['worker', 'host:1', '--token', 'from-flag'])) == 'from-env'
+    monkeypatch.delenv(CLUSTER_TOKEN_ENV)
+    assert _cluster_token(parser.parse_args(['worker', 'host:1', '--token', 'from-flag'])) == 'from-flag'
+    assert _cluster_token(parser.parse_args(['worker', 'host:1'])) is None
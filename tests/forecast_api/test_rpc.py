@@ -0,0 +1,117 @@
+import socket
+import threading
+import numpy as np
+import pytest
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+
+from forecast_api.lib.exceptions import InvalidParameter
+from forecast_api.lib.exceptions import PayloadTooLarge
+from forecast_api.lib.exceptions import UnknownForecastMethod
+from forecast_api.methods import MethodSpec
+
+pytest.importorskip('msgpack')
+
+from forecast_api.rpc.client import RpcClient  # noqa: E402
+from forecast_api.rpc.protocol import encode_frame  # noqa: E402
+from forecast_api.rpc.protocol import recv_frame  # noqa: E402
+from forecast_api.rpc.server import RpcServer  # noqa: E402
+
+
+class Gated:
+    """Engine whose fits wait for their gate, to control the order they finish in."""
+
+    def __init__(self):
+        self.gates = {}
+
+    def fit_forecast(self, input_data, forecast_horizon, gate):
+        self.gates.setdefault(gate, threading.Event()).wait(5)
+        return {'forecast': np.full(forecast_horizon, input_data[-1]), 'params': {'gate': gate}}
+
+
+@pytest.fixture
+def gated(container):
+    engine = Gated()
+    container('registry').register(MethodSpec('gated', lambda c: engine, lambda c: None))
+    return engine
+
+
+@pytest.fixture
+def server(container, tmp_path):
+    server = RpcServer(container('registry'), str(tmp_path / 'forecast.sock'), threads=4, max_frame_bytes=2**16)
+    yield server.start_in_thread()
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    with RpcClient(server.path, pool_size=2) as client:
+        yield client
+
+
+def test_fit_forecast_matches_the_service(client, container):
+    input_data = np.random.default_rng(0).normal(10, 1, 30)
+    result = client.fit_forecast('average', input_data, 3, window='auto')
+    expected = container('services.methods.average').fit_forecast(input_data, 3, window='auto')
+    np.testing.assert_allclose(result['forecast'], expected['forecast'])
+    assert result['params'] == expected['params']
+    assert result['forecast'].dtype == np.float64
+
+
+def test_map_pipelines_in_order(client):
+    series = [np.arange(1.0, length) for length in range(3, 40)]
+    results = client.map('average', series, 1, window=2)
+    assert [result['forecast'][0] for result in results] == [length - 1.5 for length in range(3, 40)]
+
+
+def test_responses_out_of_order(client, gated):
+    slow = client.submit('gated', [1.0], 1, {'gate': 'slow'})
+    fast = client.submit('gated', [2.0], 1, {'gate': 'fast'})
+    gated.gates.setdefault('fast', threading.Event()).set()
+    done, _ = wait([slow, fast], timeout=5, return_when=FIRST_COMPLETED)
+    assert done == {fast}
+    gated.gates.setdefault('slow', threading.Event()).set()
+    assert list(slow.result(5)['forecast']) == [1.0]
+
+
+@pytest.mark.parametrize('method, params, error', [
+    ('average', {'window': -1}, InvalidParameter),
+    ('nomethod', {}, UnknownForecastMethod),
+])
+def test_errors_are_raised_by_the_client(client, method, params, error):
+    with pytest.raises(error):
+        client.fit_forecast(method, [1.0, 2.0, 3.0], 1, **params)
+
+
+def test_fields_project_the_result(client):
+    result = client.submit('average', [1.0, 2.0, 3.0], 2, {'window': 2}, fields='params.window').result()
+    assert result == {'params': {'window': 2}}
+    with pytest.raises(InvalidParameter):
+        client.submit('average', [1.0, 2.0, 3.0], 2, {'window': 2}, fields='params.').result()
+
+
+def test_only_forecast_operations_can_be_called(server):
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(server.path)
+        sock.sendall(encode_frame({'id': 7, 'method': 'average', 'operation': '_parse_params',
+                                   'input_data': [1.0], 'forecast_horizon': 1}))
+        assert recv_frame(sock) == {'id': 7, 'error': {
+            'kind': 'not_implemented', 'message': 'Not implemented: average with operation _parse_params'
+        }}
+
+
+def test_frame_too_large(client):
+    with pytest.raises(PayloadTooLarge):
+        client.fit_forecast('average', np.ones(10**4), 1, window=2)
+    # the pool opens a new connection in place of the one the server closed
+    assert list(client.fit_forecast('average', [1.0, 3.0], 1, window=2)['forecast']) == [2.0]
+
+
+def test_benchmark(request, capsys):
+    from forecast_api.cli import main
+
+    assert main(['rpc-benchmark', '--calls', '5', '--length', '10', '--params', '{"window": 2}',
+                 '--config', request.config.getoption('ini_file')]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(':')[0].strip() for line in lines] == ['http', 'rpc', 'rpc_pipelined']